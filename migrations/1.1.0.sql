@@ -0,0 +1,123 @@
+CREATE OR REPLACE FUNCTION storage_capacity(p_storage_type VARCHAR)
+RETURNS INT AS $$
+    SELECT CASE p_storage_type
+        WHEN 'hot' THEN 6
+        WHEN 'cold' THEN 6
+        WHEN 'room' THEN 12
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+
+CREATE OR REPLACE FUNCTION insert_order(
+    p_order_id VARCHAR,
+    p_order_name VARCHAR,
+    p_storage_type VARCHAR,
+    p_best_storage_type VARCHAR,
+    p_fresh_max_age BIGINT
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO order_storage (
+        order_id, order_name, storage_type, best_storage_type, fresh_max_age, cumulative_age
+    )
+    VALUES (p_order_id, p_order_name, p_storage_type, p_best_storage_type, p_fresh_max_age, 0);
+
+    UPDATE inventory
+    SET inventory_count = inventory_count + 1
+    WHERE storage_type = p_storage_type;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Places an order and returns actions taken in the order they happened.
+-- Decision and changes are made while holding inventory row locks, so concurrent placements are
+-- serialized by the database instead of failing on constraints and being retried.
+CREATE OR REPLACE FUNCTION place_order(
+    p_order_id VARCHAR,
+    p_order_name VARCHAR,
+    p_temp VARCHAR,
+    p_freshness BIGINT
+)
+RETURNS TABLE (action_type VARCHAR, action_order_id VARCHAR, action_storage_type VARCHAR) AS $$
+DECLARE
+    v_best_count INT;
+    v_room_count INT;
+    v_hot_count INT;
+    v_cold_count INT;
+    v_victim RECORD;
+BEGIN
+    -- lock rows in a fixed order to avoid deadlocks between concurrent placements
+    PERFORM 1 FROM inventory ORDER BY storage_type FOR UPDATE;
+
+    SELECT
+        MAX(inventory_count) FILTER (WHERE storage_type = p_temp),
+        MAX(inventory_count) FILTER (WHERE storage_type = 'room'),
+        MAX(inventory_count) FILTER (WHERE storage_type = 'hot'),
+        MAX(inventory_count) FILTER (WHERE storage_type = 'cold')
+    INTO v_best_count, v_room_count, v_hot_count, v_cold_count
+    FROM inventory;
+
+    IF v_best_count < storage_capacity(p_temp) THEN
+        PERFORM insert_order(p_order_id, p_order_name, p_temp, p_temp, p_freshness);
+        RETURN QUERY SELECT 'place'::VARCHAR, p_order_id, p_temp;
+        RETURN;
+    END IF;
+
+    IF v_room_count >= storage_capacity('room') THEN
+        SELECT
+            os.order_id,
+            os.best_storage_type
+        INTO v_victim
+        FROM order_storage os
+        WHERE os.storage_type = 'room'
+            AND (
+                (os.best_storage_type = 'hot' AND v_hot_count < storage_capacity('hot')) OR
+                (os.best_storage_type = 'cold' AND v_cold_count < storage_capacity('cold'))
+            )
+        ORDER BY
+            os.cumulative_age - os.fresh_max_age +
+                2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.updated_at)) DESC
+        LIMIT 1;
+
+        IF FOUND THEN
+            UPDATE inventory
+            SET inventory_count = CASE
+                WHEN storage_type = 'room' THEN inventory_count - 1
+                ELSE inventory_count + 1
+            END
+            WHERE storage_type IN ('room', v_victim.best_storage_type);
+
+            UPDATE order_storage
+            SET storage_type = v_victim.best_storage_type
+            WHERE order_id = v_victim.order_id;
+
+            RETURN QUERY SELECT 'move'::VARCHAR, v_victim.order_id, v_victim.best_storage_type;
+        ELSE
+            SELECT os.order_id
+            INTO v_victim
+            FROM order_storage os
+            WHERE os.storage_type = 'room'
+            ORDER BY
+                os.cumulative_age - os.fresh_max_age +
+                    CASE
+                        WHEN os.storage_type = os.best_storage_type THEN
+                            EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.updated_at))
+                        ELSE
+                            2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.updated_at))
+                    END DESC
+            LIMIT 1;
+
+            DELETE FROM order_storage WHERE order_id = v_victim.order_id;
+
+            UPDATE inventory
+            SET inventory_count = inventory_count - 1
+            WHERE storage_type = 'room';
+
+            RETURN QUERY SELECT 'discard'::VARCHAR, v_victim.order_id, 'room'::VARCHAR;
+        END IF;
+    END IF;
+
+    PERFORM insert_order(p_order_id, p_order_name, 'room', p_temp, p_freshness);
+    RETURN QUERY SELECT 'place'::VARCHAR, p_order_id, 'room'::VARCHAR;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,174 @@
+-- "expires_at" is the moment when order age reaches its freshness on the current shelf.
+-- Relative age of a row is decay_rate * (now - expires_at), so for rows with the same decay rate
+-- ordering by relative age is ordering by "expires_at" and victim selection becomes an index lookup.
+ALTER TABLE order_storage ADD COLUMN expires_at TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION decay_rate(p_storage_type VARCHAR, p_best_storage_type VARCHAR)
+RETURNS INT AS $$
+    SELECT CASE WHEN p_storage_type = p_best_storage_type THEN 1 ELSE 2 END;
+$$ LANGUAGE sql IMMUTABLE;
+
+DROP TRIGGER IF EXISTS order_age_trigger ON order_storage;
+-- AFTER trigger couldn't change the row, so "updated_at" was never refreshed. It is maintained below.
+DROP TRIGGER IF EXISTS update_order_storage_updated_at ON order_storage;
+DROP FUNCTION IF EXISTS update_order_age();
+DROP FUNCTION IF EXISTS update_updated_at_column();
+
+UPDATE order_storage
+SET expires_at = updated_at +
+    make_interval(secs => (fresh_max_age - cumulative_age)::DOUBLE PRECISION / decay_rate(storage_type, best_storage_type));
+
+CREATE OR REPLACE FUNCTION maintain_order_age()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        NEW.cumulative_age = NEW.cumulative_age +
+            decay_rate(OLD.storage_type, OLD.best_storage_type) *
+            EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - OLD.updated_at));
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+
+    NEW.expires_at = NEW.updated_at +
+        make_interval(
+            secs => (NEW.fresh_max_age - NEW.cumulative_age)::DOUBLE PRECISION /
+                decay_rate(NEW.storage_type, NEW.best_storage_type)
+        );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER order_age_trigger
+BEFORE INSERT OR UPDATE ON order_storage
+FOR EACH ROW
+EXECUTE FUNCTION maintain_order_age();
+
+CREATE INDEX order_storage_room_expires_at_idx
+ON order_storage (storage_type, best_storage_type, expires_at)
+WHERE storage_type = 'room';
+
+
+-- Room order with the highest relative age among orders whose best storage has space.
+-- Moved orders always come from room storage where hot and cold orders decay at the same rate.
+CREATE OR REPLACE FUNCTION find_order_to_move()
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM inventory
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.storage_type = 'room' AND os.best_storage_type = inventory.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    WHERE inventory.storage_type IN ('hot', 'cold')
+        AND inventory.inventory_count < storage_capacity(inventory.storage_type)
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+
+-- Room order with the highest relative age. Looks up the oldest order per best storage type
+-- and compares their relative ages since decay rate differs between them.
+CREATE OR REPLACE FUNCTION find_order_to_discard()
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM (VALUES ('hot'), ('cold'), ('room')) AS best(storage_type)
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            decay_rate(os.storage_type, os.best_storage_type) *
+                EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.storage_type = 'room' AND os.best_storage_type = best.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+
+CREATE OR REPLACE FUNCTION place_order(
+    p_order_id VARCHAR,
+    p_order_name VARCHAR,
+    p_temp VARCHAR,
+    p_freshness BIGINT
+)
+RETURNS TABLE (action_type VARCHAR, action_order_id VARCHAR, action_storage_type VARCHAR) AS $$
+DECLARE
+    v_best_count INT;
+    v_room_count INT;
+    v_victim RECORD;
+BEGIN
+    -- lock rows in a fixed order to avoid deadlocks between concurrent placements
+    PERFORM 1 FROM inventory ORDER BY storage_type FOR UPDATE;
+
+    SELECT
+        MAX(inventory_count) FILTER (WHERE storage_type = p_temp),
+        MAX(inventory_count) FILTER (WHERE storage_type = 'room')
+    INTO v_best_count, v_room_count
+    FROM inventory;
+
+    IF v_best_count < storage_capacity(p_temp) THEN
+        PERFORM insert_order(p_order_id, p_order_name, p_temp, p_temp, p_freshness);
+        RETURN QUERY SELECT 'place'::VARCHAR, p_order_id, p_temp;
+        RETURN;
+    END IF;
+
+    IF v_room_count >= storage_capacity('room') THEN
+        SELECT * INTO v_victim FROM find_order_to_move();
+
+        IF FOUND THEN
+            UPDATE inventory
+            SET inventory_count = CASE
+                WHEN storage_type = 'room' THEN inventory_count - 1
+                ELSE inventory_count + 1
+            END
+            WHERE storage_type IN ('room', v_victim.best_storage_type);
+
+            UPDATE order_storage
+            SET storage_type = v_victim.best_storage_type
+            WHERE order_id = v_victim.order_id;
+
+            RETURN QUERY SELECT 'move'::VARCHAR, v_victim.order_id, v_victim.best_storage_type;
+        ELSE
+            SELECT * INTO v_victim FROM find_order_to_discard();
+
+            DELETE FROM order_storage WHERE order_id = v_victim.order_id;
+
+            UPDATE inventory
+            SET inventory_count = inventory_count - 1
+            WHERE storage_type = 'room';
+
+            RETURN QUERY SELECT 'discard'::VARCHAR, v_victim.order_id, 'room'::VARCHAR;
+        END IF;
+    END IF;
+
+    PERFORM insert_order(p_order_id, p_order_name, 'room', p_temp, p_freshness);
+    RETURN QUERY SELECT 'place'::VARCHAR, p_order_id, 'room'::VARCHAR;
+END;
+$$ LANGUAGE plpgsql;
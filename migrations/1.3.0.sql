@@ -0,0 +1,54 @@
+-- Shelf capacities are stored next to inventory counts instead of being hard-coded in the constraint.
+-- The web server updates them on startup and before each run (see DatabaseClient.update_capacities).
+ALTER TABLE inventory ADD COLUMN capacity INT;
+
+UPDATE inventory
+SET capacity = CASE storage_type
+    WHEN 'hot' THEN 6
+    WHEN 'cold' THEN 6
+    WHEN 'room' THEN 12
+END;
+
+ALTER TABLE inventory ALTER COLUMN capacity SET NOT NULL;
+ALTER TABLE inventory DROP CONSTRAINT inventory_check;
+ALTER TABLE inventory ADD CONSTRAINT inventory_check CHECK (
+    inventory_count >= 0 AND inventory_count <= capacity
+);
+ALTER TABLE inventory ADD CONSTRAINT inventory_storage_type_check CHECK (
+    storage_type IN ('hot', 'cold', 'room')
+);
+
+CREATE OR REPLACE FUNCTION storage_capacity(p_storage_type VARCHAR)
+RETURNS INT AS $$
+    SELECT capacity FROM inventory WHERE storage_type = p_storage_type;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION find_order_to_move()
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM inventory
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.storage_type = 'room' AND os.best_storage_type = inventory.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    WHERE inventory.storage_type IN ('hot', 'cold')
+        AND inventory.inventory_count < inventory.capacity
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,186 @@
+-- Every run gets its own kitchen: inventory rows and orders are keyed by "kitchen_id",
+-- so concurrent runs on one database don't see or lock each other's shelves.
+-- Rows that existed before belong to the "default" kitchen.
+ALTER TABLE inventory ADD COLUMN kitchen_id VARCHAR(64) NOT NULL DEFAULT 'default';
+ALTER TABLE inventory DROP CONSTRAINT inventory_pkey;
+ALTER TABLE inventory ADD PRIMARY KEY (kitchen_id, storage_type);
+ALTER TABLE inventory ALTER COLUMN kitchen_id DROP DEFAULT;
+
+ALTER TABLE order_storage ADD COLUMN kitchen_id VARCHAR(64) NOT NULL DEFAULT 'default';
+ALTER TABLE order_storage DROP CONSTRAINT order_storage_pkey;
+ALTER TABLE order_storage ADD PRIMARY KEY (kitchen_id, order_id);
+ALTER TABLE order_storage ALTER COLUMN kitchen_id DROP DEFAULT;
+
+DROP INDEX order_storage_room_expires_at_idx;
+CREATE INDEX order_storage_room_expires_at_idx
+ON order_storage (kitchen_id, best_storage_type, expires_at)
+WHERE storage_type = 'room';
+
+DROP FUNCTION place_order(VARCHAR, VARCHAR, VARCHAR, BIGINT);
+DROP FUNCTION find_order_to_move();
+DROP FUNCTION find_order_to_discard();
+DROP FUNCTION insert_order(VARCHAR, VARCHAR, VARCHAR, VARCHAR, BIGINT);
+DROP FUNCTION storage_capacity(VARCHAR);
+
+
+CREATE FUNCTION storage_capacity(p_kitchen_id VARCHAR, p_storage_type VARCHAR)
+RETURNS INT AS $$
+    SELECT capacity FROM inventory WHERE kitchen_id = p_kitchen_id AND storage_type = p_storage_type;
+$$ LANGUAGE sql STABLE;
+
+
+CREATE FUNCTION insert_order(
+    p_kitchen_id VARCHAR,
+    p_order_id VARCHAR,
+    p_order_name VARCHAR,
+    p_storage_type VARCHAR,
+    p_best_storage_type VARCHAR,
+    p_fresh_max_age BIGINT
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO order_storage (
+        kitchen_id, order_id, order_name, storage_type, best_storage_type, fresh_max_age, cumulative_age
+    )
+    VALUES (p_kitchen_id, p_order_id, p_order_name, p_storage_type, p_best_storage_type, p_fresh_max_age, 0);
+
+    UPDATE inventory
+    SET inventory_count = inventory_count + 1
+    WHERE kitchen_id = p_kitchen_id AND storage_type = p_storage_type;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE FUNCTION find_order_to_move(p_kitchen_id VARCHAR)
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM inventory
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.kitchen_id = p_kitchen_id
+            AND os.storage_type = 'room'
+            AND os.best_storage_type = inventory.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    WHERE inventory.kitchen_id = p_kitchen_id
+        AND inventory.storage_type IN ('hot', 'cold')
+        AND inventory.inventory_count < inventory.capacity
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+
+CREATE FUNCTION find_order_to_discard(p_kitchen_id VARCHAR)
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM (VALUES ('hot'), ('cold'), ('room')) AS best(storage_type)
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            decay_rate(os.storage_type, os.best_storage_type) *
+                EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.kitchen_id = p_kitchen_id
+            AND os.storage_type = 'room'
+            AND os.best_storage_type = best.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+
+CREATE FUNCTION place_order(
+    p_kitchen_id VARCHAR,
+    p_order_id VARCHAR,
+    p_order_name VARCHAR,
+    p_temp VARCHAR,
+    p_freshness BIGINT
+)
+RETURNS TABLE (action_type VARCHAR, action_order_id VARCHAR, action_storage_type VARCHAR) AS $$
+DECLARE
+    v_best_count INT;
+    v_best_capacity INT;
+    v_room_count INT;
+    v_room_capacity INT;
+    v_victim RECORD;
+BEGIN
+    -- lock the kitchen's rows in a fixed order to avoid deadlocks between concurrent placements,
+    -- placements in other kitchens are not blocked
+    PERFORM 1 FROM inventory WHERE kitchen_id = p_kitchen_id ORDER BY storage_type FOR UPDATE;
+
+    SELECT
+        MAX(inventory_count) FILTER (WHERE storage_type = p_temp),
+        MAX(capacity) FILTER (WHERE storage_type = p_temp),
+        MAX(inventory_count) FILTER (WHERE storage_type = 'room'),
+        MAX(capacity) FILTER (WHERE storage_type = 'room')
+    INTO v_best_count, v_best_capacity, v_room_count, v_room_capacity
+    FROM inventory
+    WHERE kitchen_id = p_kitchen_id;
+
+    IF v_best_count < v_best_capacity THEN
+        PERFORM insert_order(p_kitchen_id, p_order_id, p_order_name, p_temp, p_temp, p_freshness);
+        RETURN QUERY SELECT 'place'::VARCHAR, p_order_id, p_temp;
+        RETURN;
+    END IF;
+
+    IF v_room_count >= v_room_capacity THEN
+        SELECT * INTO v_victim FROM find_order_to_move(p_kitchen_id);
+
+        IF FOUND THEN
+            UPDATE inventory
+            SET inventory_count = CASE
+                WHEN storage_type = 'room' THEN inventory_count - 1
+                ELSE inventory_count + 1
+            END
+            WHERE kitchen_id = p_kitchen_id AND storage_type IN ('room', v_victim.best_storage_type);
+
+            UPDATE order_storage
+            SET storage_type = v_victim.best_storage_type
+            WHERE kitchen_id = p_kitchen_id AND order_id = v_victim.order_id;
+
+            RETURN QUERY SELECT 'move'::VARCHAR, v_victim.order_id, v_victim.best_storage_type;
+        ELSE
+            SELECT * INTO v_victim FROM find_order_to_discard(p_kitchen_id);
+
+            DELETE FROM order_storage WHERE kitchen_id = p_kitchen_id AND order_id = v_victim.order_id;
+
+            UPDATE inventory
+            SET inventory_count = inventory_count - 1
+            WHERE kitchen_id = p_kitchen_id AND storage_type = 'room';
+
+            RETURN QUERY SELECT 'discard'::VARCHAR, v_victim.order_id, 'room'::VARCHAR;
+        END IF;
+    END IF;
+
+    PERFORM insert_order(p_kitchen_id, p_order_id, p_order_name, 'room', p_temp, p_freshness);
+    RETURN QUERY SELECT 'place'::VARCHAR, p_order_id, 'room'::VARCHAR;
+END;
+$$ LANGUAGE plpgsql;
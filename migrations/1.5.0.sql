@@ -0,0 +1,92 @@
+-- Time used for order age. Runs in simulated time set "kitchen.now" at the start of every transaction,
+-- other runs leave it unset and get CURRENT_TIMESTAMP.
+CREATE FUNCTION kitchen_now()
+RETURNS TIMESTAMPTZ AS $$
+    SELECT COALESCE(NULLIF(current_setting('kitchen.now', true), '')::TIMESTAMPTZ, CURRENT_TIMESTAMP);
+$$ LANGUAGE sql STABLE;
+
+ALTER TABLE order_storage ALTER COLUMN created_at SET DEFAULT kitchen_now();
+ALTER TABLE order_storage ALTER COLUMN updated_at SET DEFAULT kitchen_now();
+
+CREATE OR REPLACE FUNCTION maintain_order_age()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        NEW.cumulative_age = NEW.cumulative_age +
+            decay_rate(OLD.storage_type, OLD.best_storage_type) *
+            EXTRACT(EPOCH FROM (kitchen_now() - OLD.updated_at));
+        NEW.updated_at = kitchen_now();
+    END IF;
+
+    NEW.expires_at = NEW.updated_at +
+        make_interval(
+            secs => (NEW.fresh_max_age - NEW.cumulative_age)::DOUBLE PRECISION /
+                decay_rate(NEW.storage_type, NEW.best_storage_type)
+        );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION find_order_to_move(p_kitchen_id VARCHAR)
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM inventory
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            2 * EXTRACT(EPOCH FROM (kitchen_now() - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.kitchen_id = p_kitchen_id
+            AND os.storage_type = 'room'
+            AND os.best_storage_type = inventory.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    WHERE inventory.kitchen_id = p_kitchen_id
+        AND inventory.storage_type IN ('hot', 'cold')
+        AND inventory.inventory_count < inventory.capacity
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION find_order_to_discard(p_kitchen_id VARCHAR)
+RETURNS TABLE (
+    order_id VARCHAR,
+    order_name VARCHAR,
+    storage_type VARCHAR,
+    best_storage_type VARCHAR,
+    fresh_max_age BIGINT,
+    relative_age DOUBLE PRECISION
+) AS $$
+    SELECT candidate.*
+    FROM (VALUES ('hot'), ('cold'), ('room')) AS best(storage_type)
+    CROSS JOIN LATERAL (
+        SELECT
+            os.order_id,
+            os.order_name,
+            os.storage_type,
+            os.best_storage_type,
+            os.fresh_max_age,
+            decay_rate(os.storage_type, os.best_storage_type) *
+                EXTRACT(EPOCH FROM (kitchen_now() - os.expires_at))::DOUBLE PRECISION
+        FROM order_storage os
+        WHERE os.kitchen_id = p_kitchen_id
+            AND os.storage_type = 'room'
+            AND os.best_storage_type = best.storage_type
+        ORDER BY os.expires_at
+        LIMIT 1
+    ) candidate
+    ORDER BY 6 DESC
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,315 @@
+import datetime
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterable, List
+
+import numpy as np
+import typer
+from sqlalchemy.exc import DBAPIError
+from typer import Argument, Option
+
+from clients.database.errors import is_transaction_conflict
+from clients.database.storage_engine import get_storage_engine, release_storage_engine
+from constants import StorageEngine, STORAGE_ENGINES, STORAGE_TYPES, TransactionIsolationLevel
+from jobs.exceptions import RetryException
+from jobs.pickup_order import pickup_order
+from jobs.place_order import place_order
+from models.action import Action
+from models.action_log import ActionLog
+from models.config import Config
+from models.order import Order
+from models.problem import Problem
+from scheduler.scheduler import schedule_problem_orders
+from validators.actions_validators import validate_schedule
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_PATH = os.path.join("benchmark_results", "results.ndjson")
+# orders a worker keeps on the shelves before picking up the oldest one
+PICKUP_DISTANCE = 8
+PERCENTILES = (50, 90, 99)
+
+
+class TransactionCounter:
+    """
+    Database client wrapper counting committed transactions and transactions rolled back by a conflict,
+    safe to share between threads.
+    """
+
+    def __init__(self, db_client):
+        self._db_client = db_client
+        self._lock = Lock()
+        self.transactions = 0
+        self.integrity_errors = 0
+
+    def __getattr__(self, name):
+        return getattr(self._db_client, name)
+
+    @contextmanager
+    def transaction(
+        self,
+        connection,
+        isolation_level: TransactionIsolationLevel = TransactionIsolationLevel.READ_COMMITTED,
+    ):
+        try:
+            with self._db_client.transaction(connection, isolation_level):
+                yield connection
+        except DBAPIError as e:
+            if is_transaction_conflict(e):
+                with self._lock:
+                    self.integrity_errors += 1
+            raise
+        with self._lock:
+            self.transactions += 1
+
+
+def generate_problem(order_count: int, seed: int) -> Problem:
+    """Problem with orders spread evenly across temperatures, the same for the same seed."""
+    rng = random.Random(seed)
+    orders = [
+        Order(
+            order_id=uuid.UUID(int=rng.getrandbits(128)).hex,
+            name=f"Order {i}",
+            temp=rng.choice(STORAGE_TYPES),
+            freshness=rng.randint(30, 300),
+        )
+        for i in range(order_count)
+    ]
+    return Problem(test_id=f"benchmark-{order_count}-{seed}", orders=orders)
+
+
+def get_config(storage_engine: str, **kwargs) -> Config:
+    # orders are generated, the problem source is never read
+    return Config(problem_file_path="<generated>", storage_engine=storage_engine, **kwargs)
+
+
+def get_percentiles(name: str, values_us: np.ndarray) -> Dict[str, float]:
+    values_us = values_us[~np.isnan(values_us)]
+    if not values_us.size:
+        return {}
+    percentiles = np.percentile(values_us, PERCENTILES)
+    stats = {f"{name}_p{p}_ms": float(value) / 1000 for p, value in zip(PERCENTILES, percentiles)}
+    stats[f"{name}_max_ms"] = float(values_us.max()) / 1000
+    return stats
+
+
+def benchmark_placement(config: Config, order_count: int, workers: int, seed: int = 1) -> Dict:
+    """
+    Hot path: workers place orders back to back without a schedule, each picking up its own orders
+    PICKUP_DISTANCE placements later. Measures job latencies including retries, transactions per second
+    and how often a transaction failed with an integrity error.
+    """
+    orders = generate_problem(order_count, seed).orders
+    db_client, connection_pool = get_storage_engine(config, f"benchmark-{uuid.uuid4().hex}")
+    counter = TransactionCounter(db_client)
+    action_log = ActionLog()
+    place_us = np.full(order_count, np.nan)
+    pickup_us = np.full(order_count, np.nan)
+    failed = []
+
+    def run_job(job, latencies: np.ndarray, index: int) -> None:
+        started = time.perf_counter_ns()
+        try:
+            job(orders[index], counter, action_log, connection_pool)
+        except RetryException:
+            failed.append(index)
+        latencies[index] = (time.perf_counter_ns() - started) / 1000
+
+    def work(worker_index: int) -> None:
+        shelved = deque()
+        for index in range(worker_index, order_count, workers):
+            run_job(place_order, place_us, index)
+            shelved.append(index)
+            if len(shelved) > PICKUP_DISTANCE:
+                run_job(pickup_order, pickup_us, shelved.popleft())
+        while shelved:
+            run_job(pickup_order, pickup_us, shelved.popleft())
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="benchmark-worker") as executor:
+            list(executor.map(work, range(workers)))
+        elapsed = time.perf_counter() - started
+    finally:
+        release_storage_engine(db_client, connection_pool)
+
+    attempts = counter.transactions + counter.integrity_errors
+    return dict(
+        suite="placement",
+        storage_engine=config.storage_engine,
+        orders=order_count,
+        workers=workers,
+        elapsed_seconds=elapsed,
+        transactions=counter.transactions,
+        transactions_per_second=counter.transactions / elapsed,
+        integrity_errors=counter.integrity_errors,
+        integrity_error_rate=counter.integrity_errors / attempts if attempts else 0,
+        failed_jobs=len(failed),
+        actions=action_log.get_count(),
+        **get_percentiles("place", place_us),
+        **get_percentiles("pickup", pickup_us),
+    )
+
+
+def benchmark_schedule(config: Config, order_count: int, seed: int = 1) -> Dict:
+    """
+    End to end: runs the scheduler on a generated problem and compares placement action timestamps with
+    the due time of each placement. Due times are anchored at the first placement, so the lag of that one
+    is zero and the rest show how far the run drifts behind its schedule.
+    """
+    problem = generate_problem(order_count, seed)
+    started = time.perf_counter()
+    actions = schedule_problem_orders(problem, config)
+    elapsed = time.perf_counter() - started
+
+    order_indices = {order.id: i for i, order in enumerate(problem.orders)}
+    place_timestamps = np.full(order_count, np.nan)
+    for action in actions:
+        if action.action_type == Action.PLACE:
+            place_timestamps[order_indices[action.id]] = action.timestamp
+    due_us = np.arange(order_count) * config.order_rate * 1_000
+    lag_us = place_timestamps - np.nanmin(place_timestamps) - due_us
+
+    try:
+        validate_schedule(actions, problem, config)
+        valid = True
+    except ValueError as e:
+        logger.error(f"Benchmark run produced invalid actions: {e}")
+        valid = False
+
+    return dict(
+        suite="schedule",
+        storage_engine=config.storage_engine,
+        execution_mode=config.execution_mode,
+        orders=order_count,
+        order_rate=config.order_rate,
+        min_pickup=config.min_pickup,
+        max_pickup=config.max_pickup,
+        elapsed_seconds=elapsed,
+        actions=len(actions),
+        actions_per_second=len(actions) / elapsed,
+        valid=valid,
+        **get_percentiles("lag", lag_us),
+    )
+
+
+def write_results(results: Iterable[Dict], output_path: str) -> None:
+    """Appends results as JSON lines tagged with the commit they were measured on."""
+    commit = get_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as fp:
+        for result in results:
+            fp.write(json.dumps(dict(commit=commit, timestamp=timestamp, **result)) + "\n")
+
+
+def read_results(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def get_commit() -> str:
+    """Commit from BENCHMARK_COMMIT (set in containers without git) or the working tree."""
+    if os.environ.get("BENCHMARK_COMMIT"):
+        return os.environ["BENCHMARK_COMMIT"]
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, check=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+PARAMETER_KEYS = ("suite", "storage_engine", "execution_mode", "orders", "workers", "order_rate", "min_pickup",
+                  "max_pickup")
+
+
+def compare_results(baseline: List[Dict], current: List[Dict]) -> List[Dict]:
+    """
+    Pairs results measured with the same parameters, the latest of each side wins, and reports
+    the relative change of every numeric metric. Positive change means the metric grew.
+    """
+    def get_key(result: Dict) -> tuple:
+        return tuple(result.get(key) for key in PARAMETER_KEYS)
+
+    baseline_by_key = {get_key(result): result for result in baseline}
+    comparison = []
+    for key, result in {get_key(result): result for result in current}.items():
+        before = baseline_by_key.get(key)
+        if before is None:
+            continue
+        changes = {
+            metric: (value - before[metric]) / before[metric]
+            for metric, value in result.items()
+            if metric not in PARAMETER_KEYS and isinstance(value, (int, float)) and not isinstance(value, bool)
+            and before.get(metric)
+        }
+        parameters = {name: value for name, value in zip(PARAMETER_KEYS, key) if value is not None}
+        comparison.append(dict(parameters, changes=changes))
+    return comparison
+
+
+app = typer.Typer()
+
+
+@app.command()
+def placement(
+    storage_engine: str = Option(default=StorageEngine.MEMORY, help=f"Storage engine, one of: {STORAGE_ENGINES}"),
+    orders: List[int] = Option(default=[100, 1000, 10000], help="Order counts, repeat the option for several"),
+    workers: List[int] = Option(default=[1, 4, 20], help="Worker thread counts, repeat the option for several"),
+    seed: int = Option(default=1, help="Seed of generated problems"),
+    output: str = Option(default=DEFAULT_OUTPUT_PATH, help="Results file, results are appended as JSON lines"),
+):
+    """Place and pickup latency, transactions per second and integrity error rate."""
+    config = get_config(storage_engine)
+    results = []
+    for order_count in orders:
+        for worker_count in workers:
+            result = benchmark_placement(config, order_count, worker_count, seed)
+            logger.info(f"Placement benchmark: {result}")
+            results.append(result)
+    write_results(results, output)
+
+
+@app.command()
+def schedule(
+    storage_engine: str = Option(default=StorageEngine.MEMORY, help=f"Storage engine, one of: {STORAGE_ENGINES}"),
+    orders: List[int] = Option(default=[100, 1000], help="Order counts, repeat the option for several"),
+    order_rate: List[int] = Option(default=[10, 50], help="Order rates in milliseconds, repeat for several"),
+    min_pickup: int = Option(default=4, min=1, help="Minimum pickup time in seconds"),
+    max_pickup: int = Option(default=8, min=1, help="Maximum pickup time in seconds"),
+    seed: int = Option(default=1, help="Seed of generated problems"),
+    output: str = Option(default=DEFAULT_OUTPUT_PATH, help="Results file, results are appended as JSON lines"),
+):
+    """End-to-end scheduler throughput and dispatch lag in real time."""
+    results = []
+    for rate in order_rate:
+        config = get_config(storage_engine, order_rate=rate, min_pickup=min_pickup, max_pickup=max_pickup)
+        for order_count in orders:
+            result = benchmark_schedule(config, order_count, seed)
+            logger.info(f"Schedule benchmark: {result}")
+            results.append(result)
+    write_results(results, output)
+
+
+@app.command()
+def compare(baseline: str, current: str = Argument(default=DEFAULT_OUTPUT_PATH)):
+    """Prints relative metric changes between two results files as JSON lines."""
+    for row in compare_results(read_results(baseline), read_results(current)):
+        typer.echo(json.dumps(row))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    # jobs log every completed job
+    logging.getLogger("jobs").setLevel(logging.WARNING)
+    app()
@@ -5,32 +5,68 @@ from typing import List
 from logging import getLogger
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.utils import quote
+from urllib3.util.retry import Retry
+
+import constants
+from clients.problem_cache import ProblemCache
 
 from models.action import Action
-from models.order import Order
 from models.problem import Problem
+from models.problem_stream import CHUNK_SIZE, stream_problem_response
 
 logger = getLogger(__name__)
 
 
 class ChallengeClient:
-    def __init__(self, endpoint: str, auth: str, fetch_problem_timeout_seconds=15, submit_timeout_seconds=30):
+    """
+    Requests go through a pooled session shared by all clients (see create_session), so connections are kept
+    alive between problems and submissions. With a cache, problems with a given seed are downloaded once.
+    """
+
+    def __init__(
+            self,
+            endpoint: str,
+            auth: str,
+            fetch_problem_timeout_seconds=15,
+            submit_timeout_seconds=30,
+            session: requests.Session = None,
+            cache: ProblemCache = None):
         self.endpoint = endpoint.rstrip('/')
         self.auth = auth
         self.fetch_problem_timeout_seconds = fetch_problem_timeout_seconds
         self.submit_timeout_seconds = submit_timeout_seconds
+        self.session = session if session is not None else shared_session
+        self.cache = cache
 
     def fetch_problem(self, name: str, seed: int = 0) -> Problem:
+        return self.stream_problem(name, seed).load_orders()
+
+    def stream_problem(self, name: str, seed: int = 0) -> Problem:
+        """
+        Problem whose orders are parsed while the response body downloads, see Problem.iter_orders.
+        Problems with a seed are read from the cache when there, random ones (seed zero) are never cached.
+        """
+        cacheable = self.cache is not None and seed != 0
+        if cacheable:
+            problem = self.cache.get(self.endpoint, self.auth, name, seed)
+            if problem is not None:
+                logger.info(f"Loaded cached test problem, id={problem.test_id}, name={name!r}, seed={seed}.")
+                return problem
         if seed == 0:
             seed = random.randint(1, 1 << 63)
 
         url = f"{self.endpoint}/interview/challenge/new?auth={self.auth}&name={quote(name)}&seed={seed}"
-        response = requests.get(url, headers={"Accept": "application/json"}, timeout=self.fetch_problem_timeout_seconds)
+        response = self.session.get(
+            url, headers={"Accept": "application/json"}, timeout=self.fetch_problem_timeout_seconds, stream=True)
         response.raise_for_status()
         test_id = response.headers.get("x-test-id")
-        logger.info(f"Fetched new test problem, id={test_id}: {url}")
-        return Problem(test_id, Order.parse_orders(response.json()))
+        logger.info(f"Fetching new test problem, id={test_id}: {url}")
+        body = _iter_content(response)
+        if cacheable:
+            body = self.cache.put(self.endpoint, self.auth, name, seed, test_id, body)
+        return stream_problem_response(test_id, body)
 
     def submit_solution(
         self,
@@ -43,7 +79,7 @@ class ChallengeClient:
         solution = Solution(options=Options(rate, min_time, max_time), actions=actions)
         url = f"{self.endpoint}/interview/challenge/solve?auth={self.auth}"
         headers = {"Content-Type": "application/json", "x-test-id": test_id}
-        response = requests.post(url, data=solution.encode(), headers=headers, timeout=self.submit_timeout_seconds)
+        response = self.session.post(url, data=solution.encode(), headers=headers, timeout=self.submit_timeout_seconds)
         response.raise_for_status()
         return response.text
 
@@ -67,6 +103,40 @@ class Solution:
         return json.dumps(
             {
                 "options": self.options.to_dict(),
-                "actions": [action.__dict__ for action in self.actions],
+                "actions": [_encode_action(action) for action in self.actions],
             }
         )
+
+
+def _encode_action(action: Action) -> dict:
+    # the challenge server takes these fields only, the target shelf is for the kitchen's own validation
+    return {"id": action.id, "timestamp": action.timestamp, "action": action.action_type}
+
+
+def _iter_content(response: requests.Response):
+    with response:
+        yield from response.iter_content(CHUNK_SIZE)
+
+
+def create_session() -> requests.Session:
+    """
+    Session with a connection pool kept alive between requests and gzip responses. Connection errors and
+    throttling or gateway responses are retried with exponential backoff; failed submissions are retried
+    only when the request never reached the server, so a solution is not submitted twice.
+    """
+    retry = Retry(
+        total=constants.CHALLENGE_MAX_RETRIES,
+        backoff_factor=constants.CHALLENGE_RETRY_BACKOFF_SECONDS,
+        status_forcelist=(429, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=constants.CHALLENGE_MAX_CONNECTIONS, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+# connections to the challenge server are shared by all clients in the process
+shared_session = create_session()
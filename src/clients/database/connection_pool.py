@@ -1,16 +1,29 @@
 from sqlalchemy import create_engine, Engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 
 from models.database_config import DatabaseConfig
 
 
 def get_database_connection_pool(db_config: DatabaseConfig, max_connections=1, max_wait=1) -> Engine:
-    connection_string = (
-        f"postgresql+psycopg2://{db_config.user}:{db_config.password}"
-        f"@{db_config.host}:{db_config.port}/{db_config.db_name}"
-    )
     return create_engine(
-        connection_string,
+        get_connection_string(db_config, "psycopg2"),
         pool_size=max_connections,
         pool_timeout=max_wait,
-        pool_pre_ping=True,
+        pool_pre_ping=db_config.pool.pre_ping,
+    )
+
+
+def get_async_database_connection_pool(db_config: DatabaseConfig, max_connections=1, max_wait=1) -> AsyncEngine:
+    return create_async_engine(
+        get_connection_string(db_config, "asyncpg"),
+        pool_size=max_connections,
+        pool_timeout=max_wait,
+        pool_pre_ping=db_config.pool.pre_ping,
+    )
+
+
+def get_connection_string(db_config: DatabaseConfig, driver: str) -> str:
+    return (
+        f"postgresql+{driver}://{db_config.user}:{db_config.password}"
+        f"@{db_config.host}:{db_config.port}/{db_config.db_name}"
     )
@@ -1,21 +1,42 @@
+import asyncio
 from contextlib import contextmanager
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy import text, Connection
+from sqlalchemy.exc import IntegrityError
 
+from clients.database.keyed_locks import placement_locks
 from constants import (
+    DEFAULT_KITCHEN_ID,
     StorageType,
     TransactionIsolationLevel,
-    MaxInventory,
 )
+from models.clock import Clock, from_epoch_us
 from models.inventory import Inventory
 from models.order import Order
+from models.storage_action import StorageAction
 from models.storage_order import StorageOrder
 
 
 class DatabaseClient:
+    """
+    Queries are scoped to one kitchen. Kitchens have their own inventory rows and orders,
+    so clients of different kitchens can share a database without affecting each other.
+
+    With a clock, every transaction sets "kitchen.now" to its time, so order ages are computed
+    in that time instead of the database time (see "kitchen_now" database function).
+    """
+
+    def __init__(self, kitchen_id: str = DEFAULT_KITCHEN_ID, clock: Clock = None):
+        self.kitchen_id = kitchen_id
+        self.clock = clock
+        self.placement_lock = placement_locks.get(kitchen_id)
+        # runs in asyncio mode have a client per kitchen, the lock binds to the run's event loop on first use
+        self.async_placement_lock = asyncio.Lock()
+
     def fetch_inventory(self, connection: Connection) -> Inventory:
         result = connection.execute(
-            text("SELECT storage_type, inventory_count FROM inventory;"),
+            text("SELECT storage_type, inventory_count FROM inventory WHERE kitchen_id = :kitchen_id;"),
+            {"kitchen_id": self.kitchen_id},
         )
         inventory_map = {row[0]: row[1] for row in result}
         return Inventory(
@@ -24,104 +45,68 @@ class DatabaseClient:
             room=inventory_map[StorageType.ROOM],
         )
 
+    def update_capacities(self, connection: Connection, capacities: Inventory) -> None:
+        """
+        Set shelf capacities. Inventory rows are created when missing.
+        Raises ValueError when a shelf holds more orders than its new capacity.
+        """
+        try:
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO inventory (kitchen_id, storage_type, inventory_count, capacity)
+                    VALUES
+                        (:kitchen_id, 'hot', 0, :hot),
+                        (:kitchen_id, 'cold', 0, :cold),
+                        (:kitchen_id, 'room', 0, :room)
+                    ON CONFLICT (kitchen_id, storage_type) DO UPDATE SET capacity = EXCLUDED.capacity;
+                    """
+                ),
+                {
+                    "kitchen_id": self.kitchen_id,
+                    "hot": capacities.hot,
+                    "cold": capacities.cold,
+                    "room": capacities.room,
+                },
+            )
+        except IntegrityError as e:
+            raise ValueError(f"Shelves hold more orders than new capacities allow. Error: {e}") from e
+
     def fetch_order_to_move(
             self,
             connection: Connection) -> Optional[StorageOrder]:
+        """
+        Room order with the highest relative age among orders whose best storage has space.
+        Served by an index on "expires_at", see "find_order_to_move" database function.
+        """
         result = connection.execute(
             text(
                 """
-                SELECT
-                    (SELECT COUNT(*) FROM order_storage WHERE storage_type = 'hot') AS hot_count,
-                    (SELECT COUNT(*) FROM order_storage WHERE storage_type = 'cold') AS cold_count
-                """
-            )
-        )
-        hot_count, cold_count = result.fetchone()
-
-        storage_types = []
-        if hot_count < MaxInventory.HOT:
-            storage_types.append(StorageType.HOT)
-        if cold_count < MaxInventory.COLD:
-            storage_types.append(StorageType.COLD)
-
-        if not storage_types:
-            return None
-
-        storage_types_str = "('" + "', '".join(storage_types) + "')"
-
-        result = connection.execute(
-            text(
-                f"""
-                SELECT
-                    order_id,
-                    order_name,
-                    storage_type,
-                    best_storage_type,
-                    fresh_max_age,
-                    cumulative_age - fresh_max_age +
-                        CASE
-                            WHEN storage_type = best_storage_type THEN
-                                EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
-                            ELSE
-                                2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
-                        END AS relative_age
-                FROM order_storage
-                WHERE storage_type = 'room' AND best_storage_type IN {storage_types_str}
-                ORDER BY relative_age DESC
-                LIMIT 1;
+                SELECT order_id, order_name, storage_type, best_storage_type, fresh_max_age, relative_age
+                FROM find_order_to_move(:kitchen_id);
                 """
-            )
+            ),
+            {"kitchen_id": self.kitchen_id},
         )
-
-        row = result.fetchone()
-        if row is None:
-            return None
-
-        (
-            order_id,
-            order_name,
-            storage_type,
-            best_storage_type,
-            fresh_max_age,
-            age,
-        ) = row
-        order = Order(order_id, order_name, best_storage_type, fresh_max_age)
-        return StorageOrder(storage_type, age, order)
+        return self._get_storage_order(result.fetchone())
 
     def fetch_order_to_discard(
             self,
             connection: Connection) -> Optional[StorageOrder]:
+        """
+        Room order with the highest relative age.
+        Served by an index on "expires_at", see "find_order_to_discard" database function.
+        """
         result = connection.execute(
             text(
                 """
-                SELECT
-                    order_id,
-                    order_name,
-                    storage_type,
-                    best_storage_type,
-                    fresh_max_age,
-                    cumulative_age - fresh_max_age +
-                        CASE
-                            WHEN storage_type = best_storage_type THEN
-                                EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
-                            ELSE
-                                2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
-                        END AS relative_age
-                FROM order_storage
-                WHERE storage_type = 'room'
-                ORDER BY relative_age DESC
-                LIMIT 1;
+                SELECT order_id, order_name, storage_type, best_storage_type, fresh_max_age, relative_age
+                FROM find_order_to_discard(:kitchen_id);
                 """
-            )
+            ),
+            {"kitchen_id": self.kitchen_id},
         )
-        row = result.fetchone()
-        if row is None:
-            return None
-
-        order_id, order_name, storage_type, best_storage_type, freshness, age = row
-        order = Order(order_id, order_name, best_storage_type, freshness)
-        storage_order = StorageOrder(storage_type, age, order)
-        return storage_order
+        return self._get_storage_order(result.fetchone())
 
     def move_order(
             self,
@@ -138,15 +123,16 @@ class DatabaseClient:
                         WHEN storage_type = :from_storage THEN inventory_count - 1
                         WHEN storage_type = :to_storage THEN inventory_count + 1
                     END
-                    WHERE storage_type IN (:from_storage, :to_storage)
+                    WHERE kitchen_id = :kitchen_id AND storage_type IN (:from_storage, :to_storage)
                     RETURNING storage_type
                 )
                 UPDATE order_storage
                 SET storage_type = :to_storage
-                WHERE order_id = :order_id and storage_type = :from_storage;
+                WHERE kitchen_id = :kitchen_id AND order_id = :order_id and storage_type = :from_storage;
                 """
             ),
             {
+                "kitchen_id": self.kitchen_id,
                 "from_storage": from_storage,
                 "to_storage": to_storage,
                 "order_id": order_id,
@@ -164,17 +150,26 @@ class DatabaseClient:
                 """
                 WITH inserted_order AS (
                     INSERT INTO order_storage (
-                        order_id, order_name, storage_type, best_storage_type, fresh_max_age, cumulative_age
+                        kitchen_id,
+                        order_id,
+                        order_name,
+                        storage_type,
+                        best_storage_type,
+                        fresh_max_age,
+                        cumulative_age
+                    )
+                    VALUES (
+                        :kitchen_id, :order_id, :order_name, :storage_type, :best_storage_type, :fresh_max_age, 0
                     )
-                    VALUES (:order_id, :order_name, :storage_type, :best_storage_type, :fresh_max_age, 0)
                     RETURNING storage_type
                 )
                 UPDATE inventory
                 SET inventory_count = inventory_count + 1
-                WHERE storage_type = :storage_type;
+                WHERE kitchen_id = :kitchen_id AND storage_type = :storage_type;
                 """
             ),
             {
+                "kitchen_id": self.kitchen_id,
                 "order_id": order.id,
                 "order_name": order.name,
                 "storage_type": storage_type,
@@ -183,6 +178,31 @@ class DatabaseClient:
             },
         )
 
+    def place_order(
+            self,
+            connection: Connection,
+            order: Order) -> List[StorageAction]:
+        """
+        Place an order with a single call to the "place_order" database function.
+        The function picks best storage, room storage, move or discard atomically and returns actions taken.
+        """
+        result = connection.execute(
+            text(
+                """
+                SELECT action_type, action_order_id, action_storage_type
+                FROM place_order(:kitchen_id, :order_id, :order_name, :temp, :freshness);
+                """
+            ),
+            {
+                "kitchen_id": self.kitchen_id,
+                "order_id": order.id,
+                "order_name": order.name,
+                "temp": order.temp,
+                "freshness": order.freshness,
+            },
+        )
+        return [StorageAction(*row) for row in result]
+
     def delete_order_if_exists(
             self,
             connection: Connection,
@@ -196,15 +216,15 @@ class DatabaseClient:
                 """
                 WITH deleted_order AS (
                     DELETE FROM order_storage
-                    WHERE order_id = :order_id
+                    WHERE kitchen_id = :kitchen_id AND order_id = :order_id
                     RETURNING storage_type
                 )
                 UPDATE inventory
                 SET inventory_count = inventory_count - 1
-                WHERE storage_type = (SELECT storage_type FROM deleted_order);
+                WHERE kitchen_id = :kitchen_id AND storage_type = (SELECT storage_type FROM deleted_order);
                 """,
             ),
-            {"order_id": order_id},
+            {"kitchen_id": self.kitchen_id, "order_id": order_id},
         )
 
         return result.rowcount == 1
@@ -218,16 +238,35 @@ class DatabaseClient:
                 """
                 WITH deleted_order AS (
                     DELETE FROM order_storage
+                    WHERE kitchen_id = :kitchen_id
                     RETURNING storage_type
                 )
                 UPDATE inventory
-                SET inventory_count = 0;
+                SET inventory_count = 0
+                WHERE kitchen_id = :kitchen_id;
                 """,
             ),
+            {"kitchen_id": self.kitchen_id},
         )
 
         return result.rowcount
 
+    def delete_kitchen(self, connection: Connection) -> None:
+        """Delete the kitchen's orders and inventory rows."""
+        connection.execute(
+            text(
+                """
+                WITH deleted_order AS (
+                    DELETE FROM order_storage
+                    WHERE kitchen_id = :kitchen_id
+                )
+                DELETE FROM inventory
+                WHERE kitchen_id = :kitchen_id;
+                """,
+            ),
+            {"kitchen_id": self.kitchen_id},
+        )
+
     def fetch_order_if_exists(
             self,
             connection: Connection,
@@ -247,32 +286,17 @@ class DatabaseClient:
                     cumulative_age +
                         CASE
                             WHEN storage_type = best_storage_type THEN
-                                EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
+                                EXTRACT(EPOCH FROM (kitchen_now() - updated_at))
                             ELSE
-                                2 * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - updated_at))
+                                2 * EXTRACT(EPOCH FROM (kitchen_now() - updated_at))
                         END AS age
                 FROM order_storage
-                WHERE order_id = :order_id;
+                WHERE kitchen_id = :kitchen_id AND order_id = :order_id;
                 """,
             ),
-            {"order_id": order_id},
+            {"kitchen_id": self.kitchen_id, "order_id": order_id},
         )
-        row = result.fetchone()
-        if row is None:
-            return None
-
-        (
-            order_id,
-            order_name,
-            storage_type,
-            best_storage_type,
-            fresh_max_age,
-            age,
-        ) = row
-
-        order = Order(order_id, order_name, best_storage_type, fresh_max_age)
-        storage_order = StorageOrder(storage_type, age, order)
-        return storage_order
+        return self._get_storage_order(result.fetchone())
 
     @contextmanager
     def transaction(
@@ -285,8 +309,32 @@ class DatabaseClient:
             isolation_level=isolation_level.value)
         try:
             connection.begin()
+            if self.clock is not None:
+                self._set_kitchen_now(connection)
             yield connection
             connection.commit()
         except Exception:
             connection.rollback()
             raise
+
+    def _set_kitchen_now(self, connection: Connection) -> None:
+        connection.execute(
+            text("SELECT set_config('kitchen.now', :now, true);"),
+            {"now": from_epoch_us(self.clock.now_us()).isoformat()},
+        )
+
+    @staticmethod
+    def _get_storage_order(row) -> Optional[StorageOrder]:
+        if row is None:
+            return None
+
+        (
+            order_id,
+            order_name,
+            storage_type,
+            best_storage_type,
+            fresh_max_age,
+            age,
+        ) = row
+        order = Order(order_id, order_name, best_storage_type, fresh_max_age)
+        return StorageOrder(storage_type, age, order)
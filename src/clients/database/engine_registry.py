@@ -0,0 +1,161 @@
+import logging
+import time
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from typing import Dict, Iterator, List
+
+from sqlalchemy import Connection, Engine, create_engine
+
+import constants
+from clients.database.connection_pool import get_connection_string
+from models.database_config import DatabaseConfig
+from models.server_config import ServerConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Connection checkout counts and time spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return dict(
+                checkouts=self.checkouts,
+                mean_wait_seconds=self.total_wait_seconds / self.checkouts if self.checkouts else 0,
+                max_wait_seconds=self.max_wait_seconds,
+            )
+
+
+class SharedEngine:
+    """
+    Process-wide engine handed to runs in place of a per-run pool. Runs dispose their pool when
+    they end, for a shared engine that is a no-op, the registry closes it on shutdown.
+    """
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> Connection:
+        started = time.perf_counter()
+        connection = self.engine.connect()
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def dispose(self) -> None:
+        pass
+
+    def get_metrics(self) -> dict:
+        pool = self.engine.pool
+        return dict(
+            name=self.name,
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            **self.metrics.to_dict(),
+        )
+
+
+class EngineRegistry:
+    """
+    One engine per database for the whole process, so runs reuse open connections instead of
+    connecting and authenticating on every request.
+
+    The pool holds a connection per worker thread of a run and may overflow up to max_runs runs.
+    Every PostgreSQL run is admitted through admit_run first, so runs never need more connections than
+    the pool has. Connections are recycled after DB_POOL_RECYCLE_SECONDS and pinged before checkout
+    only if DB_POOL_PRE_PING is set.
+    """
+
+    def __init__(self, max_runs: int = 1):
+        self.max_runs = max_runs
+        self._engines: Dict[str, SharedEngine] = {}
+        self._lock = Lock()
+        self._run_slots = BoundedSemaphore(max_runs)
+
+    @contextmanager
+    def admit_run(self) -> Iterator[None]:
+        """Waits until fewer than max_runs database runs are in progress in this process."""
+        if not self._run_slots.acquire(blocking=False):
+            logger.info(f"{self.max_runs} database runs in progress, waiting for one to finish.")
+            self._run_slots.acquire()
+        try:
+            yield
+        finally:
+            self._run_slots.release()
+
+    def get_engine(self, db_config: DatabaseConfig) -> SharedEngine:
+        connection_string = get_connection_string(db_config, "psycopg2")
+        with self._lock:
+            shared_engine = self._engines.get(connection_string)
+            if shared_engine is None:
+                shared_engine = SharedEngine(
+                    f"{db_config.host}:{db_config.port}/{db_config.db_name}",
+                    self._create_engine(connection_string, db_config),
+                )
+                self._engines[connection_string] = shared_engine
+            return shared_engine
+
+    def warm_up(self, db_config: DatabaseConfig) -> None:
+        """Open pool_size connections up front so the first run doesn't wait for them."""
+        shared_engine = self.get_engine(db_config)
+        connections: List[Connection] = []
+        try:
+            for _ in range(shared_engine.engine.pool.size()):
+                connections.append(shared_engine.engine.connect())
+        finally:
+            for connection in connections:
+                connection.close()
+        logger.info(f"Warmed up {len(connections)} connections to {shared_engine.name}.")
+
+    def get_metrics(self) -> List[dict]:
+        with self._lock:
+            return [shared_engine.get_metrics() for shared_engine in self._engines.values()]
+
+    def dispose_all(self) -> None:
+        with self._lock:
+            for shared_engine in self._engines.values():
+                shared_engine.engine.dispose()
+            self._engines.clear()
+
+    def _create_engine(self, connection_string: str, db_config: DatabaseConfig) -> Engine:
+        return create_engine(
+            connection_string,
+            pool_size=constants.MAX_DB_CONNECTIONS,
+            max_overflow=constants.MAX_DB_CONNECTIONS * (self.max_runs - 1),
+            pool_timeout=constants.MAX_WAIT_DB_CONNECTION_SECONDS,
+            pool_pre_ping=db_config.pool.pre_ping,
+            pool_recycle=db_config.pool.recycle_seconds,
+        )
+
+
+def get_max_database_runs(db_config: DatabaseConfig, server_config: ServerConfig) -> int:
+    """
+    PostgreSQL runs a worker process admits at once. Worker processes share DB_MAX_CONNECTIONS, a run uses up to
+    a connection per job worker thread and the shared pool keeps that many open while runs in asyncio mode use
+    their own pools.
+    """
+    connections_per_process = db_config.pool.max_connections // server_config.workers
+    max_runs = connections_per_process // constants.MAX_DB_CONNECTIONS - 1
+    if max_runs < 1:
+        logger.warning(
+            f"DB_MAX_CONNECTIONS={db_config.pool.max_connections} is too few for {server_config.workers} workers, "
+            f"each needs {2 * constants.MAX_DB_CONNECTIONS} connections for a single run.")
+    return max(1, max_runs)
+
+
+engine_registry = EngineRegistry(get_max_database_runs(DatabaseConfig(), ServerConfig()))
@@ -0,0 +1,15 @@
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+# SQLSTATE class of transactions rolled back by the database: serialization failures and deadlocks
+TRANSACTION_ROLLBACK_CLASS = "40"
+
+
+def is_transaction_conflict(error: DBAPIError) -> bool:
+    """
+    Errors caused by concurrent transactions rather than by the transaction itself, so they may succeed when retried.
+    Memory storage raises IntegrityError for the constraints the database would enforce.
+    """
+    if isinstance(error, IntegrityError):
+        return True
+    sqlstate = getattr(error.orig, "pgcode", None) or ""
+    return sqlstate.startswith(TRANSACTION_ROLLBACK_CLASS)
@@ -0,0 +1,60 @@
+import heapq
+import itertools
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class IndexedHeap:
+    """
+    Min-heap of values addressed by id. Pushing an id that is already in the heap replaces its value.
+
+    Removed and replaced entries stay in the heap and are skipped when they reach the top (lazy deletion),
+    so push, remove and peek are O(log n) amortized. The heap is rebuilt once stale entries outnumber live ones.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[Any, int, Hashable, Any]] = []
+        self._entries: Dict[Hashable, Tuple[Any, int, Hashable, Any]] = {}
+        # tie breaker, values don't have to be comparable
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._entries
+
+    def push(self, item_id: Hashable, key: Any, value: Any) -> None:
+        entry = (key, next(self._seq), item_id, value)
+        self._entries[item_id] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def remove(self, item_id: Hashable) -> Optional[Any]:
+        entry = self._entries.pop(item_id, None)
+        return entry[3] if entry is not None else None
+
+    def peek(self) -> Optional[Any]:
+        """Value with the smallest key or None if the heap is empty."""
+        heap = self._heap
+        while heap:
+            entry = heap[0]
+            if self._entries.get(entry[2]) is entry:
+                return entry[3]
+            heapq.heappop(heap)
+        return None
+
+    def pop(self) -> Optional[Any]:
+        value = self.peek()
+        if value is not None:
+            entry = heapq.heappop(self._heap)
+            del self._entries[entry[2]]
+        return value
+
+    def clear(self) -> None:
+        self._heap = []
+        self._entries = {}
+
+    def _compact(self) -> None:
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
@@ -0,0 +1,72 @@
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.exc import DBAPIError
+
+from clients.database.errors import is_transaction_conflict
+from constants import TransactionIsolationLevel
+from models.metrics import KitchenMetrics
+
+
+class InstrumentedDatabaseClient:
+    """
+    Wraps DatabaseClient or MemoryDatabaseClient and records the duration of every method call and
+    transaction. Transactions rolled back by a conflict with a concurrent one are counted as conflicts.
+    """
+
+    def __init__(self, db_client, metrics: KitchenMetrics):
+        self._db_client = db_client
+        self._metrics = metrics
+        self._transaction_seconds = metrics.database_call_seconds.labels("transaction")
+
+    def __getattr__(self, name):
+        attribute = getattr(self._db_client, name)
+        if not callable(attribute):
+            return attribute
+
+        histogram = self._metrics.database_call_seconds.labels(name)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        # later lookups find the wrapper without going through __getattr__
+        setattr(self, name, timed)
+        return timed
+
+    @contextmanager
+    def transaction(
+        self,
+        connection,
+        isolation_level: TransactionIsolationLevel = TransactionIsolationLevel.READ_COMMITTED,
+    ):
+        started = time.perf_counter()
+        try:
+            with self._db_client.transaction(connection, isolation_level):
+                yield connection
+        except DBAPIError as e:
+            if is_transaction_conflict(e):
+                self._metrics.transaction_conflicts_total.labels().inc()
+            raise
+        finally:
+            self._transaction_seconds.observe(time.perf_counter() - started)
+
+
+class InstrumentedConnectionPool:
+    """Wraps a synchronous connection pool and records how long every checkout waits for a connection."""
+
+    def __init__(self, connection_pool, metrics: KitchenMetrics):
+        self._connection_pool = connection_pool
+        self._connection_wait_seconds = metrics.connection_wait_seconds.labels()
+
+    def __getattr__(self, name):
+        return getattr(self._connection_pool, name)
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = self._connection_pool.connect()
+        self._connection_wait_seconds.observe(time.perf_counter() - started)
+        return connection
@@ -0,0 +1,44 @@
+from threading import Lock
+from typing import Hashable
+from weakref import WeakValueDictionary
+
+
+class KeyedLock:
+    """Lock of a single key, see KeyedLocks."""
+
+    __slots__ = ("_lock", "__weakref__")
+
+    def __init__(self):
+        self._lock = Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._lock.release()
+
+
+class KeyedLocks:
+    """
+    A lock per key. Locks are created on first use and dropped once nothing references them,
+    so keys never wait for each other and locks of finished kitchens don't pile up.
+    """
+
+    def __init__(self):
+        self._locks: WeakValueDictionary = WeakValueDictionary()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> KeyedLock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = KeyedLock()
+            return lock
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+# placements of a kitchen lock all of its inventory rows, they wait here instead of holding a connection
+placement_locks = KeyedLocks()
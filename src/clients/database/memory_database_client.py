@@ -0,0 +1,149 @@
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional
+
+from clients.database.memory_storage import MemoryConnection, ShelvedOrder
+from constants import StorageType, TransactionIsolationLevel
+from models.action import Action
+from models.inventory import Inventory
+from models.order import Order
+from models.storage_action import StorageAction
+from models.storage_order import StorageOrder
+
+
+class MemoryDatabaseClient:
+    """
+    In-process counterpart of DatabaseClient with the same methods and semantics.
+    Transactions hold the storage lock, so every transaction behaves as serializable.
+    Orders to move or discard are chosen by the storage's room shelf policy, relative age by default.
+    """
+
+    # the storage lock already serializes placements
+    placement_lock = nullcontext()
+    async_placement_lock = nullcontext()
+
+    def fetch_inventory(self, connection: MemoryConnection) -> Inventory:
+        with connection.storage.lock:
+            return connection.storage.get_inventory()
+
+    def fetch_order_to_move(self, connection: MemoryConnection) -> Optional[StorageOrder]:
+        storage = connection.storage
+        with storage.lock:
+            storage_types = [
+                storage_type
+                for storage_type in (StorageType.HOT, StorageType.COLD)
+                if storage.has_room(storage_type)
+            ]
+            if not storage_types:
+                return None
+
+            shelved = storage.find_victim_in_room(storage_types)
+            return self._get_victim_storage_order(connection, shelved)
+
+    def fetch_order_to_discard(self, connection: MemoryConnection) -> Optional[StorageOrder]:
+        storage = connection.storage
+        with storage.lock:
+            shelved = storage.find_victim_in_room([StorageType.HOT, StorageType.COLD, StorageType.ROOM])
+            return self._get_victim_storage_order(connection, shelved)
+
+    def move_order(
+            self,
+            connection: MemoryConnection,
+            from_storage: str,
+            to_storage: str,
+            order_id: str) -> None:
+        storage = connection.storage
+        with storage.lock:
+            previous = storage.move(order_id, from_storage, to_storage)
+            if previous is not None:
+                connection.record_undo(lambda: storage.restore(previous))
+
+    def insert_order(
+            self,
+            connection: MemoryConnection,
+            order: Order,
+            storage_type: str) -> None:
+        storage = connection.storage
+        with storage.lock:
+            storage.insert(order, storage_type)
+            connection.record_undo(lambda: storage.remove(order.id))
+
+    def place_order(
+            self,
+            connection: MemoryConnection,
+            order: Order) -> List[StorageAction]:
+        """Same decision as the "place_order" database function, made while holding the storage lock."""
+        storage = connection.storage
+        with storage.lock:
+            actions = []
+            storage_type = order.temp if storage.has_room(order.temp) else StorageType.ROOM
+
+            if not storage.has_room(storage_type):
+                order_to_move = self.fetch_order_to_move(connection)
+                if order_to_move is not None:
+                    self.move_order(connection, StorageType.ROOM, order_to_move.order.temp, order_to_move.id)
+                    actions.append(StorageAction(Action.MOVE, order_to_move.id, order_to_move.order.temp))
+                else:
+                    order_to_discard = self.fetch_order_to_discard(connection)
+                    self.delete_order_if_exists(connection, order_to_discard.id)
+                    actions.append(StorageAction(Action.DISCARD, order_to_discard.id, StorageType.ROOM))
+
+            self.insert_order(connection, order, storage_type)
+            actions.append(StorageAction(Action.PLACE, order.id, storage_type))
+            return actions
+
+    def delete_order_if_exists(
+            self,
+            connection: MemoryConnection,
+            order_id: str) -> bool:
+        storage = connection.storage
+        with storage.lock:
+            deleted = storage.remove(order_id)
+            if deleted is None:
+                return False
+            connection.record_undo(lambda: storage.restore(deleted))
+            return True
+
+    def delete_all_orders(self, connection: MemoryConnection) -> int:
+        with connection.storage.lock:
+            return connection.storage.clear()
+
+    def delete_kitchen(self, connection: MemoryConnection) -> None:
+        """Storage belongs to a single kitchen, deleting the kitchen clears it."""
+        self.delete_all_orders(connection)
+
+    def fetch_order_if_exists(
+            self,
+            connection: MemoryConnection,
+            order_id: str) -> Optional[StorageOrder]:
+        storage = connection.storage
+        with storage.lock:
+            shelved = storage.get(order_id)
+            if shelved is None:
+                return None
+            return StorageOrder(shelved.storage_type, shelved.get_age(storage.clock()), shelved.order)
+
+    @contextmanager
+    def transaction(
+        self,
+        connection: MemoryConnection,
+        isolation_level: TransactionIsolationLevel = TransactionIsolationLevel.READ_COMMITTED,
+    ):
+        # isolation level is accepted for interface compatibility, the lock makes transactions serializable
+        del isolation_level
+        with connection.storage.lock:
+            try:
+                connection.begin()
+                yield connection
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    @staticmethod
+    def _get_victim_storage_order(
+            connection: MemoryConnection,
+            shelved: Optional[ShelvedOrder]) -> Optional[StorageOrder]:
+        if shelved is None:
+            return None
+        relative_age = shelved.get_relative_age(connection.storage.clock())
+        return StorageOrder(shelved.storage_type, relative_age, shelved.order)
@@ -0,0 +1,261 @@
+import itertools
+import time
+from threading import RLock
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from clients.database.indexed_heap import IndexedHeap
+from clients.database.victim_policies import RelativeAgePolicy, RoomShelfPolicy
+from constants import MaxInventory, StorageType, STORAGE_TYPES
+from models.inventory import Inventory
+from models.order import Order
+
+
+class MemoryIntegrityError(IntegrityError):
+    """
+    Raised when an in-memory operation violates a constraint the Postgres schema would enforce.
+    Subclasses IntegrityError so jobs retry it exactly like a database constraint violation.
+    """
+
+    def __init__(self, operation: str, message: str):
+        super().__init__(operation, None, ValueError(message))
+
+
+class ShelvedOrder:
+    __slots__ = ("order", "storage_type", "cumulative_age", "updated_at", "placed_at", "expires_at", "seq")
+
+    def __init__(
+            self,
+            order: Order,
+            storage_type: str,
+            cumulative_age: float,
+            updated_at: float,
+            seq: int,
+            placed_at: float = None):
+        self.order = order
+        self.storage_type = storage_type
+        self.cumulative_age = cumulative_age
+        self.updated_at = updated_at
+        self.placed_at = updated_at if placed_at is None else placed_at
+        self.seq = seq
+        self.expires_at = self._get_expires_at()
+
+    @property
+    def decay_rate(self) -> int:
+        return 1 if self.storage_type == self.order.temp else 2
+
+    def get_age(self, now: float) -> float:
+        return self.cumulative_age + self.decay_rate * (now - self.updated_at)
+
+    def get_relative_age(self, now: float) -> float:
+        return self.decay_rate * (now - self.expires_at)
+
+    def _get_expires_at(self) -> float:
+        """Moment when age reaches freshness. Ordering by it equals ordering by relative age for a fixed rate."""
+        return self.updated_at + (self.order.freshness - self.cumulative_age) / self.decay_rate
+
+
+class MemoryStorage:
+    """
+    In-process replacement for the "order_storage" and "inventory" tables.
+
+    Room shelf orders are indexed by best storage type in heaps ordered by the room shelf policy, so victim
+    selection looks at the top of at most three heaps instead of scanning the shelf.
+    """
+
+    def __init__(
+            self,
+            capacities: Inventory = None,
+            clock: Callable[[], float] = time.time,
+            policy: RoomShelfPolicy = None):
+        if capacities is None:
+            capacities = Inventory(hot=MaxInventory.HOT, cold=MaxInventory.COLD, room=MaxInventory.ROOM)
+        self.capacities = {
+            StorageType.HOT: capacities.hot,
+            StorageType.COLD: capacities.cold,
+            StorageType.ROOM: capacities.room,
+        }
+        self.clock = clock
+        self.policy = policy or RelativeAgePolicy()
+        self.lock = RLock()
+        self._orders: Dict[str, ShelvedOrder] = {}
+        self._counts = {storage_type: 0 for storage_type in STORAGE_TYPES}
+        self._room_heaps: Dict[str, IndexedHeap] = {storage_type: IndexedHeap() for storage_type in STORAGE_TYPES}
+        self._seq = itertools.count()
+
+    def get_inventory(self) -> Inventory:
+        return Inventory(
+            hot=self._counts[StorageType.HOT],
+            cold=self._counts[StorageType.COLD],
+            room=self._counts[StorageType.ROOM],
+        )
+
+    def has_room(self, storage_type: str) -> bool:
+        return self._counts[storage_type] < self.capacities[storage_type]
+
+    def get(self, order_id: str) -> Optional[ShelvedOrder]:
+        return self._orders.get(order_id)
+
+    def insert(self, order: Order, storage_type: str, cumulative_age: float = 0, updated_at: float = None) -> None:
+        if order.id in self._orders:
+            raise MemoryIntegrityError("insert_order", f"Duplicate order id: {order.id}")
+        if not self.has_room(storage_type):
+            raise MemoryIntegrityError("insert_order", f"Storage {storage_type} is full")
+
+        if updated_at is None:
+            updated_at = self.clock()
+        shelved = ShelvedOrder(order, storage_type, cumulative_age, updated_at, next(self._seq))
+        self._orders[order.id] = shelved
+        self._counts[storage_type] += 1
+        self._index(shelved)
+
+    def remove(self, order_id: str) -> Optional[ShelvedOrder]:
+        shelved = self._orders.pop(order_id, None)
+        if shelved is None:
+            return None
+        self._counts[shelved.storage_type] -= 1
+        self._unindex(shelved)
+        return shelved
+
+    def move(self, order_id: str, from_storage: str, to_storage: str) -> Optional[ShelvedOrder]:
+        shelved = self._orders.get(order_id)
+        if shelved is None or shelved.storage_type != from_storage:
+            return None
+        if not self.has_room(to_storage):
+            raise MemoryIntegrityError("move_order", f"Storage {to_storage} is full")
+
+        now = self.clock()
+        # replace the record, the old one is returned to undo the move
+        moved = ShelvedOrder(
+            shelved.order, to_storage, shelved.get_age(now), now, next(self._seq), placed_at=shelved.placed_at)
+        self._orders[order_id] = moved
+        self._counts[from_storage] -= 1
+        self._counts[to_storage] += 1
+        self._unindex(shelved)
+        self._index(moved)
+        return shelved
+
+    def restore(self, shelved: ShelvedOrder) -> None:
+        """Put back a record returned by remove or move. Used to undo a rolled back transaction."""
+        current = self._orders.get(shelved.order.id)
+        if current is not None:
+            self._counts[current.storage_type] -= 1
+            self._unindex(current)
+        self._orders[shelved.order.id] = shelved
+        self._counts[shelved.storage_type] += 1
+        self._index(shelved)
+
+    def clear(self) -> int:
+        deleted = len(self._orders)
+        self._orders.clear()
+        self._counts = {storage_type: 0 for storage_type in STORAGE_TYPES}
+        for heap in self._room_heaps.values():
+            heap.clear()
+        return deleted
+
+    def find_victim_in_room(self, best_storage_types: List[str]) -> Optional[ShelvedOrder]:
+        """Returns room shelf order the policy would move or discard first among given best storage types."""
+        now = self.clock()
+        victim = None
+        victim_score = None
+        for best_storage_type in best_storage_types:
+            candidate = self._room_heaps[best_storage_type].peek()
+            if candidate is None:
+                continue
+            score = self.policy.get_score(candidate, now)
+            if victim is None or score > victim_score:
+                victim, victim_score = candidate, score
+        return victim
+
+    def _index(self, shelved: ShelvedOrder) -> None:
+        if shelved.storage_type == StorageType.ROOM:
+            self._room_heaps[shelved.order.temp].push(shelved.order.id, self.policy.get_key(shelved), shelved)
+
+    def _unindex(self, shelved: ShelvedOrder) -> None:
+        if shelved.storage_type == StorageType.ROOM:
+            self._room_heaps[shelved.order.temp].remove(shelved.order.id)
+
+
+class MemoryConnection:
+    """
+    Mimics the parts of SQLAlchemy Connection used by the jobs and tests.
+    Changes made inside a transaction are recorded in an undo log and reverted on rollback.
+    """
+
+    def __init__(self, storage: MemoryStorage):
+        self.storage = storage
+        self._undo_log: List[Callable[[], None]] = []
+        self._in_transaction = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def begin(self) -> None:
+        self._in_transaction = True
+        self._undo_log = []
+
+    def commit(self) -> None:
+        self._in_transaction = False
+        self._undo_log = []
+
+    def rollback(self) -> None:
+        with self.storage.lock:
+            while self._undo_log:
+                self._undo_log.pop()()
+        self._in_transaction = False
+
+    def close(self) -> None:
+        if self._in_transaction:
+            self.rollback()
+
+    def record_undo(self, undo: Callable[[], None]) -> None:
+        if self._in_transaction:
+            self._undo_log.append(undo)
+
+
+class MemoryConnectionPool:
+    """Drop-in for the SQLAlchemy Engine returned by get_database_connection_pool."""
+
+    def __init__(self, storage: MemoryStorage = None):
+        self.storage = storage or MemoryStorage()
+
+    def connect(self) -> MemoryConnection:
+        return MemoryConnection(self.storage)
+
+    def dispose(self) -> None:
+        with self.storage.lock:
+            self.storage.clear()
+
+
+class AsyncMemoryConnection:
+    """Mimics SQLAlchemy AsyncConnection.run_sync, so asyncio jobs can use the in-memory engine."""
+
+    def __init__(self, connection: MemoryConnection):
+        self._connection = connection
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._connection.close()
+
+    async def run_sync(self, fn: Callable, *args, **kwargs):
+        return fn(self._connection, *args, **kwargs)
+
+
+class AsyncMemoryConnectionPool:
+    """Drop-in for the SQLAlchemy AsyncEngine returned by get_async_database_connection_pool."""
+
+    def __init__(self, storage: MemoryStorage = None):
+        self.storage = storage or MemoryStorage()
+
+    def connect(self) -> AsyncMemoryConnection:
+        return AsyncMemoryConnection(MemoryConnection(self.storage))
+
+    async def dispose(self) -> None:
+        with self.storage.lock:
+            self.storage.clear()
@@ -0,0 +1,105 @@
+import time
+from typing import Tuple, Union
+
+from sqlalchemy import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import constants
+from clients.database.connection_pool import get_async_database_connection_pool
+from clients.database.engine_registry import SharedEngine, engine_registry
+from clients.database.database_client import DatabaseClient
+from clients.database.memory_database_client import MemoryDatabaseClient
+from clients.database.memory_storage import AsyncMemoryConnectionPool, MemoryConnectionPool, MemoryStorage
+from clients.database.victim_policies import get_room_shelf_policy
+from constants import DEFAULT_KITCHEN_ID, StorageEngine
+from models.config import Config
+from models.database_config import DatabaseConfig
+from models.clock import Clock
+from models.inventory import Inventory
+
+
+def get_storage_engine(
+        config: Config,
+        kitchen_id: str = DEFAULT_KITCHEN_ID,
+        clock: Clock = None,
+) -> Tuple[Union[DatabaseClient, MemoryDatabaseClient], Union[SharedEngine, MemoryConnectionPool]]:
+    """
+    Returns database client and connection pool for the storage engine selected in config.
+    Both pairs expose the same interface, so jobs don't need to know which one they are using.
+    Shelf capacities come from config with server defaults from DatabaseConfig.
+    Database clients work on the shelves of the given kitchen, memory storage is never shared.
+    PostgreSQL connections come from the process-wide engine registry.
+    Order ages are computed in the time of the given clock, database or wall time by default.
+    Memory storage chooses orders to move or discard with the victim policy from config.
+    """
+    db_config = DatabaseConfig()
+    capacities = config.get_capacities(db_config.get_capacities())
+
+    if config.storage_engine == StorageEngine.MEMORY:
+        storage_clock = clock.now_seconds if clock is not None else time.time
+        storage = MemoryStorage(capacities, storage_clock, get_room_shelf_policy(config))
+        return MemoryDatabaseClient(), MemoryConnectionPool(storage)
+
+    db_client = DatabaseClient(kitchen_id, clock)
+    connection_pool = engine_registry.get_engine(db_config)
+    with connection_pool.connect() as connection:
+        _update_capacities(connection, db_client, capacities)
+    return db_client, connection_pool
+
+
+async def get_async_storage_engine(
+        config: Config,
+        kitchen_id: str = DEFAULT_KITCHEN_ID,
+) -> Tuple[Union[DatabaseClient, MemoryDatabaseClient], Union[AsyncEngine, AsyncMemoryConnectionPool]]:
+    """
+    Asyncio counterpart of get_storage_engine. Returned pool yields async connections,
+    the client's methods run on them through run_sync.
+    The pool is created per run, asyncpg connections can only be used on the event loop that opened them.
+    """
+    db_config = DatabaseConfig()
+    capacities = config.get_capacities(db_config.get_capacities())
+
+    if config.storage_engine == StorageEngine.MEMORY:
+        storage = MemoryStorage(capacities, policy=get_room_shelf_policy(config))
+        return MemoryDatabaseClient(), AsyncMemoryConnectionPool(storage)
+
+    db_client = DatabaseClient(kitchen_id)
+    connection_pool = get_async_database_connection_pool(
+        db_config,
+        max_connections=constants.MAX_ASYNC_DB_CONNECTIONS,
+        max_wait=constants.MAX_WAIT_ASYNC_DB_CONNECTION_SECONDS,
+    )
+    async with connection_pool.connect() as connection:
+        await connection.run_sync(_update_capacities, db_client, capacities)
+    return db_client, connection_pool
+
+
+def release_storage_engine(
+        db_client: Union[DatabaseClient, MemoryDatabaseClient],
+        connection_pool: Union[SharedEngine, MemoryConnectionPool]) -> None:
+    """Delete the kitchen used by a finished run and close the pool, shared engines stay open."""
+    try:
+        with connection_pool.connect() as connection:
+            _delete_kitchen(connection, db_client)
+    finally:
+        connection_pool.dispose()
+
+
+async def release_async_storage_engine(
+        db_client: Union[DatabaseClient, MemoryDatabaseClient],
+        connection_pool: Union[AsyncEngine, AsyncMemoryConnectionPool]) -> None:
+    try:
+        async with connection_pool.connect() as connection:
+            await connection.run_sync(_delete_kitchen, db_client)
+    finally:
+        await connection_pool.dispose()
+
+
+def _delete_kitchen(connection: Connection, db_client: Union[DatabaseClient, MemoryDatabaseClient]) -> None:
+    with db_client.transaction(connection):
+        db_client.delete_kitchen(connection)
+
+
+def _update_capacities(connection: Connection, db_client: DatabaseClient, capacities: Inventory) -> None:
+    with db_client.transaction(connection):
+        db_client.update_capacities(connection, capacities)
@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Type
+
+from constants import VictimPolicy
+from models.config import Config
+
+
+class RoomShelfPolicy(ABC):
+    """
+    Decides which room shelf order is moved to its best storage or discarded when the room shelf is full.
+
+    Memory storage keeps room shelf orders in one IndexedHeap per best storage type ordered by get_key,
+    so a key must not change while the order stays on the shelf. The victim is the heap top with the highest
+    get_score among the heaps allowed for the operation, so selection looks at no more than three orders.
+    """
+
+    name: str = None
+
+    @abstractmethod
+    def get_key(self, shelved) -> float:
+        """Heap key, the order with the lowest key of a heap is its candidate."""
+
+    def get_score(self, shelved, now: float) -> float:
+        del now
+        return -self.get_key(shelved)
+
+
+class RelativeAgePolicy(RoomShelfPolicy):
+    """
+    The order furthest past its freshness, otherwise the closest to it. Same choice as the database functions.
+    Relative age is decay_rate * (now - expires_at) and decay rate is fixed per heap, so heaps are ordered by
+    expiry and only the tops are compared at the current time.
+    """
+
+    name = VictimPolicy.RELATIVE_AGE
+
+    def get_key(self, shelved) -> float:
+        return shelved.expires_at
+
+    def get_score(self, shelved, now: float) -> float:
+        return shelved.get_relative_age(now)
+
+
+class LeastRemainingFreshnessPolicy(RoomShelfPolicy):
+    """The order with the least time left until it goes stale, regardless of how fast it decays."""
+
+    name = VictimPolicy.LEAST_REMAINING_FRESHNESS
+
+    def get_key(self, shelved) -> float:
+        return shelved.expires_at
+
+
+class ExpectedPickupPolicy(RoomShelfPolicy):
+    """
+    The order expected to have the least freshness left when its courier arrives. Couriers are expected
+    in the middle of the pickup window after placement. Orders expected to be stale at pickup go first.
+    """
+
+    name = VictimPolicy.EXPECTED_PICKUP
+
+    def __init__(self, expected_pickup_delay: float):
+        self.expected_pickup_delay = expected_pickup_delay
+
+    def get_key(self, shelved) -> float:
+        return shelved.expires_at - (shelved.placed_at + self.expected_pickup_delay)
+
+    def get_score(self, shelved, now: float) -> float:
+        del now
+        return -shelved.decay_rate * self.get_key(shelved)
+
+
+class CheapestToMovePolicy(RoomShelfPolicy):
+    """
+    The order that has been on the room shelf longest. Compares insertion order only, no ages are computed,
+    which makes it the cheapest selection at the cost of ignoring freshness.
+    """
+
+    name = VictimPolicy.CHEAPEST_TO_MOVE
+
+    def get_key(self, shelved) -> float:
+        return shelved.seq
+
+
+POLICY_TYPES: Dict[str, Type[RoomShelfPolicy]] = {
+    policy_type.name: policy_type
+    for policy_type in (RelativeAgePolicy, LeastRemainingFreshnessPolicy, ExpectedPickupPolicy, CheapestToMovePolicy)
+}
+
+
+def get_room_shelf_policy(config: Config) -> RoomShelfPolicy:
+    if config.victim_policy == VictimPolicy.EXPECTED_PICKUP:
+        return ExpectedPickupPolicy((config.min_pickup + config.max_pickup) / 2)
+    return POLICY_TYPES[config.victim_policy]()
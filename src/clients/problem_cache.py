@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional
+
+import constants
+from models.problem import Problem
+from models.problem_stream import iter_file_chunks, iter_order_array
+
+logger = logging.getLogger(__name__)
+
+
+class ProblemCache:
+    """
+    Challenge server problems on disk. Response bodies are stored once under blobs/ named by their SHA-256,
+    and every (endpoint, auth, name, seed) has a small entry under entries/ with the blob name and the test id
+    of the download. Entries are named by a hash of their key, the auth token itself is not stored.
+    Files are written under temporary names and renamed into place, so readers never see a partial problem
+    and concurrent downloads of the same problem don't conflict.
+    """
+
+    def __init__(self, path: str = constants.PROBLEM_CACHE_PATH):
+        self.path = path
+        self._blobs_path = os.path.join(path, "blobs")
+        self._entries_path = os.path.join(path, "entries")
+
+    def get(self, endpoint: str, auth: str, name: str, seed: int) -> Optional[Problem]:
+        """Streamed problem from disk, None when it hasn't been downloaded."""
+        try:
+            with open(self._get_entry_path(endpoint, auth, name, seed), "r", encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except FileNotFoundError:
+            return None
+        blob_path = os.path.join(self._blobs_path, entry["blob"])
+        if not os.path.exists(blob_path):
+            return None
+        return Problem(entry["test_id"], (), pending_orders=iter_order_array(iter_file_chunks(blob_path)))
+
+    def put(
+            self,
+            endpoint: str,
+            auth: str,
+            name: str,
+            seed: int,
+            test_id: str,
+            body: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Passes the body chunks through and stores the problem once all of them are read.
+        Nothing is stored when iteration stops early or fails.
+        """
+        os.makedirs(self._blobs_path, exist_ok=True)
+        os.makedirs(self._entries_path, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self._blobs_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                for chunk in body:
+                    digest.update(chunk)
+                    fp.write(chunk)
+                    yield chunk
+            blob = f"{digest.hexdigest()}.json"
+            os.replace(temp_path, os.path.join(self._blobs_path, blob))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        entry = dict(endpoint=endpoint, name=name, seed=seed, test_id=test_id, blob=blob)
+        _write_atomically(self._get_entry_path(endpoint, auth, name, seed), json.dumps(entry).encode("utf-8"))
+        logger.info(f"Cached problem name={name!r} seed={seed} in {blob}.")
+
+    def _get_entry_path(self, endpoint: str, auth: str, name: str, seed: int) -> str:
+        key = json.dumps([endpoint.rstrip("/"), auth, name, seed])
+        return os.path.join(self._entries_path, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
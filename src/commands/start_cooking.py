@@ -31,6 +31,32 @@ def start_cooking(
         default="",
         help="Problem used for local testing outside docker container.",
     ),
+    storage_engine: str = Option(
+        default=constants.StorageEngine.POSTGRES,
+        help=f"Storage engine, one of: {constants.STORAGE_ENGINES}",
+    ),
+    execution_mode: str = Option(
+        default=constants.ExecutionMode.THREADS,
+        help=f"Job execution mode, one of: {constants.EXECUTION_MODES}",
+    ),
+    batch_window_ms: int = Option(
+        default=0,
+        min=0,
+        max=5,
+        help="Apply events due within this many milliseconds in one transaction (disabled if zero)",
+    ),
+    simulated_time: bool = Option(
+        default=False,
+        help="Replay the schedule in simulated time as fast as jobs execute instead of waiting for due times",
+    ),
+    victim_policy: str = Option(
+        default=constants.VictimPolicy.RELATIVE_AGE,
+        help=f"Room shelf order to move or discard first, one of: {constants.VICTIM_POLICIES}"
+        " (postgres supports relative_age only)",
+    ),
+    hot_capacity: int = Option(default=None, min=1, help="Hot shelf capacity (server default if not set)"),
+    cold_capacity: int = Option(default=None, min=1, help="Cold shelf capacity (server default if not set)"),
+    room_capacity: int = Option(default=None, min=1, help="Room shelf capacity (server default if not set)"),
 ):
     try:
         config = Config(
@@ -41,6 +67,14 @@ def start_cooking(
             max_pickup=max_pickup,
             endpoint=endpoint,
             problem_file_path=problem_file_path,
+            storage_engine=storage_engine,
+            execution_mode=execution_mode,
+            batch_window_ms=batch_window_ms,
+            simulated_time=simulated_time,
+            victim_policy=victim_policy,
+            hot_capacity=hot_capacity,
+            cold_capacity=cold_capacity,
+            room_capacity=room_capacity,
         )
         _start_cooking(config)
     except ValidationError as e:
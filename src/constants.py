@@ -3,19 +3,38 @@ import os
 
 WEB_SERVER_ENDPOINT = "http://localhost:8000"
 SCHEDULE_ORDERS_ENDPOINT = f"{WEB_SERVER_ENDPOINT}/schedule-orders"
-MAX_DB_CONNECTIONS = 20
 MAX_WORKERS = 20
+# a connection per worker thread of a run
+MAX_DB_CONNECTIONS = MAX_WORKERS
 MAX_WAIT_DB_CONNECTION_SECONDS = 1
+# asyncio mode keeps many more jobs in flight than connections, they queue on the pool
+MAX_ASYNC_DB_CONNECTIONS = 20
+MAX_WAIT_ASYNC_DB_CONNECTION_SECONDS = 30
 JOBS_IN_PROGRESS_REPORTING_PERIOD_SECONDS = 5
-# make sure that all jobs are placed in a schedule before starting
-JOBS_INITIAL_DELAY_SECONDS = 3
-MAX_PICKUP_ORDER_TRIES = 3
-MAX_PLACE_ORDER_TRIES = 3
+MAX_PICKUP_ORDER_TRIES = 5
+MAX_PLACE_ORDER_TRIES = 5
+# a retry waits a random time up to the base delay doubled on every attempt, capped at the max delay
+RETRY_BASE_DELAY_SECONDS = 0.005
+RETRY_MAX_DELAY_SECONDS = 0.2
+# streamed problems are parsed no further ahead of the running schedule than this
+PROBLEM_LOOKAHEAD_SECONDS = 1
+DEFAULT_KITCHEN_ID = "default"
+MAX_CONCURRENT_RUNS = 4
+MAX_FINISHED_RUNS = 100
 
 WORKING_DIR_PATH = "."
 SHARED_VOLUME = os.path.join(WORKING_DIR_PATH, "containers_data")
 ORDERS_SCHEDULE_FILE_PATH = os.path.join(SHARED_VOLUME, "orders-schedule.json")
 EVENTS_FILE_PATH = os.path.join(SHARED_VOLUME, "events.json")
+PROBLEM_CACHE_PATH = os.path.join(SHARED_VOLUME, "problem_cache")
+CHALLENGE_MAX_RETRIES = 3
+# retries wait 0.5, 1 and 2 seconds
+CHALLENGE_RETRY_BACKOFF_SECONDS = 0.5
+CHALLENGE_MAX_CONNECTIONS = 4
+# local stand-in for the challenge server, see emulator/challenge_server.py
+EMULATOR_PORT = 9000
+EMULATOR_PROBLEM_SIZE = 48
+EMULATOR_MAX_PROBLEM_SIZE = 10_000_000
 
 
 class StorageType:
@@ -24,6 +43,59 @@ class StorageType:
     ROOM = "room"
 
 
+STORAGE_TYPES = [StorageType.HOT, StorageType.COLD, StorageType.ROOM]
+
+
+class StorageEngine:
+    POSTGRES = "postgres"
+    MEMORY = "memory"
+
+
+STORAGE_ENGINES = [StorageEngine.POSTGRES, StorageEngine.MEMORY]
+
+
+class VictimPolicy:
+    RELATIVE_AGE = "relative_age"
+    LEAST_REMAINING_FRESHNESS = "least_remaining_freshness"
+    EXPECTED_PICKUP = "expected_pickup"
+    CHEAPEST_TO_MOVE = "cheapest_to_move"
+
+
+VICTIM_POLICIES = [
+    VictimPolicy.RELATIVE_AGE,
+    VictimPolicy.LEAST_REMAINING_FRESHNESS,
+    VictimPolicy.EXPECTED_PICKUP,
+    VictimPolicy.CHEAPEST_TO_MOVE,
+]
+
+
+class ExecutionMode:
+    THREADS = "threads"
+    ASYNCIO = "asyncio"
+
+
+EXECUTION_MODES = [ExecutionMode.THREADS, ExecutionMode.ASYNCIO]
+
+
+class RunStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobKind:
+    PLACE = 0
+    PICKUP = 1
+
+    NAMES = ("place", "pickup")
+
+
+class RetryCause:
+    TRANSACTION_CONFLICT = "transaction_conflict"
+    POOL_TIMEOUT = "pool_timeout"
+
+
 class MaxInventory:
     HOT = 6
     COLD = 6
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the challenge server, so the fetch, schedule and submit pipeline can run offline:
+
+    python -m emulator.challenge_server --orders 100000
+
+Run with "src" on PYTHONPATH and point the kitchen at it with endpoint "http://localhost:9000".
+"""
+import json
+import logging
+import random
+import sys
+import uuid
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import typer
+from flask import Flask, Response, jsonify, request
+from typer import Option
+
+import constants
+from constants import MaxInventory, StorageType
+from models.action_table import UNKNOWN, ActionTable
+from models.inventory import Inventory
+from models.order import Order
+from models.order_table import OrderTable
+from validators.actions_validators import score_actions
+
+logger = logging.getLogger(__name__)
+app = Flask(__name__)
+app.config["PROBLEM_SIZE"] = constants.EMULATOR_PROBLEM_SIZE
+
+# (name, temperature, freshness in seconds), generated orders get the freshness give or take a quarter
+MENU = [
+    ("Cheese Pizza", StorageType.HOT, 120),
+    ("Pho", StorageType.HOT, 150),
+    ("Beef Stew", StorageType.HOT, 240),
+    ("Chicken Curry", StorageType.HOT, 180),
+    ("Ice Cream", StorageType.COLD, 60),
+    ("Poke Bowl", StorageType.COLD, 120),
+    ("Cobb Salad", StorageType.COLD, 200),
+    ("Sushi Roll", StorageType.COLD, 90),
+    ("Frozen Yogurt", StorageType.COLD, 75),
+    ("Banana Bread", StorageType.ROOM, 300),
+    ("Croissant", StorageType.ROOM, 270),
+    ("Granola Bar", StorageType.ROOM, 360),
+]
+# order fields but the id and freshness, serialized once
+_MENU_FIELDS = [f'"name": {json.dumps(name)}, "temp": "{temp}", ' for name, temp, _ in MENU]
+_MENU_FRESHNESS = np.array([freshness for _, _, freshness in MENU], np.int64)
+# an odd multiplier maps order positions to distinct 32 bit ids
+_ID_MULTIPLIER = 0x9E3779B1
+BATCH_SIZE = 10_000
+
+
+def iter_order_batches(seed: int, size: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Ids, menu positions and freshness of the problem's orders, BATCH_SIZE orders at a time.
+    Orders depend on the seed only, a larger problem with the same seed starts with the orders of a smaller one:
+    menu items and freshness are drawn from generators of their own, so neither depends on where a batch ends.
+    """
+    item_rng, freshness_rng = (np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(2))
+    id_offset = int(item_rng.integers(1 << 32))
+    for start in range(0, size, BATCH_SIZE):
+        count = min(BATCH_SIZE, size - start)
+        ids = (np.arange(start, start + count, dtype=np.uint64) * _ID_MULTIPLIER + id_offset) & 0xFFFFFFFF
+        items = item_rng.integers(len(MENU), size=count)
+        base = _MENU_FRESHNESS[items]
+        freshness = base + freshness_rng.integers(-(base // 4), base // 4 + 1)
+        yield ids, items, freshness
+
+
+def iter_problem_json(seed: int, size: int) -> Iterator[bytes]:
+    """Problem as a JSON array of orders, encoded a batch at a time so the first orders go out right away."""
+    separator = "["
+    for ids, items, freshness in iter_order_batches(seed, size):
+        orders = ", ".join(
+            f'{{"id": "{order_id:08x}", {_MENU_FIELDS[item]}"freshness": {fresh}}}'
+            for order_id, item, fresh in zip(ids.tolist(), items.tolist(), freshness.tolist())
+        )
+        yield f"{separator}{orders}".encode("utf-8")
+        separator = ", "
+    yield b"]" if separator == ", " else b"[]"
+
+
+@lru_cache(maxsize=8)
+def get_problem_orders(seed: int, size: int) -> OrderTable:
+    """Orders of a problem for scoring, recently scored problems are kept so repeated submissions are fast."""
+    orders = OrderTable()
+    for ids, items, freshness in iter_order_batches(seed, size):
+        orders.extend(
+            Order(f"{order_id:08x}", MENU[item][0], MENU[item][1], fresh)
+            for order_id, item, fresh in zip(ids.tolist(), items.tolist(), freshness.tolist())
+        )
+    return orders
+
+
+def get_test_id(seed: int, size: int) -> str:
+    """Unique per request like the real server's, but carries the problem so scoring needs no stored state."""
+    return f"{uuid.uuid4().hex[:16]}-{seed}-{size}"
+
+
+def parse_test_id(test_id: str) -> Optional[Tuple[int, int]]:
+    """(seed, size) of a test id from get_test_id, None for any other string."""
+    parts = test_id.split("-")
+    if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    return int(parts[1]), int(parts[2])
+
+
+@app.route("/interview/challenge/new", methods=["GET"])
+def new_problem():
+    if not request.args.get("auth"):
+        return jsonify({"errors": ["auth is required"]}), 401
+    try:
+        seed = int(request.args.get("seed") or 0)
+        size = int(request.args.get("size") or app.config["PROBLEM_SIZE"])
+    except ValueError:
+        return jsonify({"errors": ["seed and size must be integers"]}), 400
+    if not 0 <= size <= constants.EMULATOR_MAX_PROBLEM_SIZE:
+        return jsonify({"errors": [f"size must be between 0 and {constants.EMULATOR_MAX_PROBLEM_SIZE}"]}), 400
+    if seed <= 0:
+        seed = random.randint(1, 1 << 63)
+
+    test_id = get_test_id(seed, size)
+    logger.info(f"New problem, id={test_id}, name={request.args.get('name', '')!r}, seed={seed}, size={size}.")
+    return Response(iter_problem_json(seed, size), mimetype="application/json", headers={"x-test-id": test_id})
+
+
+@app.route("/interview/challenge/solve", methods=["POST"])
+def solve_problem():
+    """
+    Scores a solution with the invariants the kitchen validates its runs with. Shelf capacities (the server's
+    defaults) are checked only when actions carry targets, the kitchen submits actions without them.
+    Invalid solutions are scored as such with the first problem found.
+    """
+    if not request.args.get("auth"):
+        return jsonify({"errors": ["auth is required"]}), 401
+    test_id = request.headers.get("x-test-id", "")
+    problem = parse_test_id(test_id)
+    if problem is None:
+        return jsonify({"errors": [f"Unknown test id: {test_id!r}"]}), 404
+
+    solution = request.get_json(silent=True)
+    try:
+        options = solution["options"]
+        pickup_window_us = (int(options["min"]), int(options["max"]))
+        actions = ActionTable.from_dicts(solution["actions"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"errors": ["Solution must have options (rate, min, max) and a list of actions"]}), 400
+
+    capacities = None
+    if np.any(actions.target != UNKNOWN):
+        capacities = Inventory(hot=MaxInventory.HOT, cold=MaxInventory.COLD, room=MaxInventory.ROOM)
+    try:
+        score = score_actions(actions, get_problem_orders(*problem), capacities, pickup_window_us)
+    except ValueError as e:
+        logger.info(f"Invalid solution for problem {test_id}: {e}")
+        return jsonify({"test_id": test_id, "valid": False, "errors": [str(e)]}), 200
+    logger.info(f"Solution for problem {test_id}: {score}")
+    return jsonify({"test_id": test_id, "valid": True, "score": score}), 200
+
+
+def serve(
+    host: str = Option(default="127.0.0.1", help="Address to listen on"),
+    port: int = Option(default=constants.EMULATOR_PORT, help="Port to listen on"),
+    orders: int = Option(
+        default=constants.EMULATOR_PROBLEM_SIZE,
+        min=0,
+        max=constants.EMULATOR_MAX_PROBLEM_SIZE,
+        help="Orders in a problem unless a request asks for a size",
+    ),
+):
+    """Serves generated problems and scores solutions like the challenge server."""
+    app.config["PROBLEM_SIZE"] = orders
+    app.run(host=host, port=port, threaded=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    typer.run(serve)
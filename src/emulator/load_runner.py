@@ -0,0 +1,105 @@
+"""
+End-to-end load test against a challenge server, usually the emulator: every run fetches a problem, schedules it
+and submits the actions, several runs at once.
+
+    python -m emulator.load_runner --endpoint http://localhost:9000 --runs 8 --concurrency 4 --simulated-time
+
+Run with "src" and the repository root on PYTHONPATH.
+"""
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict
+
+import typer
+from typer import Option
+
+import constants
+from clients.challenge_client import ChallengeClient
+from clients.problem_cache import ProblemCache
+from constants import StorageEngine, STORAGE_ENGINES
+from models.config import Config
+from scheduler.scheduler import schedule_problem_orders
+
+logger = logging.getLogger(__name__)
+
+
+def run_pipeline(config: Config, name: str = "") -> Dict:
+    """
+    Fetches, schedules and submits one problem. Orders are scheduled while the problem downloads, so the fetch
+    is part of "schedule_seconds".
+    """
+    client = ChallengeClient(config.endpoint, config.auth, cache=ProblemCache() if config.cache_problems else None)
+    started = time.perf_counter()
+    problem = client.stream_problem(name, config.seed)
+    actions = schedule_problem_orders(problem, config)
+    scheduled = time.perf_counter()
+    response = client.submit_solution(
+        problem.test_id,
+        rate=timedelta(milliseconds=config.order_rate),
+        min_time=timedelta(seconds=config.min_pickup),
+        max_time=timedelta(seconds=config.max_pickup),
+        actions=actions,
+    )
+    submitted = time.perf_counter()
+    try:
+        result = json.loads(response)
+    except ValueError:
+        result = {"response": response}
+    return dict(
+        result,
+        test_id=problem.test_id,
+        seed=config.seed,
+        orders=len(problem.orders),
+        actions=len(actions),
+        schedule_seconds=scheduled - started,
+        submit_seconds=submitted - scheduled,
+    )
+
+
+def run_load(
+    endpoint: str = Option(default=f"http://localhost:{constants.EMULATOR_PORT}", help="Challenge server endpoint"),
+    auth: str = Option(default="load-test", help="Authentication token"),
+    runs: int = Option(default=4, min=1, help="Number of problems to solve"),
+    concurrency: int = Option(default=2, min=1, help="Problems solved at once"),
+    first_seed: int = Option(default=1, min=1, help="Seed of the first problem, the next runs count up from it"),
+    storage_engine: str = Option(default=StorageEngine.MEMORY, help=f"Storage engine, one of: {STORAGE_ENGINES}"),
+    order_rate: int = Option(default=500, min=1, help="The rate at which orders should be placed in milliseconds"),
+    min_pickup: int = Option(default=4, min=1, help="Minimum pickup time in seconds"),
+    max_pickup: int = Option(default=8, min=1, help="Maximum pickup time in seconds"),
+    simulated_time: bool = Option(default=False, help="Replay schedules in simulated time"),
+    cache_problems: bool = Option(default=False, help="Reuse problems downloaded by earlier runs with the same seeds"),
+):
+    """Prints the server's score and the timings of every run as JSON lines, then the total throughput."""
+    configs = [
+        Config(
+            auth=auth,
+            seed=seed,
+            endpoint=endpoint,
+            storage_engine=storage_engine,
+            order_rate=order_rate,
+            min_pickup=min_pickup,
+            max_pickup=max_pickup,
+            simulated_time=simulated_time,
+            cache_problems=cache_problems,
+        )
+        for seed in range(first_seed, first_seed + runs)
+    ]
+    started = time.perf_counter()
+    actions = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load-runner") as executor:
+        for result in executor.map(run_pipeline, configs):
+            actions += result["actions"]
+            typer.echo(json.dumps(result))
+    elapsed = time.perf_counter() - started
+    typer.echo(json.dumps(dict(runs=runs, elapsed_seconds=elapsed, actions_per_second=actions / elapsed)))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    # jobs log every completed job
+    logging.getLogger("jobs").setLevel(logging.WARNING)
+    typer.run(run_load)
@@ -0,0 +1,64 @@
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import Connection, Engine
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+
+import constants
+from clients.database.database_client import DatabaseClient
+from clients.database.errors import is_transaction_conflict
+from constants import JobKind, RetryCause, TransactionIsolationLevel
+from jobs.exceptions import RetryException
+from jobs.retry_utils import retry_with_backoff
+from models.action import Action
+from models.action_log import ActionLog
+from models.order import Order
+
+logger = logging.getLogger(__name__)
+
+
+@retry_with_backoff(exceptions=(RetryException,), tries=constants.MAX_PLACE_ORDER_TRIES, logger=logger, kind="batch")
+def process_batch(
+    batch: List[Tuple[int, Order, int]],
+    db_client: DatabaseClient,
+    action_log: ActionLog,
+    connection_pool: Engine,
+):
+    """
+    Apply (job kind, order, logical timestamp in microseconds) events in order within one transaction.
+    Actions are logged with the logical timestamp of the event that caused them.
+    """
+    try:
+        with connection_pool.connect() as connection:
+            _process_batch(batch, db_client, action_log, connection)
+    except DBAPIError as e:
+        if not is_transaction_conflict(e):
+            raise
+        logger.warning(f"Transaction conflict while processing a batch of {len(batch)} events. Error: {e}")
+        raise RetryException(RetryCause.TRANSACTION_CONFLICT) from e
+    except PoolTimeoutError as e:
+        logger.warning(f"Timed out waiting for a connection while processing a batch of {len(batch)} events.")
+        raise RetryException(RetryCause.POOL_TIMEOUT) from e
+
+
+def _process_batch(
+    batch: List[Tuple[int, Order, int]],
+    db_client: DatabaseClient,
+    action_log: ActionLog,
+    connection: Connection,
+):
+    batch_actions = []
+    with db_client.transaction(connection, TransactionIsolationLevel.READ_COMMITTED):
+        for kind, order, timestamp_us in batch:
+            if kind == JobKind.PLACE:
+                for storage_action in db_client.place_order(connection, order):
+                    batch_actions.append((
+                        storage_action.action_type, storage_action.order_id, timestamp_us,
+                        storage_action.storage_type,
+                    ))
+            elif db_client.delete_order_if_exists(connection, order.id):
+                batch_actions.append((Action.PICKUP, order.id, timestamp_us, None))
+
+    for action_type, order_id, timestamp_us, target in batch_actions:
+        action_log.record(action_type, order_id, timestamp_us, target)
+    logger.debug(f"Processed batch of {len(batch)} events with {len(batch_actions)} actions.")
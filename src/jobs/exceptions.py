@@ -1,2 +1,6 @@
 class RetryException(Exception):
-    pass
+    """A job failed in a way that may pass when it runs again, cause is one of RetryCause."""
+
+    def __init__(self, cause: str):
+        super().__init__(cause)
+        self.cause = cause
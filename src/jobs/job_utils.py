@@ -1,34 +1,106 @@
 import logging
-import time
+from threading import Condition
 from typing import Dict
-from src.constants import JOBS_IN_PROGRESS_REPORTING_PERIOD_SECONDS
+
+from src.constants import JOBS_IN_PROGRESS_REPORTING_PERIOD_SECONDS, JobKind
+from models.metrics import KitchenMetrics
 
 logger = logging.getLogger(__name__)
 
 
-def get_job_listener(job_map: Dict[str, bool]):
+class JobTracker:
+    """
+    Counts jobs by state and wakes up waiters as soon as the last job finishes.
+    Every update is O(1), so progress summaries cost the same for any number of jobs.
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+        self._sealed = False
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def add(self, count: int = 1) -> None:
+        with self._condition:
+            self.pending += count
+
+    def seal(self) -> None:
+        """No more jobs will be added. Until sealed, tracker is not done even if all added jobs finished."""
+        with self._condition:
+            self._sealed = True
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        with self._condition:
+            self.pending -= 1
+            self.running += 1
+
+    def finish(self, failed: bool = False) -> None:
+        with self._condition:
+            self.running -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            if self._is_done():
+                self._condition.notify_all()
+
+    def is_done(self) -> bool:
+        with self._condition:
+            return self._is_done()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Returns True when all jobs finished, False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(self._is_done, timeout=timeout)
+
+    def get_summary(self) -> Dict[str, int]:
+        with self._condition:
+            return dict(
+                pending=self.pending,
+                running=self.running,
+                completed=self.completed,
+                failed=self.failed,
+            )
+
+    def _is_done(self) -> bool:
+        return self._sealed and self.pending == 0 and self.running == 0
+
+
+def get_job_start_listener(job_tracker: JobTracker):
+    def job_start_listener(_event):
+        job_tracker.start()
+
+    return job_start_listener
+
+
+def get_job_listener(job_tracker: JobTracker):
     def job_listener(event):
-        nonlocal job_map
         job_id = event.job_id
+        lag_ms = event.lag_us / 1000
         if event.exception:
-            logger.error(f"Job {job_id} failed.")
+            logger.error(f"Job {job_id} failed. Dispatch lag: {lag_ms:.3f} ms.")
         else:
-            logger.info(f"Job {job_id} completed.")
-        job_map[job_id] = True
+            logger.info(f"Job {job_id} completed. Dispatch lag: {lag_ms:.3f} ms.")
+        job_tracker.finish(failed=event.exception is not None)
 
     return job_listener
 
 
-def report_on_job_progress(jobs_finished: Dict[str, bool]):
-    passed_seconds = 0
-    while not all(jobs_finished.values()):
-        if (
-            passed_seconds > 0
-            and passed_seconds % JOBS_IN_PROGRESS_REPORTING_PERIOD_SECONDS == 0
-        ):
-            jobs_in_progress = [
-                key for key, value in jobs_finished.items() if value is False
-            ]
-            logger.info(f"Jobs in progress: {jobs_in_progress}")
-        time.sleep(1)
-        passed_seconds += 1
+def get_job_metrics_listener(metrics: KitchenMetrics):
+    def job_metrics_listener(event):
+        kind = JobKind.NAMES[event.kind]
+        metrics.dispatch_lag_seconds.labels(kind).observe(event.lag_us / 1_000_000)
+        metrics.job_duration_seconds.labels(kind).observe(event.duration_us / 1_000_000)
+        if event.exception is not None:
+            metrics.failed_jobs_total.labels(kind).inc()
+
+    return job_metrics_listener
+
+
+def report_on_job_progress(job_tracker: JobTracker):
+    """Blocks until all jobs finish, logging a progress summary periodically."""
+    while not job_tracker.wait(timeout=JOBS_IN_PROGRESS_REPORTING_PERIOD_SECONDS):
+        logger.info(f"Jobs in progress: {job_tracker.get_summary()}")
@@ -1,14 +1,16 @@
 import logging
 
-from retry import retry
 from sqlalchemy import Connection, Engine
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 
 import constants
 from clients.database.database_client import DatabaseClient
-from constants import TransactionIsolationLevel
+from clients.database.errors import is_transaction_conflict
+from constants import JobKind, RetryCause, TransactionIsolationLevel
 from jobs.exceptions import RetryException
+from jobs.retry_utils import async_retry, retry_with_backoff
 from models.action_log import ActionLog
 from models.order import Order
 
@@ -16,7 +18,12 @@ from models.order import Order
 logger = logging.getLogger(__name__)
 
 
-@retry(exceptions=RetryException, tries=constants.MAX_PICKUP_ORDER_TRIES, logger=logger)
+@retry_with_backoff(
+    exceptions=(RetryException,),
+    tries=constants.MAX_PICKUP_ORDER_TRIES,
+    logger=logger,
+    kind=JobKind.NAMES[JobKind.PICKUP],
+)
 def pickup_order(
     order: Order,
     db_client: DatabaseClient,
@@ -26,9 +33,41 @@ def pickup_order(
     try:
         with connection_pool.connect() as connection:
             _pickup_order(order, db_client, action_log, connection)
-    except IntegrityError as e:
-        logger.error(f"Integrity error while picking up order. Order ID: {order.id}. Error: {e}")
-        raise RetryException() from e
+    except DBAPIError as e:
+        if not is_transaction_conflict(e):
+            raise
+        logger.warning(f"Transaction conflict while picking up order. Order ID: {order.id}. Error: {e}")
+        raise RetryException(RetryCause.TRANSACTION_CONFLICT) from e
+    except PoolTimeoutError as e:
+        logger.warning(f"Timed out waiting for a connection while picking up order. Order ID: {order.id}.")
+        raise RetryException(RetryCause.POOL_TIMEOUT) from e
+
+
+@async_retry(
+    exceptions=(RetryException,),
+    tries=constants.MAX_PICKUP_ORDER_TRIES,
+    logger=logger,
+    kind=JobKind.NAMES[JobKind.PICKUP],
+)
+async def pickup_order_async(
+    order: Order,
+    db_client: DatabaseClient,
+    action_log: ActionLog,
+    connection_pool: AsyncEngine,
+):
+    """Asyncio counterpart of pickup_order. Database work runs on the async connection through run_sync."""
+    try:
+        async with connection_pool.connect() as connection:
+            await connection.run_sync(
+                lambda sync_connection: _pickup_order(order, db_client, action_log, sync_connection))
+    except DBAPIError as e:
+        if not is_transaction_conflict(e):
+            raise
+        logger.warning(f"Transaction conflict while picking up order. Order ID: {order.id}. Error: {e}")
+        raise RetryException(RetryCause.TRANSACTION_CONFLICT) from e
+    except PoolTimeoutError as e:
+        logger.warning(f"Timed out waiting for a connection while picking up order. Order ID: {order.id}.")
+        raise RetryException(RetryCause.POOL_TIMEOUT) from e
 
 
 def _pickup_order(
@@ -1,19 +1,26 @@
 import logging
-from retry import retry
 from sqlalchemy import Connection, Engine
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from clients.database.database_client import DatabaseClient
-from constants import MaxInventory, StorageType, TransactionIsolationLevel
+from clients.database.errors import is_transaction_conflict
+from constants import JobKind, RetryCause, TransactionIsolationLevel
 from models.action_log import ActionLog
 from models.order import Order
 import constants
 from jobs.exceptions import RetryException
+from jobs.retry_utils import async_retry, retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
 
-@retry(exceptions=RetryException, tries=constants.MAX_PLACE_ORDER_TRIES, logger=logger)
+@retry_with_backoff(
+    exceptions=(RetryException,),
+    tries=constants.MAX_PLACE_ORDER_TRIES,
+    logger=logger,
+    kind=JobKind.NAMES[JobKind.PLACE],
+)
 def place_order(
     order: Order,
     db_client: DatabaseClient,
@@ -21,129 +28,62 @@ def place_order(
     connection_pool: Engine,
 ):
     try:
-        with connection_pool.connect() as connection:
+        # placements of one kitchen take turns here instead of waiting on its inventory rows with a connection
+        with db_client.placement_lock, connection_pool.connect() as connection:
             _place_order(order, db_client, action_log, connection)
-    except IntegrityError as e:
-        logger.error(f"Integrity error while placing an order. Order ID: {order.id}. Error: {e}")
-        raise RetryException() from e
-
-
-def _place_order(
+    except DBAPIError as e:
+        if not is_transaction_conflict(e):
+            raise
+        logger.warning(f"Transaction conflict while placing an order. Order ID: {order.id}. Error: {e}")
+        raise RetryException(RetryCause.TRANSACTION_CONFLICT) from e
+    except PoolTimeoutError as e:
+        # the connection pool was exhausted, not the transaction, so trying again later may succeed
+        logger.warning(f"Timed out waiting for a connection while placing an order. Order ID: {order.id}.")
+        raise RetryException(RetryCause.POOL_TIMEOUT) from e
+
+
+@async_retry(
+    exceptions=(RetryException,),
+    tries=constants.MAX_PLACE_ORDER_TRIES,
+    logger=logger,
+    kind=JobKind.NAMES[JobKind.PLACE],
+)
+async def place_order_async(
     order: Order,
     db_client: DatabaseClient,
     action_log: ActionLog,
-    connection: Connection,
+    connection_pool: AsyncEngine,
 ):
-
+    """Asyncio counterpart of place_order. Database work runs on the async connection through run_sync."""
     try:
-        with db_client.transaction(connection):
-            inventory = db_client.fetch_inventory(connection)
-    except Exception as e:
-        logger.error(f"Unexepected error while fetching inventory. Error: {e}")
-        raise
-
-    room_available = inventory.room < MaxInventory.ROOM
-    best_storage_available = (
-        (order.temp == StorageType.HOT and inventory.hot < MaxInventory.HOT)
-        or (order.temp == StorageType.COLD and inventory.cold < MaxInventory.COLD)
-        or (order.temp == StorageType.ROOM and room_available)
-    )
-
-    logger.debug(
-        f"Placing order. Order ID: {order.id}. Best storage available: {best_storage_available}."
-        f"Room available: {room_available}."
-    )
-    if best_storage_available:
-        _place_order_to_best_storage(order, db_client, action_log, connection)
-    elif room_available:
-        _place_order_when_best_storage_is_full(order, db_client, action_log, connection)
-    else:
-        _place_order_when_no_space_left(order, db_client, action_log, connection)
-
-
-def _place_order_to_best_storage(
-    order: Order,
-    db_client: DatabaseClient,
-    actions_log: ActionLog,
-    connection: Connection,
-) -> None:
-    with db_client.transaction(connection, TransactionIsolationLevel.READ_COMMITTED):
-        db_client.insert_order(connection, order, order.temp)
-    actions_log.place(order.id)
-    logger.debug(f"Action place. Order ID: {order.id}. Storage: {order.temp}. Best storage.")
-
-
-def _place_order_when_best_storage_is_full(
-    order: Order,
-    db_client: DatabaseClient,
-    action_log: ActionLog,
-    connection: Connection,
-) -> None:
-    with db_client.transaction(connection, TransactionIsolationLevel.READ_COMMITTED):
-        db_client.insert_order(connection, order, StorageType.ROOM)
-    action_log.place(order.id)
-    logger.debug(f"Action place. Order ID: {order.id}. Storage: {StorageType.ROOM}.")
+        async with db_client.async_placement_lock, connection_pool.connect() as connection:
+            await connection.run_sync(
+                lambda sync_connection: _place_order(order, db_client, action_log, sync_connection))
+    except DBAPIError as e:
+        if not is_transaction_conflict(e):
+            raise
+        logger.warning(f"Transaction conflict while placing an order. Order ID: {order.id}. Error: {e}")
+        raise RetryException(RetryCause.TRANSACTION_CONFLICT) from e
+    except PoolTimeoutError as e:
+        logger.warning(f"Timed out waiting for a connection while placing an order. Order ID: {order.id}.")
+        raise RetryException(RetryCause.POOL_TIMEOUT) from e
 
 
-def _place_order_when_no_space_left(
+def _place_order(
     order: Order,
     db_client: DatabaseClient,
     action_log: ActionLog,
     connection: Connection,
-) -> None:
-    success = _move_order_and_place_order(order, db_client, action_log, connection)
-    if not success:
-        _discard_order_and_place_order(order, db_client, action_log, connection)
-
-
-def _move_order_and_place_order(
-    order_to_place: Order,
-    db_client: DatabaseClient,
-    action_log: ActionLog,
-    connection: Connection,
-) -> bool:
-    with db_client.transaction(connection, TransactionIsolationLevel.READ_COMMITTED):
-        order_to_move = db_client.fetch_order_to_move(connection)
-
-        if order_to_move is None:
-            return False
-
-        db_client.move_order(
-            connection,
-            from_storage=order_to_move.storage_type,
-            to_storage=order_to_move.order.temp,
-            order_id=order_to_move.id,
-        )
-        db_client.insert_order(connection, order_to_place, StorageType.ROOM)
-
-    action_log.move(order_to_move.id)
-    action_log.place(order_to_place.id)
-    logger.debug(
-        f"Action move. Order ID: {order_to_move.id}. From: {order_to_move.storage_type}."
-        f" To: {order_to_move.order.temp}."
-    )
-    logger.debug(f"Action place. Order ID: {order_to_place.id}. Storage: {StorageType.ROOM}.")
-    return True
-
-
-def _discard_order_and_place_order(
-    order_to_place: Order,
-    db_client: DatabaseClient,
-    action_log: ActionLog,
-    connection: Connection,
 ):
     with db_client.transaction(connection, TransactionIsolationLevel.READ_COMMITTED):
-        order_to_discard = db_client.fetch_order_to_discard(connection)
-
-        if not order_to_discard:
-            logger.debug(f"Order to discard not found while trying to place order: {order_to_place.id}.")
-            raise ValueError("Order to discard not found.")
-
-        order_deleted = db_client.delete_order_if_exists(connection, order_to_discard.id)
-        db_client.insert_order(connection, order_to_place, StorageType.ROOM)
-
-    if order_deleted:
-        action_log.discard(order_to_discard.id)
-        logger.debug(f"Action discard. Order ID: {order_to_discard.id}. Storage: {order_to_discard.storage_type}.")
-    action_log.place(order_to_place.id)
-    logger.debug(f"Action place. Order ID: {order_to_place.id}. Storage: {StorageType.ROOM}.")
+        storage_actions = db_client.place_order(connection, order)
+        # stamped before commit, so transactions that see this placement stamp their actions later
+        timestamp_us = action_log.clock.now_us()
+
+    for storage_action in storage_actions:
+        action_log.record(
+            storage_action.action_type, storage_action.order_id, timestamp_us, storage_action.storage_type)
+        logger.debug(
+            f"Action {storage_action.action_type}. Order ID: {storage_action.order_id}."
+            f" Storage: {storage_action.storage_type}."
+        )
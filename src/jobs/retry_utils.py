@@ -0,0 +1,86 @@
+import asyncio
+import functools
+import inspect
+import logging
+import random
+import time
+from typing import Tuple, Type
+
+import constants
+
+
+def get_backoff_seconds(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter. Jobs that collided wait different times,
+    so they don't retry at the same moment and collide again.
+    """
+    ceiling = min(constants.RETRY_MAX_DELAY_SECONDS, constants.RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+def count_retry(signature: inspect.Signature, kind: str, exception: Exception, args: tuple, kwargs: dict) -> None:
+    """
+    Counts a retry of a job by kind and cause (see RetryException) in the metrics of the job's action_log
+    argument, when the run set them.
+    """
+    action_log = signature.bind(*args, **kwargs).arguments.get("action_log")
+    metrics = getattr(action_log, "metrics", None)
+    if metrics is not None:
+        metrics.job_retries_total.labels(kind, getattr(exception, "cause", type(exception).__name__)).inc()
+
+
+def retry_with_backoff(exceptions: Tuple[Type[Exception], ...], tries: int, logger: logging.Logger, kind: str = None):
+    """
+    Retries on given exceptions with a jittered exponential backoff. The last exception is raised.
+    Jobs pass their kind, so every retry is counted (see count_retry).
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, tries + 1):
+                try:
+                    return fn(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == tries:
+                        logger.error(f"{e!r}, giving up after {tries} attempts.")
+                        raise
+                    if kind is not None:
+                        count_retry(signature, kind, e, args, kwargs)
+                    delay = get_backoff_seconds(attempt)
+                    logger.warning(f"{e!r}, retrying in {delay * 1000:.1f} ms. Attempt {attempt} of {tries}.")
+                    time.sleep(delay)
+            return None
+
+        return wrapper
+
+    return decorator
+
+
+def async_retry(exceptions: Tuple[Type[Exception], ...], tries: int, logger: logging.Logger, kind: str = None):
+    """Coroutine counterpart of retry_with_backoff."""
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, tries + 1):
+                try:
+                    return await fn(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == tries:
+                        logger.error(f"{e!r}, giving up after {tries} attempts.")
+                        raise
+                    if kind is not None:
+                        count_retry(signature, kind, e, args, kwargs)
+                    delay = get_backoff_seconds(attempt)
+                    logger.warning(f"{e!r}, retrying in {delay * 1000:.1f} ms. Attempt {attempt} of {tries}.")
+                    await asyncio.sleep(delay)
+            return None
+
+        return wrapper
+
+    return decorator
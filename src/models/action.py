@@ -1,31 +1,28 @@
-from datetime import datetime, timezone
-
-
 class Action:
     PLACE = "place"
     MOVE = "move"
     PICKUP = "pickup"
     DISCARD = "discard"
 
-    def __init__(self, timestamp: datetime, action_id: str, action: str):
-        # Convert datetime to Unix timestamp in microseconds
-        self.timestamp = int(
-            (timestamp -
-             datetime(
-                 1970,
-                 1,
-                 1,
-                 tzinfo=timezone.utc)).total_seconds() *
-            1_000_000)
+    __slots__ = ("timestamp", "id", "action_type", "target")
+
+    def __init__(self, timestamp: int, action_id: str, action: str, target: str = None):
+        # Unix timestamp in microseconds
+        self.timestamp = timestamp
         self.id = action_id
         self.action_type = action
+        # shelf the order is placed on or moved to, discards are from the room shelf
+        self.target = target
 
     def __str__(self) -> str:
         return str(self.to_dict())
 
     def to_dict(self) -> str:
-        return dict(
+        action = dict(
             id=self.id,
             timestamp=self.timestamp,
             action=self.action_type,
         )
+        if self.target is not None:
+            action["target"] = self.target
+        return action
@@ -1,55 +1,142 @@
-from datetime import datetime, timezone
-from threading import Lock
+import threading
+import time
+from array import array
+from itertools import count
+from operator import attrgetter
+from queue import SimpleQueue
 from typing import List
 
+import numpy as np
+
 from models.action import Action
-from models.thread_safe_list import ThreadSafeList
+from models.action_table import ACTION_CODES, STORAGE_CODES, UNKNOWN, ActionTable
+from models.clock import Clock, clock as wall_clock
+from models.metrics import KitchenMetrics
 
 
 class ActionLog:
-    def __init__(self, actions: ThreadSafeList = None):
-        if actions is None:
-            self._actions = ThreadSafeList()
-        else:
-            self._actions = actions
-        self._lock = Lock()
-        self._snapshot = []
+    """
+    Append-only log of actions shared by job threads.
+
+    Every thread appends to its own buffer, so recording an action takes no lock. Snapshots sort the
+    concatenated buffers by timestamp with timsort instead of a k-way merge of the buffers: a buffer
+    is mostly ordered, timsort merges the ordered runs it finds, and it still sorts correctly where
+    a buffer isn't ordered. In asyncio mode one event loop thread records for interleaved jobs, and
+    a placement is stamped before its commit is awaited, so actions can land out of time order.
+    Buffers also keep the actions coded as integers, so validation reads an ActionTable without
+    going back to the Action objects.
+
+    When actions_queue is given, every action is also put on it as soon as it is recorded.
+    Actions are stamped by the wall clock unless the run replaces it with a simulated one.
+    Append times are recorded when the run sets metrics.
+    """
+
+    def __init__(self, actions_queue: SimpleQueue = None):
+        self._actions_queue = actions_queue
+        self.clock: Clock = wall_clock
+        self.metrics: KitchenMetrics = None
+        self._local = threading.local()
+        self._buffers: List[_Buffer] = []
+        self._buffers_lock = threading.Lock()
+        self._order_codes = _OrderCodes()
 
     def place(self, order_id: str):
-        self.add(self.get_place(order_id))
+        self.record(Action.PLACE, order_id)
 
     def move(self, order_id: str):
-        self.add(self.get_move(order_id))
+        self.record(Action.MOVE, order_id)
 
     def discard(self, order_id: str):
-        self.add(self.get_discard(order_id))
+        self.record(Action.DISCARD, order_id)
 
     def pickup(self, order_id: str):
-        self.add(self.get_pickup(order_id))
+        self.record(Action.PICKUP, order_id)
+
+    def record(self, action_type: str, order_id: str, timestamp_us: int = None, target: str = None):
+        """Timestamp is microseconds since Unix epoch, current time if not given. Target is the shelf."""
+        if timestamp_us is None:
+            timestamp_us = self.clock.now_us()
+        self.add(Action(timestamp_us, order_id, action_type, target))
 
     def add(self, action: Action):
-        self._actions.append(action)
+        if self.metrics is None:
+            self._append(action)
+            return
+        started = time.perf_counter()
+        self._append(action)
+        self.metrics.action_append_seconds.labels().observe(time.perf_counter() - started)
+
+    def _append(self, action: Action):
+        try:
+            buffer = self._local.buffer
+        except AttributeError:
+            buffer = self._local.buffer = _Buffer()
+            with self._buffers_lock:
+                self._buffers.append(buffer)
+        buffer.order.append(self._order_codes.get(action.id))
+        buffer.kind.append(ACTION_CODES.get(action.action_type, UNKNOWN))
+        buffer.target.append(STORAGE_CODES.get(action.target, UNKNOWN))
+        buffer.timestamp.append(action.timestamp)
+        # the action is appended last, so a concurrent reader never sees an action without its codes
+        buffer.actions.append(action)
+        if self._actions_queue is not None:
+            self._actions_queue.put(action)
+
+    def get_count(self) -> int:
+        with self._buffers_lock:
+            return sum(len(buffer.actions) for buffer in self._buffers)
 
     def get_snapshot(self) -> List[Action]:
-        actions = self._actions.get_snapshot()
-        return sorted(actions, key=lambda action: action.timestamp)
+        with self._buffers_lock:
+            actions = [action for buffer in self._buffers for action in buffer.actions]
+        # timsort finds the ordered runs and merges them, which is faster than heapq.merge
+        actions.sort(key=_get_timestamp)
+        return actions
+
+    def get_table(self) -> ActionTable:
+        """Actions recorded so far as integer columns, not ordered by time."""
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+        counts = [len(buffer.actions) for buffer in buffers]
+        # slicing copies, a buffer can't grow while numpy views it
+        columns = [
+            np.concatenate([np.frombuffer(getattr(buffer, name)[:n], dtype) for buffer, n in zip(buffers, counts)])
+            if buffers else np.empty(0, dtype)
+            for name, dtype in _Buffer.COLUMNS
+        ]
+        return ActionTable(self._order_codes.codes, *columns)
+
+
+class _OrderCodes:
+    """Codes of the order ids recorded by all threads, see ActionTable."""
+
+    __slots__ = ("codes", "_next_code")
+
+    def __init__(self):
+        self.codes = {}
+        # next() on a count is atomic, threads coding a new order at once may skip a code but never share one
+        self._next_code = count()
+
+    def get(self, order_id: str) -> int:
+        code = self.codes.get(order_id)
+        if code is None:
+            code = self.codes.setdefault(order_id, next(self._next_code))
+        return code
+
+
+class _Buffer:
+    """Actions recorded by one thread and the same actions as ActionTable columns."""
 
-    @staticmethod
-    def get_move(order_id: str):
-        return Action(ActionLog._get_now(), order_id, Action.MOVE)
+    COLUMNS = [("order", np.int64), ("kind", np.int8), ("target", np.int8), ("timestamp", np.int64)]
 
-    @staticmethod
-    def get_place(order_id: str):
-        return Action(ActionLog._get_now(), order_id, Action.PLACE)
+    __slots__ = ("actions", "order", "kind", "target", "timestamp")
 
-    @staticmethod
-    def get_discard(order_id: str):
-        return Action(ActionLog._get_now(), order_id, Action.DISCARD)
+    def __init__(self):
+        self.actions: List[Action] = []
+        self.order = array("q")
+        self.kind = array("b")
+        self.target = array("b")
+        self.timestamp = array("q")
 
-    @staticmethod
-    def get_pickup(order_id: str):
-        return Action(ActionLog._get_now(), order_id, Action.PICKUP)
 
-    @staticmethod
-    def _get_now():
-        return datetime.now(tz=timezone.utc)
+_get_timestamp = attrgetter("timestamp")
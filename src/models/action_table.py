@@ -0,0 +1,87 @@
+from itertools import count, repeat
+from operator import attrgetter, itemgetter, methodcaller
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from constants import STORAGE_TYPES
+from models.action import Action
+
+ACTION_TYPES = [Action.PLACE, Action.MOVE, Action.PICKUP, Action.DISCARD]
+ACTION_CODES = {action_type: code for code, action_type in enumerate(ACTION_TYPES)}
+# shelves are coded by their position in STORAGE_TYPES
+STORAGE_CODES = {storage_type: code for code, storage_type in enumerate(STORAGE_TYPES)}
+# code of an unknown action type, and of an unknown or missing shelf
+UNKNOWN = -1
+
+
+class ActionTable:
+    """
+    Actions as integer columns for validation: order codes, action types coded by their position in
+    ACTION_TYPES, target shelves coded by their position in STORAGE_TYPES and timestamps.
+
+    order_codes maps order ids to their codes. Codes are unique per order and grow in the order ids are
+    first seen, but they need not be dense. Actions are in no particular order.
+    """
+
+    __slots__ = ("order_codes", "order", "kind", "target", "timestamp")
+
+    def __init__(
+            self,
+            order_codes: Dict[str, int],
+            order: np.ndarray,
+            kind: np.ndarray,
+            target: np.ndarray,
+            timestamp: np.ndarray):
+        self.order_codes = order_codes
+        self.order = order
+        self.kind = kind
+        self.target = target
+        self.timestamp = timestamp
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def from_actions(cls, actions: List[Action]) -> "ActionTable":
+        return cls._from_fields(
+            map(_get_id, actions), map(_get_action_type, actions), map(_get_target, actions),
+            map(_get_timestamp, actions), len(actions),
+        )
+
+    @classmethod
+    def from_dicts(cls, serialized_actions: List[dict]) -> "ActionTable":
+        """Actions as serialized by Action.to_dict. Raises KeyError for a missing field."""
+        return cls._from_fields(
+            map(_get_serialized_id, serialized_actions), map(_get_serialized_action, serialized_actions),
+            map(_get_serialized_target, serialized_actions), map(_get_serialized_timestamp, serialized_actions),
+            len(serialized_actions),
+        )
+
+    @classmethod
+    def _from_fields(
+            cls,
+            ids: Iterable[str],
+            action_types: Iterable[str],
+            targets: Iterable[str],
+            timestamps: Iterable[int],
+            action_count: int) -> "ActionTable":
+        # an order's code is the position of its first action, builtin maps keep encoding out of the interpreter loop
+        order_codes = {}
+        return cls(
+            order_codes,
+            np.fromiter(map(order_codes.setdefault, ids, count()), np.int64, action_count),
+            np.fromiter(map(ACTION_CODES.get, action_types, repeat(UNKNOWN)), np.int8, action_count),
+            np.fromiter(map(STORAGE_CODES.get, targets, repeat(UNKNOWN)), np.int8, action_count),
+            np.fromiter(timestamps, np.int64, action_count),
+        )
+
+
+_get_id = attrgetter("id")
+_get_action_type = attrgetter("action_type")
+_get_target = attrgetter("target")
+_get_timestamp = attrgetter("timestamp")
+_get_serialized_id = itemgetter("id")
+_get_serialized_action = itemgetter("action")
+_get_serialized_target = methodcaller("get", "target")
+_get_serialized_timestamp = itemgetter("timestamp")
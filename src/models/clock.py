@@ -0,0 +1,47 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class Clock:
+    """
+    Wall clock read through the monotonic clock. The epoch time is sampled once, so timestamps
+    are cheap integers that never go backwards even if the system time is adjusted.
+    """
+
+    def __init__(self):
+        self._epoch_anchor_ns = time.time_ns()
+        self._monotonic_anchor_ns = time.monotonic_ns()
+
+    def now_us(self) -> int:
+        """Microseconds since Unix epoch."""
+        return (self._epoch_anchor_ns + time.monotonic_ns() - self._monotonic_anchor_ns) // 1000
+
+    def now_seconds(self) -> float:
+        return self.now_us() / 1_000_000
+
+
+class SimulatedClock(Clock):
+    """
+    Clock that only moves when advanced. Runs in simulated time advance it to the due time
+    of each job instead of sleeping, so a schedule replays as fast as jobs execute.
+    """
+
+    def __init__(self, start_us: int):
+        super().__init__()
+        self._now_us = start_us
+
+    def now_us(self) -> int:
+        return self._now_us
+
+    def advance_to(self, now_us: int) -> None:
+        self._now_us = max(self._now_us, now_us)
+
+
+clock = Clock()
+
+
+def from_epoch_us(timestamp_us: int) -> datetime:
+    return EPOCH + timestamp_us * ONE_MICROSECOND
@@ -1,6 +1,11 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field, model_validator
 from typing_extensions import Self
 
+from constants import ExecutionMode, EXECUTION_MODES, StorageEngine, STORAGE_ENGINES, VictimPolicy, VICTIM_POLICIES
+from models.inventory import Inventory
+
 
 class Config(BaseModel):
     auth: str = Field("", description="Authentication token")
@@ -17,6 +22,35 @@ class Config(BaseModel):
         None,
         description="Problem file path used for local testing outside docker environment.",
     )
+    cache_problems: bool = Field(
+        False,
+        description="Reuse problems downloaded with the same endpoint, auth, name and seed (keeps their test id)",
+    )
+    storage_engine: str = Field(
+        StorageEngine.POSTGRES,
+        description="Storage engine: postgres (durable) or memory (in-process, fastest)",
+    )
+    execution_mode: str = Field(
+        ExecutionMode.THREADS,
+        description="Job execution mode: threads (thread pool) or asyncio (event loop with async database driver)",
+    )
+    batch_window_ms: int = Field(
+        0,
+        ge=0,
+        le=5,
+        description="Apply events due within this many milliseconds in one transaction (disabled if zero)",
+    )
+    simulated_time: bool = Field(
+        False,
+        description="Replay the schedule in simulated time as fast as jobs execute instead of waiting for due times",
+    )
+    victim_policy: str = Field(
+        VictimPolicy.RELATIVE_AGE,
+        description="How a room shelf order to move or discard is chosen (memory engine supports all policies)",
+    )
+    hot_capacity: Optional[int] = Field(None, ge=1, description="Hot shelf capacity (server default if empty)")
+    cold_capacity: Optional[int] = Field(None, ge=1, description="Cold shelf capacity (server default if empty)")
+    room_capacity: Optional[int] = Field(None, ge=1, description="Room shelf capacity (server default if empty)")
 
     @model_validator(mode="after")
     def check_pickup_times(self) -> Self:
@@ -24,8 +58,47 @@ class Config(BaseModel):
             raise ValueError("max_pickup must be greater than or equal to min_pickup")
         return self
 
+    @model_validator(mode="after")
+    def check_storage_engine(self) -> Self:
+        if self.storage_engine not in STORAGE_ENGINES:
+            raise ValueError(f"storage_engine must be one of: {STORAGE_ENGINES}")
+        return self
+
+    @model_validator(mode="after")
+    def check_execution_mode(self) -> Self:
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of: {EXECUTION_MODES}")
+        return self
+
+    @model_validator(mode="after")
+    def check_batch_window(self) -> Self:
+        if self.batch_window_ms and self.execution_mode != ExecutionMode.THREADS:
+            raise ValueError("batch_window_ms is supported only in threads execution mode")
+        return self
+
+    @model_validator(mode="after")
+    def check_simulated_time(self) -> Self:
+        if self.simulated_time and (self.execution_mode != ExecutionMode.THREADS or self.batch_window_ms):
+            raise ValueError("simulated_time is supported only in threads execution mode without batching")
+        return self
+
+    @model_validator(mode="after")
+    def check_victim_policy(self) -> Self:
+        if self.victim_policy not in VICTIM_POLICIES:
+            raise ValueError(f"victim_policy must be one of: {VICTIM_POLICIES}")
+        if self.victim_policy != VictimPolicy.RELATIVE_AGE and self.storage_engine != StorageEngine.MEMORY:
+            raise ValueError(f"postgres storage engine supports only {VictimPolicy.RELATIVE_AGE} victim_policy")
+        return self
+
     @model_validator(mode="after")
     def check_problem_source(self) -> Self:
         if not self.problem_file_path and (not self.auth or not self.endpoint):
             raise ValueError("Problem source must be provided (auth and endpoint) or (problem_file_path)")
         return self
+
+    def get_capacities(self, defaults: Inventory) -> Inventory:
+        return Inventory(
+            hot=self.hot_capacity or defaults.hot,
+            cold=self.cold_capacity or defaults.cold,
+            room=self.room_capacity or defaults.room,
+        )
@@ -1,5 +1,20 @@
 import os
 
+from constants import MaxInventory
+from models.inventory import Inventory
+
+
+class PoolConfig:
+    """Settings of the shared engine pools, see EngineRegistry."""
+
+    def __init__(self, pre_ping=None, recycle_seconds=None, max_connections=None):
+        if pre_ping is None:
+            pre_ping = os.getenv('DB_POOL_PRE_PING', 'false').lower() == 'true'
+        self.pre_ping = pre_ping
+        self.recycle_seconds = int(recycle_seconds or os.getenv('DB_POOL_RECYCLE_SECONDS', '1800'))
+        # connections all worker processes may open, PostgreSQL allows 100 and reserves 3 for superusers
+        self.max_connections = int(max_connections or os.getenv('DB_MAX_CONNECTIONS', '97'))
+
 
 class DatabaseConfig:
     def __init__(
@@ -8,9 +23,24 @@ class DatabaseConfig:
             db_user=None,
             db_password=None,
             db_host=None,
-            db_port=None):
+            db_port=None,
+            hot_capacity=None,
+            cold_capacity=None,
+            room_capacity=None,
+            pool_pre_ping=None,
+            pool_recycle_seconds=None,
+            max_connections=None):
         self.db_name = db_name or os.getenv('DB_NAME')
         self.user = db_user or os.getenv('DB_USER')
         self.password = db_password or os.getenv('DB_PASSWORD')
         self.host = db_host or os.getenv('DB_HOST', 'localhost')
         self.port = db_port or os.getenv('DB_PORT', '5432')
+        self.capacities = Inventory(
+            hot=int(hot_capacity or os.getenv('HOT_CAPACITY', str(MaxInventory.HOT))),
+            cold=int(cold_capacity or os.getenv('COLD_CAPACITY', str(MaxInventory.COLD))),
+            room=int(room_capacity or os.getenv('ROOM_CAPACITY', str(MaxInventory.ROOM))),
+        )
+        self.pool = PoolConfig(pool_pre_ping, pool_recycle_seconds, max_connections)
+
+    def get_capacities(self) -> Inventory:
+        return Inventory(hot=self.capacities.hot, cold=self.capacities.cold, room=self.capacities.room)
@@ -0,0 +1,225 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Tuple, Union
+
+# upper bounds in seconds, from tens of microseconds (memory engine) to seconds (pool exhaustion)
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """
+    Counts observations in fixed buckets, so recording one is a bisect and a few additions under a lock.
+    Quantiles are estimated as the upper bound of the bucket they fall in, capped at the largest observation.
+    Observations are also recorded in the parent histogram when there is one.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "total", "max", "_lock", "_parent")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, parent: "Histogram" = None):
+        self.buckets = buckets
+        # last count is for observations above the highest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = Lock()
+        self._parent = parent
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+        if self._parent is not None:
+            self._parent.observe(value)
+
+    def get_quantile(self, quantile: float) -> float:
+        with self._lock:
+            rank = quantile * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank and seen:
+                    return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+            return 0.0
+
+    def get_summary(self) -> dict:
+        with self._lock:
+            count, total, max_value = self.count, self.total, self.max
+        return dict(
+            count=count,
+            mean=total / count if count else 0.0,
+            p50=self.get_quantile(0.5),
+            p99=self.get_quantile(0.99),
+            max=max_value,
+        )
+
+    def render(self, name: str, labels: str) -> List[str]:
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.total
+        separator = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {total}")
+        lines.append(f"{name}_count{suffix} {count}")
+        return lines
+
+
+class Counter:
+    __slots__ = ("value", "_lock", "_parent")
+
+    def __init__(self, parent: "Counter" = None):
+        self.value = 0
+        self._lock = Lock()
+        self._parent = parent
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+        if self._parent is not None:
+            self._parent.inc(amount)
+
+    def get_summary(self) -> int:
+        return self.value
+
+    def render(self, name: str, labels: str) -> List[str]:
+        suffix = f"{{{labels}}}" if labels else ""
+        return [f"{name}{suffix} {self.value}"]
+
+
+class MetricFamily:
+    """
+    Histograms or counters of one metric, one per combination of values of its labels (none, one or a tuple).
+    Summaries of labelled metrics are nested by label in label order.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            metric_type: type,
+            label: Union[str, Tuple[str, ...]] = None,
+            parent: "MetricFamily" = None):
+        self.name = name
+        self.description = description
+        self.metric_type = metric_type
+        self.label_names: Tuple[str, ...] = (label,) if isinstance(label, str) else tuple(label or ())
+        self._parent = parent
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = Lock()
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    parent = self._parent.labels(*values) if self._parent is not None else None
+                    series = self._series[values] = self.metric_type(parent=parent)
+        return series
+
+    def get_summary(self) -> dict:
+        with self._lock:
+            series = dict(self._series)
+        if not self.label_names:
+            return series[()].get_summary() if series else None
+        summary = {}
+        for values, metric in series.items():
+            level = summary
+            for value in values[:-1]:
+                level = level.setdefault(value, {})
+            level[values[-1]] = metric.get_summary()
+        return summary
+
+    def get_total(self) -> int:
+        """Sum of a counter over all label values."""
+        with self._lock:
+            series = list(self._series.values())
+        return sum(metric.value for metric in series)
+
+    def render(self) -> List[str]:
+        metric_type = "histogram" if self.metric_type is Histogram else "counter"
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {metric_type}"]
+        with self._lock:
+            series = dict(self._series)
+        if not self.label_names and not series:
+            # unlabelled metrics are exported before the first observation
+            series[()] = self.metric_type()
+        for values, metric in series.items():
+            labels = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, values))
+            lines.extend(metric.render(self.name, labels))
+        return lines
+
+
+# one attribute per metric family so recording sites name the family they feed, a holder would only add indirection
+class KitchenMetrics:  # pylint: disable=too-many-instance-attributes
+    """
+    Job and storage latencies of a run. Every run records into its own instance created with the process-wide
+    one as parent, so run summaries and the /metrics endpoint are fed by the same observations.
+    """
+
+    def __init__(self, parent: "KitchenMetrics" = None):
+        def family(
+                name: str,
+                description: str,
+                metric_type: type,
+                label: Union[str, Tuple[str, ...]] = None) -> MetricFamily:
+            parent_family = getattr(parent, name) if parent is not None else None
+            return MetricFamily(f"kitchen_{name}", description, metric_type, label, parent_family)
+
+        self.dispatch_lag_seconds = family(
+            "dispatch_lag_seconds", "Time from the due time of a job to its start.", Histogram, "kind")
+        self.job_duration_seconds = family(
+            "job_duration_seconds", "Time a job runs, including retries.", Histogram, "kind")
+        self.connection_wait_seconds = family(
+            "connection_wait_seconds", "Time spent waiting for a pooled connection.", Histogram)
+        self.database_call_seconds = family(
+            "database_call_seconds", "Duration of database client calls, transaction is the whole transaction.",
+            Histogram, "method")
+        self.transaction_conflicts_total = family(
+            "transaction_conflicts_total",
+            "Transactions rolled back by a conflict. Jobs retry them unless it was their last attempt.", Counter)
+        self.job_retries_total = family(
+            "job_retries_total", "Jobs run again after a retryable failure.", Counter, ("kind", "cause"))
+        self.failed_jobs_total = family(
+            "failed_jobs_total", "Jobs that raised, including jobs that ran out of retries.", Counter, "kind")
+        self.action_append_seconds = family(
+            "action_append_seconds", "Time to append an action to the action log.", Histogram)
+        self.families = [
+            self.dispatch_lag_seconds,
+            self.job_duration_seconds,
+            self.connection_wait_seconds,
+            self.database_call_seconds,
+            self.transaction_conflicts_total,
+            self.job_retries_total,
+            self.failed_jobs_total,
+            self.action_append_seconds,
+        ]
+
+    def get_summary(self) -> dict:
+        """Counts, mean, p50, p99 and max in seconds of every metric that has observations."""
+        summary = {}
+        for metric_family in self.families:
+            family_summary = metric_family.get_summary()
+            if family_summary:
+                summary[metric_family.name.removeprefix("kitchen_")] = family_summary
+        return summary
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for metric_family in self.families:
+            lines.extend(metric_family.render())
+        return "\n".join(lines) + "\n"
+
+
+kitchen_metrics = KitchenMetrics()
@@ -2,6 +2,8 @@ from typing import Dict, List
 
 
 class Order:
+    __slots__ = ("id", "name", "temp", "freshness")
+
     def __init__(self, order_id: str, name: str, temp: str, freshness: int):
         self.id = order_id
         self.name = name
@@ -0,0 +1,110 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from constants import STORAGE_TYPES
+from models.order import Order
+
+
+class OrderTable:
+    """
+    Orders stored column by column: ids in one UTF-8 buffer with end offsets, names and temperatures as
+    codes into tables of distinct values and freshness as int32. An order takes about 25 bytes instead of
+    a few hundred as an Order object with its strings. Indexing builds an Order view on demand.
+
+    Temperature codes of storage types are their positions in STORAGE_TYPES, so temp_codes can be used
+    as storage indices directly. Orders are only appended, a reader may index orders while another
+    thread appends more.
+    """
+
+    __slots__ = ("_id_data", "_id_ends", "_names", "name_codes", "_temps", "temp_codes", "freshness")
+
+    def __init__(self, orders: Iterable[Order] = ()):
+        self._id_data = bytearray()
+        self._id_ends = array("Q")
+        self._names = _ValueCodes()
+        self.name_codes = array("I")
+        self._temps = _ValueCodes(STORAGE_TYPES)
+        self.temp_codes = array("b")
+        self.freshness = array("i")
+        self.extend(orders)
+
+    @property
+    def names(self) -> List[str]:
+        """Distinct names, name_codes index into them."""
+        return self._names.values
+
+    @property
+    def temps(self) -> List[str]:
+        """Distinct temperatures, temp_codes index into them."""
+        return self._temps.values
+
+    def append(self, order: Order) -> None:
+        self._id_data += order.id.encode("utf-8")
+        self.name_codes.append(self._names.get_code(order.name))
+        self.temp_codes.append(self._temps.get_code(order.temp))
+        self.freshness.append(order.freshness)
+        # the id end is written last, so a concurrent reader never sees an order without its columns
+        self._id_ends.append(len(self._id_data))
+
+    def extend(self, orders: Iterable[Order]) -> None:
+        for order in orders:
+            self.append(order)
+
+    def __len__(self) -> int:
+        return len(self._id_ends)
+
+    def __getitem__(self, index: int) -> Order:
+        if index < 0:
+            index += len(self)
+        return Order(
+            order_id=self.get_id(index),
+            name=self.names[self.name_codes[index]],
+            temp=self.temps[self.temp_codes[index]],
+            freshness=self.freshness[index],
+        )
+
+    def __iter__(self) -> Iterator[Order]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_id(self, index: int) -> str:
+        start = self._id_ends[index - 1] if index else 0
+        return self._id_data[start:self._id_ends[index]].decode("utf-8")
+
+    def iter_ids(self) -> Iterator[str]:
+        ends = self._id_ends[:len(self)]
+        if not ends:
+            return iter(())
+        # a copy, the buffer can't grow while a memoryview of it exists
+        data = bytes(self._id_data[:ends[-1]])
+        if b"\0" in data:
+            return _iter_slices(data, ends)
+        # one decode and split instead of one decode per id: a NUL byte is inserted at the end of every id
+        separated = np.insert(np.frombuffer(data, np.uint8), np.array(ends[:-1], np.intp), 0)
+        return iter(separated.tobytes().decode("utf-8").split("\0"))
+
+
+def _iter_slices(data: bytes, ends: array) -> Iterator[str]:
+    start = 0
+    for end in ends:
+        yield data[start:end].decode("utf-8")
+        start = end
+
+
+class _ValueCodes:
+    """Distinct values of a column in the order they were first seen, a value's code is its position."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = list(values)
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def get_code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
@@ -1,16 +1,47 @@
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator
 
 from models.order import Order
+from models.order_table import OrderTable
 
 
 class Problem:
-    def __init__(self, test_id: str, orders: List[Order]):
+    """
+    Orders are kept in an OrderTable. Orders of a streamed problem are parsed from pending_orders as they are
+    iterated and appended to orders, so scheduling starts before the rest of the problem is read.
+    """
+
+    def __init__(self, test_id: str, orders: Iterable[Order], pending_orders: Iterator[Order] = None):
         self.test_id = test_id
-        self.orders = orders
+        self.orders = orders if isinstance(orders, OrderTable) else OrderTable(orders)
+        self.pending_orders = pending_orders
 
     def __str__(self):
         return str(self.to_dict())
 
+    def iter_orders(self) -> Iterator[Order]:
+        """All orders in problem order, parsing pending ones once the parsed ones run out. One iteration at a time."""
+        for index in self.iter_indices():
+            yield self.orders[index]
+
+    def iter_indices(self) -> Iterator[int]:
+        """Like iter_orders, without building Order views."""
+        yield from range(len(self.orders))
+        if self.pending_orders is None:
+            return
+        for order in self.pending_orders:
+            self.orders.append(order)
+            yield len(self.orders) - 1
+        self.pending_orders = None
+
+    def load_orders(self) -> "Problem":
+        """Parses all pending orders."""
+        for _ in self.iter_indices():
+            pass
+        return self
+
+    def is_empty(self) -> bool:
+        return next(self.iter_indices(), None) is None
+
     def to_dict(self):
         return dict(
             test_id=self.test_id, orders=[
@@ -19,5 +50,5 @@ class Problem:
     @staticmethod
     def from_dict(data: Dict):
         test_id = data["test_id"]
-        orders = [Order.from_dict(order_data) for order_data in data["orders"]]
+        orders = OrderTable(map(Order.from_dict, data["orders"]))
         return Problem(test_id=test_id, orders=orders)
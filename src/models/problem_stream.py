@@ -0,0 +1,167 @@
+import codecs
+import json
+import mmap
+import re
+from typing import Iterable, Iterator
+
+from models.order import Order
+from models.problem import Problem
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JsonStreamReader:
+    """
+    Reads JSON values one at a time from text chunks. Only the unread part of the current chunk is kept,
+    so containers of any size are read with memory bounded by the largest value read at once.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def read_value(self):
+        """Reads a whole value: a string, number, literal or a container with everything in it."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # numbers and literals may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def iter_array(self) -> Iterator:
+        """Yields the items of an array one by one."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self.read_value()
+            # usually the separator follows the value right away
+            char = self._buffer[self._position:self._position + 1]
+            if char not in ("]", ","):
+                char = self._expect("]", ",")
+            else:
+                self._position += 1
+            if char == "]":
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        """Yields the keys of an object. The caller reads the value of a key before asking for the next one."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key at position {self._position}, got: {key!r}")
+            self._expect(":")
+            yield key
+            if self._expect("}", ",") == "}":
+                return
+
+    def read_end(self) -> None:
+        """Reads the rest of the stream, which must be whitespace only."""
+        char = self._peek()
+        if char:
+            raise ValueError(f"Expected the end of JSON stream, got: {char!r}")
+
+    def _expect(self, *chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars} in JSON stream, got: {char!r}")
+        self._position += 1
+        return char
+
+    def _peek(self) -> str:
+        """Next character that is not whitespace, empty at the end of the stream."""
+        while True:
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def _fill(self) -> bool:
+        """Drops the read part of the buffer and appends the next chunk. False at the end of the stream."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+
+def iter_file_chunks(path: str) -> Iterator[str]:
+    """Text of a UTF-8 file in chunks, read through a memory map so pages are loaded as parsing reaches them."""
+    with open(path, "rb") as fp:
+        # empty files can't be mapped
+        if not fp.seek(0, 2):
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            offsets = range(0, len(mapped), CHUNK_SIZE)
+            yield from _decode_chunks(mapped[offset:offset + CHUNK_SIZE] for offset in offsets)
+
+
+def _decode_chunks(chunks: Iterable[bytes]) -> Iterator[str]:
+    # a multibyte character may be split between chunks
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def iter_order_array(chunks: Iterable[str]) -> Iterator[Order]:
+    """Orders of a JSON array, the body the challenge server responds with."""
+    reader = JsonStreamReader(chunks)
+    yield from map(Order.from_dict, reader.iter_array())
+    reader.read_end()
+
+
+def stream_problem_file(path: str) -> Problem:
+    """
+    Problem whose orders are parsed from a {"test_id": ..., "orders": [...]} file as they are iterated.
+    The test id is set once it is read, which is only after the orders when it follows them in the file.
+    """
+    problem = Problem(test_id=None, orders=())
+
+    def iter_problem_orders() -> Iterator[Order]:
+        reader = JsonStreamReader(iter_file_chunks(path))
+        for key in reader.iter_object():
+            if key == "orders":
+                yield from map(Order.from_dict, reader.iter_array())
+            elif key == "test_id":
+                problem.test_id = reader.read_value()
+            else:
+                reader.read_value()
+        reader.read_end()
+
+    problem.pending_orders = iter_problem_orders()
+    return problem
+
+
+def stream_problem_response(test_id: str, chunks: Iterable[bytes]) -> Problem:
+    """Problem whose orders are parsed from the challenge server response body as it is downloaded."""
+    return Problem(test_id=test_id, orders=(), pending_orders=iter_order_array(_decode_chunks(chunks)))
@@ -0,0 +1,23 @@
+import os
+
+
+class ServerConfig:
+    """Web server settings, read from environment variables of the kitchen container."""
+
+    def __init__(
+            self,
+            bind=None,
+            workers=None,
+            threads=None,
+            keepalive_seconds=None,
+            timeout_seconds=None,
+            graceful_timeout_seconds=None):
+        self.bind = bind or os.getenv('WEB_BIND', '0.0.0.0:8000')
+        # runs and their status live in the worker that accepted them, see README
+        self.workers = int(workers or os.getenv('WEB_WORKERS', '1'))
+        self.threads = int(threads or os.getenv('WEB_THREADS', '32'))
+        self.keepalive_seconds = int(keepalive_seconds or os.getenv('WEB_KEEPALIVE_SECONDS', '5'))
+        self.timeout_seconds = int(timeout_seconds or os.getenv('WEB_TIMEOUT_SECONDS', '120'))
+        # time a stopping worker gets to finish requests and runs in progress before it is killed
+        self.graceful_timeout_seconds = int(
+            graceful_timeout_seconds or os.getenv('WEB_GRACEFUL_TIMEOUT_SECONDS', '300'))
@@ -0,0 +1,17 @@
+class StorageAction:
+    """Change of shelves made while placing an order. Storage type is where the order ended up."""
+
+    def __init__(self, action_type: str, order_id: str, storage_type: str):
+        self.action_type = action_type
+        self.order_id = order_id
+        self.storage_type = storage_type
+
+    def __str__(self) -> str:
+        return str(self.to_dict())
+
+    def to_dict(self) -> str:
+        return dict(
+            action_type=self.action_type,
+            order_id=self.order_id,
+            storage_type=self.storage_type,
+        )
@@ -0,0 +1,68 @@
+import asyncio
+import heapq
+import time
+from typing import Awaitable, Callable, Set
+
+from scheduler.dispatcher import BaseDispatcher
+
+
+class AsyncDispatcher(BaseDispatcher):
+    """
+    Asyncio counterpart of Dispatcher. Each due job becomes a task on the running event loop,
+    so the number of jobs in flight is limited by the connection pool rather than by worker threads.
+    """
+
+    def __init__(self, run_job: Callable[[int, int], Awaitable[None]]):
+        super().__init__(run_job)
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: asyncio.Event = None
+        self._start = None
+        self._closed = False
+
+    def add(self, due_us: int, kind: int, order_index: int) -> None:
+        heapq.heappush(self._heap, (due_us, kind, order_index))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def close(self) -> None:
+        """No more jobs will be added. run returns once all added jobs finish."""
+        self._closed = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def now_us(self) -> int:
+        return (time.monotonic_ns() - self._start) // 1000
+
+    async def run(self) -> None:
+        """Dispatch jobs until closed and all jobs finish. Due times are relative to the moment run is called."""
+        self._start = time.monotonic_ns()
+        self._wakeup = asyncio.Event()
+
+        while self._heap or not self._closed:
+            if not self._heap:
+                await self._wait_for_wakeup(None)
+                continue
+
+            wait_us = self._heap[0][0] - self.now_us()
+            if wait_us > 0:
+                await self._wait_for_wakeup(wait_us / 1_000_000)
+                continue
+
+            due_us, kind, order_index = heapq.heappop(self._heap)
+            task = asyncio.create_task(self._execute(due_us, kind, order_index))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _wait_for_wakeup(self, timeout: float = None) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _execute(self, due_us: int, kind: int, order_index: int) -> None:
+        with self._track_job(due_us, kind, order_index, self.now_us()):
+            await self._run_job(kind, order_index)
@@ -0,0 +1,245 @@
+import heapq
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Condition, Lock, Thread
+from typing import Callable, Iterator, List, NamedTuple, Tuple
+
+from constants import JobKind
+from models.clock import clock
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchEvent:
+    """
+    Passed to start listeners when a job starts and to listeners once it finishes.
+    Times are microseconds since dispatcher start, duration is set when the job finishes.
+    """
+
+    __slots__ = ("kind", "order_index", "scheduled_us", "started_us", "duration_us", "exception")
+
+    def __init__(self, kind: int, order_index: int, scheduled_us: int, started_us: int, exception: Exception = None):
+        self.kind = kind
+        self.order_index = order_index
+        self.scheduled_us = scheduled_us
+        self.started_us = started_us
+        self.duration_us = 0
+        self.exception = exception
+
+    @property
+    def job_id(self) -> str:
+        return get_job_id(self.kind, self.order_index)
+
+    @property
+    def lag_us(self) -> int:
+        return self.started_us - self.scheduled_us
+
+
+def get_job_id(kind: int, order_index: int) -> str:
+    return f"{order_index}_{JobKind.NAMES[kind]}"
+
+
+class DispatchLag:
+    """Start lag of dispatched jobs, recorded by worker threads."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, lag_us: int) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_us += lag_us
+            self.max_us = max(self.max_us, lag_us)
+
+    def get_mean_us(self) -> float:
+        return self.total_us / self.count if self.count else 0
+
+
+class BaseDispatcher:
+    """
+    Job heap, listeners and lag statistics shared by the dispatchers. They differ in when and where
+    jobs run, each job runs inside _track_job.
+    """
+
+    def __init__(self, run_job: Callable):
+        self._run_job = run_job
+        self._heap: List = []
+        self._listeners: List[Callable[[DispatchEvent], None]] = []
+        self._start_listeners: List[Callable[[DispatchEvent], None]] = []
+        self.lag = DispatchLag()
+
+    @property
+    def dispatched_count(self) -> int:
+        return self.lag.count
+
+    @property
+    def max_lag_us(self) -> int:
+        return self.lag.max_us
+
+    def add_listener(self, listener: Callable[[DispatchEvent], None]) -> None:
+        self._listeners.append(listener)
+
+    def add_start_listener(self, listener: Callable[[DispatchEvent], None]) -> None:
+        self._start_listeners.append(listener)
+
+    def get_mean_lag_us(self) -> float:
+        return self.lag.get_mean_us()
+
+    @contextmanager
+    def _track_job(self, due_us: int, kind: int, order_index: int, started_us: int) -> Iterator[DispatchEvent]:
+        """
+        Notifies listeners around the job run in the with block. An exception raised by the job is logged
+        and passed to listeners with the event. Duration is measured in real time, also with a simulated clock.
+        """
+        event = DispatchEvent(kind, order_index, due_us, started_us)
+        for listener in self._start_listeners:
+            listener(event)
+
+        started = time.perf_counter_ns()
+        try:
+            yield event
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            event.exception = e
+            logger.exception(f"Job {get_job_id(kind, order_index)} raised an exception.")
+        event.duration_us = (time.perf_counter_ns() - started) // 1000
+
+        self.lag.record(event.lag_us)
+        for listener in self._listeners:
+            listener(event)
+
+
+# dispatcher states, close is ignored once stopped
+_OPEN, _CLOSED, _STOPPED = range(3)
+
+
+class _Batching(NamedTuple):
+    run: Callable[[List[Tuple[int, int, int]]], None]
+    window_us: int
+
+
+class Dispatcher(BaseDispatcher):
+    """
+    Runs jobs at their due time on a thread pool.
+
+    Jobs are kept in a heap of (due_us, kind, order_index) tuples and a single thread sleeps until
+    the earliest one is due. Jobs can be added before or after start. Dispatching starts as soon as
+    start is called, due times are relative to that moment.
+
+    When batch_window_us is set, the earliest due job and all jobs due within the window after it are
+    passed together to run_batch as a list of (due_us, kind, order_index) tuples.
+    """
+
+    def __init__(
+            self,
+            run_job: Callable[[int, int], None],
+            max_workers: int,
+            run_batch: Callable[[List[Tuple[int, int, int]]], None] = None,
+            batch_window_us: int = 0):
+        super().__init__(run_job)
+        self._batching = _Batching(run_batch, batch_window_us) if batch_window_us else None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dispatcher-worker")
+        self._condition = Condition()
+        self._thread = Thread(target=self._dispatch, name="dispatcher", daemon=True)
+        self._start = None
+        self.start_epoch_us = None
+        self._state = _OPEN
+
+    def add(self, due_us: int, kind: int, order_index: int) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (due_us, kind, order_index))
+            self._condition.notify()
+
+    def start(self) -> None:
+        self._start = time.monotonic_ns()
+        self.start_epoch_us = clock.now_us()
+        self._thread.start()
+
+    def close(self) -> None:
+        """No more jobs will be added. Dispatcher thread exits once all added jobs are submitted."""
+        with self._condition:
+            self._state = max(self._state, _CLOSED)
+            self._condition.notify()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._condition:
+            self._state = _STOPPED
+            self._condition.notify()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def now_us(self) -> int:
+        return (time.monotonic_ns() - self._start) // 1000
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                entry = self._pop_due_entry()
+                if entry is None:
+                    return
+                if self._batching:
+                    batch = self._pop_batch(entry)
+            if self._batching:
+                future = self._executor.submit(self._execute_batch, batch)
+            else:
+                future = self._executor.submit(self._execute, *entry)
+            future.add_done_callback(self._log_submit_failure)
+
+    def _pop_batch(self, first_entry: Tuple[int, int, int]) -> List[Tuple[int, int, int]]:
+        batch = [first_entry]
+        batch_end_us = first_entry[0] + self._batching.window_us
+        while self._heap and self._heap[0][0] <= batch_end_us:
+            batch.append(heapq.heappop(self._heap))
+        return batch
+
+    def _pop_due_entry(self):
+        """Wait until the earliest entry is due. Returns None when dispatching should stop."""
+        while self._state != _STOPPED:
+            if not self._heap:
+                if self._state == _CLOSED:
+                    return None
+                self._condition.wait()
+                continue
+
+            wait_us = self._heap[0][0] - self.now_us()
+            if wait_us <= 0:
+                return heapq.heappop(self._heap)
+            self._condition.wait(wait_us / 1_000_000)
+        return None
+
+    def _execute(self, due_us: int, kind: int, order_index: int) -> None:
+        with self._track_job(due_us, kind, order_index, self.now_us()):
+            self._run_job(kind, order_index)
+
+    def _execute_batch(self, batch: List[Tuple[int, int, int]]) -> None:
+        started_us = self.now_us()
+        events = [DispatchEvent(kind, order_index, due_us, started_us) for due_us, kind, order_index in batch]
+        for event in events:
+            for listener in self._start_listeners:
+                listener(event)
+
+        started = time.perf_counter_ns()
+        try:
+            self._batching.run(batch)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.exception(f"Batch of {len(batch)} jobs raised an exception.")
+            for event in events:
+                event.exception = e
+        duration_us = (time.perf_counter_ns() - started) // 1000
+
+        for event in events:
+            event.duration_us = duration_us
+            self.lag.record(event.lag_us)
+            for listener in self._listeners:
+                listener(event)
+
+    @staticmethod
+    def _log_submit_failure(future: Future) -> None:
+        exception = future.exception()
+        if exception is not None:
+            logger.error(f"Dispatcher listener failed. Error: {exception}")
@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for the kitchen container:
+
+    gunicorn -c scheduler/gunicorn_config.py scheduler.scheduler_entrypoint:app
+
+Run from "src" with both "src" and the repository root on PYTHONPATH.
+"""
+# gunicorn reads settings from lowercase module variables
+# pylint: disable=invalid-name
+import logging
+import sys
+
+from models.server_config import ServerConfig
+
+logger = logging.getLogger(__name__)
+
+server_config = ServerConfig()
+
+bind = server_config.bind
+workers = server_config.workers
+worker_class = "gthread"
+threads = server_config.threads
+keepalive = server_config.keepalive_seconds
+timeout = server_config.timeout_seconds
+graceful_timeout = server_config.graceful_timeout_seconds
+
+
+def post_worker_init(worker):  # pylint: disable=unused-argument
+    """Sync shelf capacities and open the shared pool once the worker has loaded the application."""
+    # imported here, the master process never connects to the database
+    from scheduler.scheduler_utils import prepare_database  # pylint: disable=import-outside-toplevel
+    prepare_database()
+
+
+def worker_exit(server, worker):  # pylint: disable=unused-argument
+    """Let background runs finish, so their kitchens are deleted, then close shared connection pools."""
+    # the master process calls this hook too, but it doesn't load the application
+    run_manager_module = sys.modules.get("scheduler.run_manager")
+    if run_manager_module is None:
+        return
+
+    logger.info(f"Worker {worker.pid} is stopping, waiting for runs in progress.")
+    run_manager_module.run_manager.shutdown(wait=True)
+    sys.modules["clients.database.engine_registry"].engine_registry.dispose_all()
@@ -0,0 +1,125 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, List, Optional
+
+import constants
+from constants import RunStatus
+from jobs.job_utils import JobTracker
+from models.action import Action
+from models.action_log import ActionLog
+from models.config import Config
+from models.metrics import KitchenMetrics, kitchen_metrics
+from models.problem import Problem
+from scheduler.scheduler import schedule_problem_orders
+from validators.actions_validators import validate_schedule
+
+logger = logging.getLogger(__name__)
+
+
+# a run's state is read field by field by the status endpoints while it executes, holders would only add indirection
+class Run:  # pylint: disable=too-many-instance-attributes
+    """One problem scheduled in the background. Progress can be read while it executes."""
+
+    def __init__(self, problem: Problem, config: Config):
+        self.id = uuid.uuid4().hex
+        self.problem = problem
+        self.config = config
+        self.status = RunStatus.PENDING
+        self.action_log = ActionLog()
+        self.job_tracker = JobTracker()
+        self.metrics = KitchenMetrics(parent=kitchen_metrics)
+        self.errors: List[str] = []
+        self.valid: Optional[bool] = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def is_finished(self) -> bool:
+        return self.status in (RunStatus.COMPLETED, RunStatus.FAILED)
+
+    def get_actions(self) -> List[Action]:
+        return self.action_log.get_snapshot()
+
+    def to_dict(self) -> dict:
+        return dict(
+            run_id=self.id,
+            test_id=self.problem.test_id,
+            status=self.status,
+            orders=len(self.problem.orders),
+            jobs=self.job_tracker.get_summary(),
+            retries=self.metrics.job_retries_total.get_total(),
+            actions=self.action_log.get_count(),
+            metrics=self.metrics.get_summary(),
+            valid=self.valid,
+            errors=self.errors,
+            submitted_at=self.submitted_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+class RunManager:
+    """
+    Executes runs on a bounded thread pool and keeps them for status queries.
+    Only the latest finished runs are kept. Every run uses its own kitchen named after the run id.
+    """
+
+    def __init__(self, max_concurrent_runs: int, max_finished_runs: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_runs, thread_name_prefix="run")
+        self._max_finished_runs = max_finished_runs
+        self._runs: Dict[str, Run] = OrderedDict()
+        self._lock = Lock()
+
+    def submit(self, problem: Problem, config: Config) -> Run:
+        run = Run(problem, config)
+        with self._lock:
+            self._runs[run.id] = run
+            self._evict_finished_runs()
+        self._executor.submit(self._execute, run)
+        logger.info(f"Run {run.id} submitted for problem: {problem.test_id}.")
+        return run
+
+    def get(self, run_id: str) -> Optional[Run]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting runs and cancel runs that haven't started. Runs in progress finish if wait is set."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    @staticmethod
+    def _execute(run: Run) -> None:
+        run.status = RunStatus.RUNNING
+        run.started_at = time.time()
+        try:
+            schedule_problem_orders(
+                run.problem, run.config, run.action_log, run.job_tracker, kitchen_id=run.id, metrics=run.metrics)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.exception(f"Run {run.id} failed.")
+            run.errors.append(str(e))
+            run.finished_at = time.time()
+            run.status = RunStatus.FAILED
+            return
+
+        try:
+            validate_schedule(run.action_log.get_table(), run.problem, run.config)
+            run.valid = True
+        except ValueError as e:
+            logger.error(f"Run {run.id} actions are invalid. Validation error: {e}")
+            run.errors.append(str(e))
+            run.valid = False
+        run.finished_at = time.time()
+        run.status = RunStatus.COMPLETED
+        logger.info(f"Run {run.id} finished with status: {run.status}.")
+
+    def _evict_finished_runs(self) -> None:
+        finished = [run_id for run_id, run in self._runs.items() if run.is_finished()]
+        for run_id in finished[:max(0, len(finished) - self._max_finished_runs)]:
+            del self._runs[run_id]
+
+
+run_manager = RunManager(constants.MAX_CONCURRENT_RUNS, constants.MAX_FINISHED_RUNS)
@@ -1,75 +1,308 @@
-import datetime as dt
-from datetime import datetime, timezone
-
+import asyncio
 import logging
 import random
-from typing import List
-
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
-from apscheduler.executors.pool import ThreadPoolExecutor
-from apscheduler.schedulers.background import BackgroundScheduler
+import time
+import uuid
+from contextlib import nullcontext
+from threading import Condition
+from typing import List, Tuple, Union
 
 import constants
+from constants import ExecutionMode, JobKind, StorageEngine
 from models.config import Config
 from models.problem import Problem
 from models.action import Action
 from models.action_log import ActionLog
-from models.database_config import DatabaseConfig
-from clients.database.connection_pool import get_database_connection_pool
-from clients.database.database_client import DatabaseClient
-from jobs.job_utils import report_on_job_progress, get_job_listener
-from jobs.place_order import place_order
-from jobs.pickup_order import pickup_order
+from models.clock import SimulatedClock, clock
+from models.metrics import KitchenMetrics, kitchen_metrics
+from clients.database.engine_registry import engine_registry
+from clients.database.instrumentation import InstrumentedConnectionPool, InstrumentedDatabaseClient
+from clients.database.storage_engine import (
+    get_async_storage_engine,
+    get_storage_engine,
+    release_async_storage_engine,
+    release_storage_engine,
+)
+from jobs.batch_orders import process_batch
+from jobs.job_utils import (
+    JobTracker,
+    get_job_listener,
+    get_job_metrics_listener,
+    get_job_start_listener,
+    report_on_job_progress,
+)
+from jobs.place_order import place_order, place_order_async
+from jobs.pickup_order import pickup_order, pickup_order_async
+from scheduler.async_dispatcher import AsyncDispatcher
+from scheduler.dispatcher import Dispatcher
+from scheduler.simulated_dispatcher import SimulatedDispatcher
 
 
 logger = logging.getLogger(__name__)
 
 
-def schedule_problem_orders(problem: Problem, config: Config) -> List[Action]:
-    logger.info(f"Starting to schedule orders for problem: {problem.test_id}")
-    executors = {"default": ThreadPoolExecutor(max_workers=constants.MAX_WORKERS)}
-    scheduler = BackgroundScheduler(executors=executors)
-    jobs_finished = dict()
-    job_listener = get_job_listener(jobs_finished)
-    scheduler.add_listener(job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+def schedule_problem_orders(
+        problem: Problem,
+        config: Config,
+        action_log: ActionLog = None,
+        job_tracker: JobTracker = None,
+        kitchen_id: str = None,
+        metrics: KitchenMetrics = None) -> List[Action]:
+    """
+    Runs the simulation and returns recorded actions in time order. Callers may pass their own
+    action log and job tracker to follow the progress of a run while it executes.
+    Every run uses its own kitchen (a new one if kitchen_id is not given) which is deleted when the run ends.
+    Job and storage latencies are recorded in the given metrics, which also feed the process-wide ones.
+    """
+    logger.info(f"Starting to schedule orders for problem: {problem.test_id}. Execution mode: {config.execution_mode}")
+    if action_log is None:
+        action_log = ActionLog()
+    if job_tracker is None:
+        job_tracker = JobTracker()
+    if kitchen_id is None:
+        kitchen_id = uuid.uuid4().hex
+    if metrics is None:
+        metrics = KitchenMetrics(parent=kitchen_metrics)
+    action_log.metrics = metrics
+    # runs on PostgreSQL take turns for connections, so jobs don't time out waiting for the pool
+    with engine_registry.admit_run() if config.storage_engine == StorageEngine.POSTGRES else nullcontext():
+        return _schedule_problem_orders(problem, config, action_log, job_tracker, kitchen_id, metrics)
+
+
+def _schedule_problem_orders(
+        problem: Problem,
+        config: Config,
+        action_log: ActionLog,
+        job_tracker: JobTracker,
+        kitchen_id: str,
+        metrics: KitchenMetrics) -> List[Action]:
+    if config.execution_mode == ExecutionMode.ASYNCIO:
+        return asyncio.run(
+            _schedule_problem_orders_async(problem, config, action_log, job_tracker, kitchen_id, metrics))
+
+    if config.batch_window_ms:
+        return _schedule_problem_orders_in_batches(problem, config, action_log, job_tracker, kitchen_id, metrics)
+
+    if config.simulated_time:
+        return _schedule_problem_orders_simulated(problem, config, action_log, job_tracker, kitchen_id, metrics)
+
+    db_client, connection_pool = _instrument(*get_storage_engine(config, kitchen_id), metrics)
+    orders = problem.orders
+    # pickup must not run before its order is placed, even when the place job is delayed.
+    # Orders of a streamed problem keep arriving while jobs run, so placed orders are kept in a set
+    # that only holds orders waiting for pickup.
+    placed = set()
+    placed_condition = Condition()
+
+    def run_job(kind: int, order_index: int):
+        order = orders[order_index]
+        if kind == JobKind.PICKUP:
+            with placed_condition:
+                placed_condition.wait_for(lambda: order_index in placed)
+                placed.remove(order_index)
+            pickup_order(order, db_client, action_log, connection_pool)
+            return
+
+        try:
+            place_order(order, db_client, action_log, connection_pool)
+        finally:
+            with placed_condition:
+                placed.add(order_index)
+                placed_condition.notify_all()
+
+    dispatcher = Dispatcher(run_job, max_workers=constants.MAX_WORKERS)
+    return _run_dispatcher(dispatcher, job_tracker, problem, config, action_log, metrics, db_client, connection_pool)
+
+
+def _schedule_problem_orders_in_batches(
+        problem: Problem,
+        config: Config,
+        action_log: ActionLog,
+        job_tracker: JobTracker,
+        kitchen_id: str,
+        metrics: KitchenMetrics) -> List[Action]:
+    """
+    Events due within the batch window are applied in one transaction. Batches run one at a time,
+    so events are applied in due order and every pickup follows its placement.
+    """
+    db_client, connection_pool = _instrument(*get_storage_engine(config, kitchen_id), metrics)
+    orders = problem.orders
+
+    def run_batch(batch: List[Tuple[int, int, int]]):
+        events = [
+            (kind, orders[order_index], dispatcher.start_epoch_us + due_us)
+            for due_us, kind, order_index in batch
+        ]
+        process_batch(events, db_client, action_log, connection_pool)
+
+    dispatcher = Dispatcher(
+        run_job=None,
+        max_workers=1,
+        run_batch=run_batch,
+        batch_window_us=config.batch_window_ms * 1_000,
+    )
+    return _run_dispatcher(dispatcher, job_tracker, problem, config, action_log, metrics, db_client, connection_pool)
+
+
+def _schedule_problem_orders_simulated(
+        problem: Problem,
+        config: Config,
+        action_log: ActionLog,
+        job_tracker: JobTracker,
+        kitchen_id: str,
+        metrics: KitchenMetrics) -> List[Action]:
+    """
+    Replays the schedule in simulated time on the calling thread. Jobs run one at a time in due order
+    without waiting, so with a problem seed every run produces the same actions.
+    """
+    simulated_clock = SimulatedClock(clock.now_us())
+    action_log.clock = simulated_clock
+    db_client, connection_pool = _instrument(*get_storage_engine(config, kitchen_id, simulated_clock), metrics)
+    orders = problem.orders
 
-    connection_pool = get_database_connection_pool(DatabaseConfig(), max_connections=constants.MAX_DB_CONNECTIONS)
-    db_client = DatabaseClient()
-    action_log = ActionLog()
+    def run_job(kind: int, order_index: int):
+        if kind == JobKind.PICKUP:
+            pickup_order(orders[order_index], db_client, action_log, connection_pool)
+        else:
+            place_order(orders[order_index], db_client, action_log, connection_pool)
 
-    now = datetime.now(timezone.utc)
-    start_time = now + dt.timedelta(seconds=constants.JOBS_INITIAL_DELAY_SECONDS)
+    dispatcher = SimulatedDispatcher(run_job, simulated_clock)
+    try:
+        _track_jobs(dispatcher, job_tracker, metrics)
+        _add_jobs(dispatcher, job_tracker, problem, config, random.Random(config.seed or None))
+        dispatcher.run()
+        _log_dispatch_lag(dispatcher, metrics)
+    finally:
+        release_storage_engine(db_client, connection_pool)
 
-    for i, order in enumerate(problem.orders):
-        store_order_time = start_time + dt.timedelta(milliseconds=i * config.order_rate)
-        jobs_finished[f"{order.id}_place"] = False
-        scheduler.add_job(
-            place_order,
-            "date",
-            run_date=store_order_time,
-            args=(order, db_client, action_log, connection_pool),
-            id=f"{order.id}_place",
-        )
+    return action_log.get_snapshot()
+
+
+def _run_dispatcher(
+        dispatcher: Dispatcher,
+        job_tracker: JobTracker,
+        problem: Problem,
+        config: Config,
+        action_log: ActionLog,
+        metrics: KitchenMetrics,
+        db_client,
+        connection_pool) -> List[Action]:
+    try:
+        _track_jobs(dispatcher, job_tracker, metrics)
+        # jobs are added while the dispatcher runs, so the first order is placed before the rest are parsed
+        dispatcher.start()
+        lookahead_us = constants.PROBLEM_LOOKAHEAD_SECONDS * 1_000_000
+        _add_jobs(dispatcher, job_tracker, problem, config, lookahead_us=lookahead_us)
+        dispatcher.close()
+
+        report_on_job_progress(job_tracker)
+        _log_dispatch_lag(dispatcher, metrics)
+    finally:
+        dispatcher.shutdown(wait=True)
+        release_storage_engine(db_client, connection_pool)
+
+    return action_log.get_snapshot()
 
-        pickup_delta = random.randint(config.min_pickup, config.max_pickup)
-        pickup_order_time = store_order_time + dt.timedelta(seconds=pickup_delta)
-        jobs_finished[f"{order.id}_pickup"] = False
-        scheduler.add_job(
-            pickup_order,
-            "date",
-            run_date=pickup_order_time,
-            args=(order, db_client, action_log, connection_pool),
-            id=f"{order.id}_pickup",
-        )
 
-    scheduler.start()
+async def _schedule_problem_orders_async(
+        problem: Problem,
+        config: Config,
+        action_log: ActionLog,
+        job_tracker: JobTracker,
+        kitchen_id: str,
+        metrics: KitchenMetrics) -> List[Action]:
+    db_client, connection_pool = await get_async_storage_engine(config, kitchen_id)
+    # async connections are opened when entered, not when connect is called, so checkouts aren't timed
+    db_client = InstrumentedDatabaseClient(db_client, metrics)
+    # jobs are added before the event loop starts dispatching them, so a streamed problem is read first
+    orders = problem.load_orders().orders
+    # place tasks may wait for a pooled connection longer than the pickup delay
+    placed = bytearray(len(orders))
+    placed_condition = asyncio.Condition()
+    # queue jobs in order on a semaphore instead of letting them time out waiting for the pool when overloaded
+    connection_slots = asyncio.Semaphore(constants.MAX_ASYNC_DB_CONNECTIONS)
 
-    report_on_job_progress(jobs_finished)
+    async def run_job(kind: int, order_index: int):
+        order = orders[order_index]
+        if kind == JobKind.PICKUP:
+            async with placed_condition:
+                await placed_condition.wait_for(lambda: placed[order_index])
+            async with connection_slots:
+                await pickup_order_async(order, db_client, action_log, connection_pool)
+            return
 
-    logger.info("All jobs completed.")
+        try:
+            async with connection_slots:
+                await place_order_async(order, db_client, action_log, connection_pool)
+        finally:
+            async with placed_condition:
+                placed[order_index] = 1
+                placed_condition.notify_all()
 
-    scheduler.shutdown(wait=True)
+    dispatcher = AsyncDispatcher(run_job)
+    _track_jobs(dispatcher, job_tracker, metrics)
+    _add_jobs(dispatcher, job_tracker, problem, config)
+    dispatcher.close()
 
-    connection_pool.dispose()
+    progress_task = asyncio.create_task(_report_on_job_progress_async(job_tracker))
+    try:
+        await dispatcher.run()
+    finally:
+        progress_task.cancel()
+        await release_async_storage_engine(db_client, connection_pool)
+    _log_dispatch_lag(dispatcher, metrics)
 
     return action_log.get_snapshot()
+
+
+def _instrument(db_client, connection_pool, metrics: KitchenMetrics) -> Tuple:
+    return InstrumentedDatabaseClient(db_client, metrics), InstrumentedConnectionPool(connection_pool, metrics)
+
+
+def _track_jobs(
+        dispatcher: Union[Dispatcher, AsyncDispatcher, SimulatedDispatcher],
+        job_tracker: JobTracker,
+        metrics: KitchenMetrics) -> None:
+    dispatcher.add_start_listener(get_job_start_listener(job_tracker))
+    dispatcher.add_listener(get_job_listener(job_tracker))
+    dispatcher.add_listener(get_job_metrics_listener(metrics))
+
+
+def _add_jobs(
+        dispatcher: Union[Dispatcher, AsyncDispatcher, SimulatedDispatcher],
+        job_tracker: JobTracker,
+        problem: Problem,
+        config: Config,
+        rng: random.Random = random,
+        lookahead_us: int = None) -> None:
+    """
+    Adds place and pickup jobs of orders as they are parsed. With lookahead_us the dispatcher is running
+    and orders are read no further than that ahead of it, so the job heap holds only jobs due soon.
+    """
+    for i in problem.iter_indices():
+        place_order_time_us = i * config.order_rate * 1_000
+        if lookahead_us is not None:
+            wait_us = place_order_time_us - lookahead_us - dispatcher.now_us()
+            if wait_us > 0:
+                time.sleep(wait_us / 1_000_000)
+        pickup_delta_us = rng.randint(config.min_pickup, config.max_pickup) * 1_000_000
+        job_tracker.add(2)
+        dispatcher.add(place_order_time_us, JobKind.PLACE, i)
+        dispatcher.add(place_order_time_us + pickup_delta_us, JobKind.PICKUP, i)
+    job_tracker.seal()
+
+
+async def _report_on_job_progress_async(job_tracker: JobTracker) -> None:
+    while True:
+        await asyncio.sleep(constants.JOBS_IN_PROGRESS_REPORTING_PERIOD_SECONDS)
+        logger.info(f"Jobs in progress: {job_tracker.get_summary()}")
+
+
+def _log_dispatch_lag(
+        dispatcher: Union[Dispatcher, AsyncDispatcher, SimulatedDispatcher],
+        metrics: KitchenMetrics) -> None:
+    logger.info(
+        f"All jobs completed. Dispatch lag mean: {dispatcher.get_mean_lag_us() / 1000:.3f} ms,"
+        f" max: {dispatcher.max_lag_us / 1000:.3f} ms. Retries: {metrics.job_retries_total.get_total()}."
+    )
+    logger.info(f"Run metrics: {metrics.get_summary()}")
@@ -1,50 +1,183 @@
+from collections import Counter
+import json
 import logging
+from queue import SimpleQueue
 import sys
+from threading import Thread
+from typing import Iterator, List, Optional, Tuple
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from pydantic import ValidationError
 
+from clients.database.engine_registry import engine_registry
+from models.action_log import ActionLog
+from models.action_table import ActionTable
 from models.config import Config
+from models.metrics import KitchenMetrics, kitchen_metrics
+from models.problem import Problem
+from scheduler.run_manager import run_manager
 from scheduler.scheduler import schedule_problem_orders
-from src.scheduler.scheduler_utils import load_problem
-from src.validators.actions_validators import validate_actions
+from src.scheduler.scheduler_utils import load_problem, prepare_database
+from src.validators.actions_validators import validate_schedule
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 logger = logging.getLogger(__name__)
 app = Flask(__name__)
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4"
+
 
 @app.route("/schedule-orders", methods=["POST"])
 def schedule_orders():
+    config, problem, error_response = _parse_schedule_request()
+    if error_response is not None:
+        return error_response
+
+    if _is_stream_requested():
+        return Response(_stream_actions(problem, config), mimetype=NDJSON_MIMETYPE)
+
+    action_log = ActionLog()
+    metrics = KitchenMetrics(parent=kitchen_metrics)
+    try:
+        actions = schedule_problem_orders(problem, config, action_log, metrics=metrics)
+    except ValueError as e:
+        return jsonify({"errors": [str(e)]}), 400
+
+    _validate_actions(action_log.get_table(), problem, config)
+
+    return (
+        jsonify({"actions": [action.to_dict() for action in actions], "metrics": metrics.get_summary()}),
+        200,
+    )
+
+
+@app.route("/runs", methods=["POST"])
+def submit_run():
+    config, problem, error_response = _parse_schedule_request()
+    if error_response is not None:
+        return error_response
+
+    run = run_manager.submit(problem, config)
+    return jsonify(run.to_dict()), 202, {"Location": f"/runs/{run.id}"}
+
+
+@app.route("/runs/<run_id>", methods=["GET"])
+def get_run(run_id: str):
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({"errors": [f"Run not found: {run_id}"]}), 404
+    return jsonify(run.to_dict()), 200
+
+
+@app.route("/runs/<run_id>/actions", methods=["GET"])
+def get_run_actions(run_id: str):
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({"errors": [f"Run not found: {run_id}"]}), 404
+    actions = [action.to_dict() for action in run.get_actions()]
+    return jsonify({"run_id": run.id, "status": run.status, "actions": actions}), 200
+
+
+@app.route("/pool-metrics", methods=["GET"])
+def get_pool_metrics():
+    return jsonify({"pools": engine_registry.get_metrics()}), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Latency histograms of all runs since the process started and pool gauges in Prometheus text format."""
+    return Response(kitchen_metrics.render() + _render_pool_gauges(), mimetype=PROMETHEUS_MIMETYPE)
+
+
+def _parse_schedule_request() -> Tuple[Optional[Config], Optional[Problem], Optional[tuple]]:
+    """Returns config and problem from the request body, or an error response."""
     if not request.is_json:
-        return jsonify({"error": "Request must be in JSON format"}), 400
+        return None, None, (jsonify({"error": "Request must be in JSON format"}), 400)
 
     raw_config = request.get_json()
     try:
         config = Config(**raw_config)
     except ValidationError as e:
         errors = [error["msg"] for error in e.errors()]
-        return jsonify({"errors": errors}), 400
+        return None, None, (jsonify({"errors": errors}), 400)
 
     problem = load_problem(config)
-    if len(problem.orders) == 0:
-        return jsonify(
-            {"errors": f"Problem has no orders: {problem.to_dict()}"}), 400
+    if problem.is_empty():
+        return None, None, (jsonify({"errors": f"Problem has no orders: {problem.test_id}"}), 400)
+
+    return config, problem, None
+
+
+def _is_stream_requested() -> bool:
+    if request.args.get("stream") == "1":
+        return True
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _stream_actions(problem: Problem, config: Config) -> Iterator[str]:
+    """
+    Schedules orders on a background thread and yields one JSON line per action as it is recorded.
+    The last line is a summary with action counts and the validation result. Errors found after
+    the response has started are reported in the summary since the status code is already sent.
+    """
+    actions_queue = SimpleQueue()
+    action_log = ActionLog(actions_queue)
+    metrics = KitchenMetrics(parent=kitchen_metrics)
+    errors = []
+
+    def run():
+        try:
+            schedule_problem_orders(problem, config, action_log, metrics=metrics)
+            errors.extend(_validate_actions(action_log.get_table(), problem, config))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.exception("Scheduling orders failed.")
+            errors.append(str(e))
+        finally:
+            actions_queue.put(None)
 
-    actions = schedule_problem_orders(problem, config)
+    Thread(target=run, name="schedule-orders", daemon=True).start()
 
+    counts = Counter()
+    while (action := actions_queue.get()) is not None:
+        counts[action.action_type] += 1
+        yield json.dumps(action.to_dict()) + "\n"
+
+    summary = {
+        "actions": sum(counts.values()),
+        "counts": dict(counts),
+        "valid": not errors,
+        "errors": errors,
+        "metrics": metrics.get_summary(),
+    }
+    yield json.dumps({"summary": summary}) + "\n"
+
+
+def _render_pool_gauges() -> str:
+    gauges = [
+        ("size", "Connections the pool keeps open."),
+        ("checked_out", "Connections in use."),
+        ("overflow", "Connections opened above the pool size."),
+    ]
+    pools = engine_registry.get_metrics()
+    lines = []
+    for name, description in gauges:
+        lines.extend([f"# HELP kitchen_pool_{name} {description}", f"# TYPE kitchen_pool_{name} gauge"])
+        lines.extend(f'kitchen_pool_{name}{{pool="{pool["name"]}"}} {pool[name]}' for pool in pools)
+    return "\n".join(lines) + "\n"
+
+
+def _validate_actions(actions: ActionTable, problem: Problem, config: Config) -> List[str]:
     try:
-        validate_actions(actions)
+        validate_schedule(actions, problem, config)
         logger.info("Order actions are valid.")
+        return []
     except ValueError as e:
         logger.error("Order actions are invalid. Validation error: %s", e)
-
-    return (
-        jsonify({"actions": [action.to_dict() for action in actions]}),
-        200,
-    )
+        return [str(e)]
 
 
 if __name__ == "__main__":
-    # we would't do this in production
+    # development server, the kitchen container serves the app with gunicorn (see scheduler/gunicorn_config.py)
+    prepare_database()
     app.run(debug=True)
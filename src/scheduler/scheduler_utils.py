@@ -1,15 +1,39 @@
-import json
+import logging
+
+from sqlalchemy.exc import OperationalError
 
 from clients.challenge_client import ChallengeClient
+from clients.problem_cache import ProblemCache
+from clients.database.database_client import DatabaseClient
+from clients.database.engine_registry import engine_registry
+from models.database_config import DatabaseConfig
 from models.problem import Problem
+from models.problem_stream import stream_problem_file
 from models.config import Config
 
+logger = logging.getLogger(__name__)
+
 
 def load_problem(config: Config) -> Problem:
+    """Streamed problem, orders are parsed as the scheduler reaches them (see Problem.iter_orders)."""
     if config.problem_file_path:
-        with open(config.problem_file_path, "r", encoding="utf-8") as fp:
-            problem_dict = json.load(fp)
-            return Problem.from_dict(problem_dict)
-    else:
-        client = ChallengeClient(config.endpoint, config.auth)
-        return client.fetch_problem(name="", seed=config.seed)
+        return stream_problem_file(config.problem_file_path)
+    client = ChallengeClient(config.endpoint, config.auth, cache=ProblemCache() if config.cache_problems else None)
+    return client.stream_problem(name="", seed=config.seed)
+
+
+def prepare_database():
+    """
+    Sync shelf capacities in the database with DatabaseConfig and warm up the shared engine on startup.
+    Runs that use the in-memory storage engine don't need the database, so failure is only logged.
+    """
+    db_config = DatabaseConfig()
+    db_client = DatabaseClient()
+    try:
+        with engine_registry.get_engine(db_config).connect() as connection:
+            with db_client.transaction(connection):
+                db_client.update_capacities(connection, db_config.get_capacities())
+        logger.info(f"Shelf capacities: {db_config.get_capacities().__dict__}")
+        engine_registry.warm_up(db_config)
+    except (OperationalError, ValueError) as e:
+        logger.error(f"Couldn't prepare the database on startup. Error: {e}")
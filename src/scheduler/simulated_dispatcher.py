@@ -0,0 +1,28 @@
+import heapq
+from typing import Callable
+
+from models.clock import SimulatedClock
+from scheduler.dispatcher import BaseDispatcher
+
+
+class SimulatedDispatcher(BaseDispatcher):
+    """
+    Dispatcher counterpart that runs jobs one by one on the calling thread in due time order.
+    Instead of sleeping until a job is due, it advances the simulated clock to the due time,
+    so jobs see the same time they would in a real run and every job starts without lag.
+    """
+
+    def __init__(self, run_job: Callable[[int, int], None], clock: SimulatedClock):
+        super().__init__(run_job)
+        self._clock = clock
+        self.start_epoch_us = clock.now_us()
+
+    def add(self, due_us: int, kind: int, order_index: int) -> None:
+        heapq.heappush(self._heap, (due_us, kind, order_index))
+
+    def run(self) -> None:
+        while self._heap:
+            due_us, kind, order_index = heapq.heappop(self._heap)
+            self._clock.advance_to(self.start_epoch_us + due_us)
+            with self._track_job(due_us, kind, order_index, due_us):
+                self._run_job(kind, order_index)
@@ -0,0 +1,268 @@
+import random
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from clients.database.victim_policies import RoomShelfPolicy, get_room_shelf_policy
+from constants import JobKind, MaxInventory, VICTIM_POLICIES
+from models.config import Config
+from models.inventory import Inventory
+from models.problem import Problem
+
+NOT_SHELVED = -1
+HOT = 0
+COLD = 1
+ROOM = 2
+STORAGE_INDEX = {"hot": HOT, "cold": COLD, "room": ROOM}
+
+
+class RoomShelfColumns:
+    """
+    Room shelf orders as arrays with the attributes of ShelvedOrder, so a RoomShelfPolicy computes keys and
+    scores of all of them at once. Sequence numbers are order positions, orders are placed in that order.
+    """
+
+    __slots__ = ("expires_at", "placed_at", "seq", "decay_rate")
+
+    def __init__(self, expires_at: np.ndarray, placed_at: np.ndarray, seq: np.ndarray, decay_rate: np.ndarray):
+        self.expires_at = expires_at
+        self.placed_at = placed_at
+        self.seq = seq
+        self.decay_rate = decay_rate
+
+    def get_relative_age(self, now: float) -> np.ndarray:
+        return self.decay_rate * (now - self.expires_at)
+
+
+class SimulationResult:
+    """
+    Outcome of one simulated run. "pickup_freshness" holds the remaining freshness fraction of every order
+    at pickup (negative when stale) and NaN for discarded orders.
+    """
+
+    def __init__(
+            self,
+            policy: str,
+            config: Config,
+            moved: int,
+            discarded: np.ndarray,
+            pickup_freshness: np.ndarray):
+        self.policy = policy
+        self.config = config
+        self.moved = moved
+        self.discarded = discarded
+        self.pickup_freshness = pickup_freshness
+
+    @property
+    def discarded_count(self) -> int:
+        return int(self.discarded.sum())
+
+    @property
+    def picked_up_count(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.pickup_freshness)))
+
+    @property
+    def stale_count(self) -> int:
+        return int(np.count_nonzero(self.pickup_freshness < 0))
+
+    @property
+    def waste_count(self) -> int:
+        """Orders that didn't reach a customer fresh: discarded or picked up stale."""
+        return self.discarded_count + self.stale_count
+
+    @property
+    def mean_freshness(self) -> float:
+        """Mean remaining freshness fraction over all orders, zero for discarded or stale ones."""
+        if not self.pickup_freshness.size:
+            return 0.0
+        return float(np.nan_to_num(self.pickup_freshness, nan=0.0).clip(min=0).mean())
+
+    def to_dict(self) -> dict:
+        return dict(
+            policy=self.policy,
+            seed=self.config.seed,
+            order_rate=self.config.order_rate,
+            min_pickup=self.config.min_pickup,
+            max_pickup=self.config.max_pickup,
+            orders=len(self.pickup_freshness),
+            moved=self.moved,
+            discarded=self.discarded_count,
+            picked_up=self.picked_up_count,
+            stale=self.stale_count,
+            waste=self.waste_count,
+            mean_freshness=self.mean_freshness,
+        )
+
+
+class PlacementSimulator:
+    """
+    Offline model of the kitchen shelves. Replays the schedule the scheduler would produce for a problem
+    and config, making the same place, move and discard decisions as memory storage with the same victim
+    policy, without threads or waiting for due times.
+
+    Shelf state is kept in arrays indexed by order position. Like memory storage, which keeps room shelf orders
+    in a heap per best storage type, a victim is the order with the lowest policy key of each allowed best storage
+    type, the one with the highest policy score among those. Pickup times are drawn exactly like the scheduler
+    draws them, so for the same seed the simulator sees the same schedule as a run in simulated time.
+    """
+
+    def __init__(self, problem: Problem, config: Config, policy: str = None):
+        policy = policy or config.victim_policy
+        if policy not in VICTIM_POLICIES:
+            raise ValueError(f"policy must be one of: {VICTIM_POLICIES}")
+        self.problem = problem
+        self.config = config
+        self.policy = policy
+        self.room_shelf_policy: RoomShelfPolicy = get_room_shelf_policy(
+            config.model_copy(update={"victim_policy": policy}))
+        capacities = config.get_capacities(
+            Inventory(hot=MaxInventory.HOT, cold=MaxInventory.COLD, room=MaxInventory.ROOM))
+        self.capacities = np.array([capacities.hot, capacities.cold, capacities.room])
+
+        orders = problem.load_orders().orders
+        # the order table codes temperatures by position in STORAGE_TYPES, the same as STORAGE_INDEX
+        self.best = np.array(orders.temp_codes, dtype=np.int8)
+        if self.best.size and self.best.max() > ROOM:
+            raise ValueError(f"Orders must have one of temperatures: {list(STORAGE_INDEX)}")
+        self.freshness = np.array(orders.freshness, dtype=np.float64)
+
+    def run(self) -> SimulationResult:
+        count = len(self.best)
+        storage = np.full(count, NOT_SHELVED, dtype=np.int8)
+        cumulative_age = np.zeros(count)
+        updated_at = np.zeros(count)
+        discarded = np.zeros(count, dtype=bool)
+        pickup_freshness = np.full(count, np.nan)
+        counts = np.zeros(3, dtype=np.int64)
+        moved = 0
+
+        def shelve(index: int, storage_type: int, now: float) -> None:
+            storage[index] = storage_type
+            updated_at[index] = now
+            counts[storage_type] += 1
+
+        for due_us, kind, index in self._get_events():
+            now = due_us / 1_000_000
+            if kind == JobKind.PICKUP:
+                storage_type = storage[index]
+                if storage_type != NOT_SHELVED:
+                    decay = 1 if storage_type == self.best[index] else 2
+                    age = cumulative_age[index] + decay * (now - updated_at[index])
+                    pickup_freshness[index] = 1 - age / self.freshness[index]
+                    counts[storage_type] -= 1
+                    storage[index] = NOT_SHELVED
+                continue
+
+            storage_type = self.best[index] if counts[self.best[index]] < self.capacities[self.best[index]] else ROOM
+            if counts[ROOM] >= self.capacities[ROOM] and storage_type == ROOM:
+                room = np.flatnonzero(storage == ROOM)
+                columns = self._get_room_shelf_columns(room, cumulative_age, updated_at)
+                move_types = [best for best in (HOT, COLD) if counts[best] < self.capacities[best]]
+                victim = self._find_victim(room, columns, move_types, now)
+                if victim is not None:
+                    # moved orders keep their age and start decaying at the best storage rate
+                    cumulative_age[victim] += 2 * (now - updated_at[victim])
+                    counts[ROOM] -= 1
+                    shelve(victim, self.best[victim], now)
+                    moved += 1
+                else:
+                    victim = self._find_victim(room, columns, (HOT, COLD, ROOM), now)
+                    storage[victim] = NOT_SHELVED
+                    counts[ROOM] -= 1
+                    discarded[victim] = True
+
+            shelve(index, storage_type, now)
+
+        return SimulationResult(self.policy, self.config, moved, discarded, pickup_freshness)
+
+    def _get_room_shelf_columns(
+            self, room: np.ndarray, cumulative_age: np.ndarray, updated_at: np.ndarray) -> RoomShelfColumns:
+        """Room shelf orders never left the room shelf, so they were placed when they were last updated."""
+        decay = np.where(self.best[room] == ROOM, 1.0, 2.0)
+        expires_at = updated_at[room] + (self.freshness[room] - cumulative_age[room]) / decay
+        return RoomShelfColumns(expires_at, updated_at[room], room.astype(np.float64), decay)
+
+    def _find_victim(
+            self,
+            room: np.ndarray,
+            columns: RoomShelfColumns,
+            best_storage_types: Sequence[int],
+            now: float) -> Optional[int]:
+        """Same choice as MemoryStorage.find_victim_in_room, ties go to the earlier order and storage type."""
+        keys = self.room_shelf_policy.get_key(columns)
+        scores = self.room_shelf_policy.get_score(columns, now)
+        best = self.best[room]
+        victim = None
+        victim_score = None
+        for best_storage_type in best_storage_types:
+            positions = np.flatnonzero(best == best_storage_type)
+            if not positions.size:
+                continue
+            top = positions[np.argmin(keys[positions])]
+            if victim is None or scores[top] > victim_score:
+                victim, victim_score = top, scores[top]
+        return None if victim is None else int(room[victim])
+
+    def _get_events(self) -> List[tuple]:
+        """(due_us, kind, order_index) tuples in dispatch order, as the scheduler adds them to the dispatcher."""
+        count = len(self.best)
+        rng = random.Random(self.config.seed or None)
+        pickup_seconds = [rng.randint(self.config.min_pickup, self.config.max_pickup) for _ in range(count)]
+        place_us = np.arange(count, dtype=np.int64) * self.config.order_rate * 1_000
+        pickup_us = place_us + np.array(pickup_seconds, dtype=np.int64) * 1_000_000
+
+        due_us = np.concatenate([place_us, pickup_us])
+        kinds = np.repeat(np.array([JobKind.PLACE, JobKind.PICKUP]), count)
+        indices = np.tile(np.arange(count), 2)
+        order = np.lexsort((indices, kinds, due_us))
+        return list(zip(due_us[order].tolist(), kinds[order].tolist(), indices[order].tolist()))
+
+
+def simulate(problem: Problem, config: Config, policy: str = None) -> SimulationResult:
+    """Simulates the problem with the given victim policy, the config's one by default."""
+    return PlacementSimulator(problem, config, policy).run()
+
+
+def sweep(
+        problem: Problem,
+        configs: Iterable[Config],
+        seeds: Iterable[int],
+        policies: Iterable[str] = tuple(VICTIM_POLICIES)) -> List[SimulationResult]:
+    """Simulates every combination of config, seed and policy. Seeds override the config seed."""
+    seeds = list(seeds)
+    policies = list(policies)
+    return [
+        simulate(problem, config.model_copy(update={"seed": seed}), policy)
+        for config in configs
+        for seed in seeds
+        for policy in policies
+    ]
+
+
+def summarize(results: Iterable[SimulationResult]) -> List[dict]:
+    """Mean counts and freshness per policy and pickup settings, across seeds."""
+    groups: Dict[tuple, List[SimulationResult]] = {}
+    for result in results:
+        config = result.config
+        key = (result.policy, config.order_rate, config.min_pickup, config.max_pickup)
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for (policy, order_rate, min_pickup, max_pickup), group in groups.items():
+        stats = np.array([
+            (result.moved, result.discarded_count, result.stale_count, result.waste_count, result.mean_freshness)
+            for result in group
+        ], dtype=np.float64).mean(axis=0)
+        summary.append(dict(
+            policy=policy,
+            order_rate=order_rate,
+            min_pickup=min_pickup,
+            max_pickup=max_pickup,
+            runs=len(group),
+            moved=float(stats[0]),
+            discarded=float(stats[1]),
+            stale=float(stats[2]),
+            waste=float(stats[3]),
+            mean_freshness=float(stats[4]),
+        ))
+    return summary
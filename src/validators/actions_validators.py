@@ -1,79 +1,286 @@
-from datetime import datetime, timezone
-from typing import List
+from itertools import repeat
+from operator import attrgetter
+from typing import Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from constants import STORAGE_TYPES, StorageType
 from models.action import Action
+from models.action_table import ACTION_TYPES, STORAGE_CODES, UNKNOWN, ActionTable
+from models.config import Config
+from models.database_config import DatabaseConfig
+from models.inventory import Inventory
+from models.order import Order
+from models.order_table import OrderTable
+from models.problem import Problem
 
+PLACE, MOVE, PICKUP, DISCARD = range(len(ACTION_TYPES))
+ROOM = STORAGE_CODES[StorageType.ROOM]
 
-def validate_serialized_actions(serialized_actions: List[dict]):
-    actions = [
-        Action(
-            **{
-                **action,
-                "action_id": action.pop("id"),
-                "timestamp": datetime.fromtimestamp(
-                    action.pop("timestamp") / 1_000_000, tz=timezone.utc
-                ),
-            }
-        )
-        for action in serialized_actions
-    ]
-    validate_actions(actions)
-
-
-def validate_actions(actions: List[Action]):
-    _validate_single_place_pickup_discard_per_order(actions)
-    _validate_orders_have_place_and_pickup(actions)
-    _validate_pickup_or_discard_happens_after_place(actions)
-
-
-def _validate_single_place_pickup_discard_per_order(actions: List[Action]):
-    counter = dict()
-    for action in actions:
-        order_id = action.id
-        key = f"{order_id}-{action.action_type}"
-        counter[key] = counter.get(key, 0) + 1
-        count = counter[key]
-        if (
-            action.action_type in (Action.PLACE, Action.PICKUP, Action.DISCARD)
-            and count > 1
-        ):
-            raise ValueError(
-                f"Order id: {order_id} has more than one {action.action_type} event. Event count: {count}."
-            )
+_get_id = attrgetter("id")
+_get_temp = attrgetter("temp")
+_get_freshness = attrgetter("freshness")
 
 
-def _validate_orders_have_place_and_pickup(actions: List[Action]):
-    order_ids = set([action.id for action in actions])
-    action_map = dict(
-        (f"{action.id}-{action.action_type}",
-         action.timestamp) for action in actions)
+def validate_serialized_actions(
+        serialized_actions: List[dict], capacities: Inventory = None, orders: Sequence[Order] = None):
+    validate_actions(ActionTable.from_dicts(serialized_actions), capacities, orders)
 
-    for order_id in order_ids:
-        place = action_map.get(f"{order_id}-{Action.PLACE}")
-        pickup = action_map.get(f"{order_id}-{Action.PICKUP}")
-        discard = action_map.get(f"{order_id}-{Action.DISCARD}")
-        if not place:
-            raise ValueError(f"Order id: {order_id} doesn't have place event.")
-        if not pickup and not discard:
-            raise ValueError(
-                f"Order id: {order_id} doesn't have pickup or discard event."
-            )
 
+def validate_schedule(actions: Union[List[Action], ActionTable], problem: Problem, config: Config):
+    """Validates actions of a run against its problem and the shelf capacities it ran with."""
+    capacities = config.get_capacities(DatabaseConfig().get_capacities())
+    validate_actions(actions, capacities, problem.orders)
 
-def _validate_pickup_or_discard_happens_after_place(actions: List[Action]):
-    order_ids = set([action.id for action in actions])
-    action_map = dict(
-        (f"{action.id}-{action.action_type}",
-         action.timestamp) for action in actions)
 
-    for order_id in order_ids:
-        place = action_map.get(f"{order_id}-{Action.PLACE}")
-        pickup = action_map.get(f"{order_id}-{Action.PICKUP}")
-        discard = action_map.get(f"{order_id}-{Action.DISCARD}")
-        if place and pickup and place > pickup:
-            raise ValueError(
-                f"Order id: {order_id} pickup ({pickup}) happens before place ({place})."
+def validate_actions(
+        actions: Union[List[Action], ActionTable], capacities: Inventory = None, orders: Sequence[Order] = None):
+    """
+    Raises ValueError describing the first problem found.
+
+    Every order is placed once and then picked up or discarded once, moved at most once in between.
+    A move goes from the room shelf to a hot or cold shelf, the order's best one when orders are given,
+    and only room shelf orders are discarded. Shelves are checked where actions have targets.
+    With capacities, all actions are replayed in time order and no shelf may hold more orders than
+    its capacity once all actions of a timestamp are applied.
+
+    Every check is an array operation on actions coded as integers. An ActionLog records them coded
+    already (see ActionLog.get_table), a list of actions is coded first.
+    """
+    if not len(actions):
+        return
+    _validate(actions, capacities, orders)
+
+
+def score_actions(
+        actions: Union[List[Action], ActionTable],
+        orders: Sequence[Order],
+        capacities: Inventory = None,
+        pickup_window_us: Tuple[int, int] = None) -> dict:
+    """
+    Validates actions like validate_actions, then replays order ages the way the placement simulator does:
+    orders age twice as fast off their best shelf, and a moved order keeps its age. Counts are the same as in
+    SimulationResult.to_dict, "stale" orders were picked up after their freshness ran out and "waste" adds
+    them to discarded ones. With a pickup window, pickups sooner or later than that after placement are
+    counted as early or late.
+    """
+    columns = _validate(actions, capacities, orders)
+    freshness = np.array(
+        orders.freshness if isinstance(orders, OrderTable) else list(map(_get_freshness, orders)), np.float64)
+    pickup_freshness = columns.get_pickup_freshness(freshness * 1_000_000)
+    picked_up = ~np.isnan(pickup_freshness)
+    stale = int(np.count_nonzero(pickup_freshness < 0))
+    discarded = len(orders) - int(np.count_nonzero(picked_up))
+    score = dict(
+        orders=len(orders),
+        moved=int(np.count_nonzero(columns.counts[:, MOVE])),
+        discarded=discarded,
+        picked_up=len(orders) - discarded,
+        stale=stale,
+        waste=discarded + stale,
+        mean_freshness=float(np.nan_to_num(pickup_freshness, nan=0.0).clip(min=0).mean()) if len(orders) else 0.0,
+    )
+    if pickup_window_us is not None:
+        delay = (columns.times[:, PICKUP] - columns.times[:, PLACE])[picked_up]
+        score.update(early_pickups=int(np.count_nonzero(delay < pickup_window_us[0])),
+                     late_pickups=int(np.count_nonzero(delay > pickup_window_us[1])))
+    return score
+
+
+def _validate(
+        actions: Union[List[Action], ActionTable],
+        capacities: Inventory = None,
+        orders: Sequence[Order] = None) -> "_ActionColumns":
+    table = actions if isinstance(actions, ActionTable) else ActionTable.from_actions(actions)
+    columns = _ActionColumns(table, orders)
+    columns.validate_order_events()
+    columns.validate_shelves()
+    if capacities is not None:
+        columns.validate_capacities(capacities)
+    return columns
+
+
+def _get_order_ids(orders: Sequence[Order]) -> Iterable[str]:
+    if isinstance(orders, OrderTable):
+        return orders.iter_ids()
+    return map(_get_id, orders)
+
+
+def _get_best_storage_codes(orders: Sequence[Order]) -> np.ndarray:
+    if isinstance(orders, OrderTable):
+        # the table codes storage types by their position in STORAGE_TYPES too, other temperatures come after
+        codes = np.array(orders.temp_codes, np.int64)
+        codes[codes >= len(STORAGE_TYPES)] = UNKNOWN
+        return codes
+    return np.fromiter(map(STORAGE_CODES.get, map(_get_temp, orders), repeat(UNKNOWN)), np.int64, len(orders))
+
+
+class _ActionColumns:
+    def __init__(self, table: ActionTable, orders: Sequence[Order] = None):
+        self._table = table
+        self._orders = orders
+        # orders are coded again densely: problem orders get the first codes, so their best shelves can be looked up
+        # by code, the other orders follow in the order they first appear
+        problem_codes = np.empty(0, np.int64)
+        self.problem_order_count = None
+        if orders is not None:
+            problem_codes = np.fromiter(
+                map(table.order_codes.get, _get_order_ids(orders), repeat(UNKNOWN)), np.int64, len(orders))
+            self.problem_order_count = len(orders)
+        dense_codes = np.full(max(table.order.max(initial=-1), problem_codes.max(initial=-1)) + 1, UNKNOWN)
+        has_actions = problem_codes != UNKNOWN
+        dense_codes[problem_codes[has_actions]] = np.flatnonzero(has_actions)
+        other_codes = np.unique(table.order[dense_codes[table.order] == UNKNOWN])
+        dense_codes[other_codes] = len(problem_codes) + np.arange(len(other_codes))
+        # table codes of the dense ones, for error messages
+        self._table_codes = np.concatenate([problem_codes, other_codes])
+        self.order = dense_codes[table.order]
+        self.kind = table.kind.astype(np.int64)
+        self.target = table.target.astype(np.int64)
+        self.timestamp = table.timestamp
+        self.best = None
+        if orders is not None:
+            self.best = _get_best_storage_codes(orders)
+
+        order_count = len(self._table_codes)
+        # per order and action type: number of events, their timestamp and target when there is one
+        self.counts = None
+        self.times = np.full((order_count, len(ACTION_TYPES)), -1, np.int64)
+        self.targets = np.full((order_count, len(ACTION_TYPES)), UNKNOWN, np.int64)
+
+    def validate_order_events(self):
+        unknown = np.flatnonzero(self.kind == UNKNOWN)
+        if unknown.size:
+            raise ValueError(f"Order id: {self._get_order_id(self.order[unknown[0]])} has an unknown action.")
+        if self.problem_order_count is not None and len(self._table_codes) > self.problem_order_count:
+            unexpected = self._get_order_id(self.problem_order_count)
+            raise ValueError(f"Order id: {unexpected} is not an order of the problem.")
+
+        order_count = len(self._table_codes)
+        self.counts = np.bincount(
+            self.order * len(ACTION_TYPES) + self.kind, minlength=order_count * len(ACTION_TYPES),
+        ).reshape(order_count, len(ACTION_TYPES))
+        for kind in (PLACE, PICKUP, DISCARD, MOVE):
+            self._raise_first(
+                self.counts[:, kind] > 1,
+                lambda code, kind=kind: (
+                    f"has more than one {ACTION_TYPES[kind]} event. Event count: {self.counts[code, kind]}."),
+            )
+        self.times[self.order, self.kind] = self.timestamp
+        self.targets[self.order, self.kind] = self.target
+
+        placed = self.counts[:, PLACE] == 1
+        picked_up = self.counts[:, PICKUP] == 1
+        discarded = self.counts[:, DISCARD] == 1
+        moved = self.counts[:, MOVE] == 1
+        self._raise_first(~placed, lambda code: "doesn't have place event.")
+        self._raise_first(~picked_up & ~discarded, lambda code: "doesn't have pickup or discard event.")
+        self._raise_first(picked_up & discarded, lambda code: "is both picked up and discarded.")
+
+        place = self.times[:, PLACE]
+        for kind in (PICKUP, DISCARD, MOVE):
+            self._raise_first(
+                (self.counts[:, kind] == 1) & (self.times[:, kind] < place),
+                lambda code, kind=kind: (
+                    f"{ACTION_TYPES[kind]} ({self.times[code, kind]}) happens before place ({place[code]})."),
             )
-        if place and discard and place > discard:
+        removed = np.where(picked_up, self.times[:, PICKUP], self.times[:, DISCARD])
+        self._raise_first(
+            moved & (self.times[:, MOVE] > removed),
+            lambda code: f"move ({self.times[code, MOVE]}) happens after it left the shelves ({removed[code]}).",
+        )
+
+    def validate_shelves(self):
+        place = self.targets[:, PLACE]
+        move = self.targets[:, MOVE]
+        moved = self.counts[:, MOVE] == 1
+        self._raise_first(
+            moved & (place != UNKNOWN) & (place != ROOM),
+            lambda code: f"is moved from the {STORAGE_TYPES[place[code]]} shelf, only room shelf orders are moved.",
+        )
+        self._raise_first(moved & (move == ROOM), lambda code: "is moved to the room shelf.")
+        self._raise_first(
+            (self.counts[:, DISCARD] == 1) & (moved | ((place != UNKNOWN) & (place != ROOM))),
+            lambda code: "is discarded from a hot or cold shelf, only room shelf orders are discarded.",
+        )
+        if self.best is None:
+            return
+
+        self._raise_first(
+            (place != UNKNOWN) & (place != ROOM) & (place != self.best),
+            lambda code: (
+                f"is placed on the {STORAGE_TYPES[place[code]]} shelf, its best shelf is "
+                f"{STORAGE_TYPES[self.best[code]]}."),
+        )
+        self._raise_first(
+            moved & (move != UNKNOWN) & (move != self.best),
+            lambda code: (
+                f"is moved to the {STORAGE_TYPES[move[code]]} shelf, its best shelf is "
+                f"{STORAGE_TYPES[self.best[code]]}."),
+        )
+
+    def validate_capacities(self, capacities: Inventory):
+        place = self.targets[:, PLACE]
+        move = self.targets[:, MOVE]
+        self._raise_first(place == UNKNOWN, lambda code: "place has no target shelf, capacity can't be checked.")
+        self._raise_first(
+            (self.counts[:, MOVE] == 1) & (move == UNKNOWN),
+            lambda code: "move has no target shelf, capacity can't be checked.")
+
+        # shelf every action adds an order to and shelf it takes one from, if any
+        is_place = self.kind == PLACE
+        is_move = self.kind == MOVE
+        shelf_before_removal = np.where(self.counts[:, MOVE] == 1, move, place)[self.order]
+        added_to = np.where(is_move, move[self.order], place[self.order])
+        added_to[~is_place & ~is_move] = UNKNOWN
+        taken_from = np.where(is_move, ROOM, shelf_before_removal)
+        taken_from[is_place] = UNKNOWN
+
+        by_time = np.argsort(self.timestamp, kind="stable")
+        added_to = added_to[by_time]
+        taken_from = taken_from[by_time]
+        timestamps = self.timestamp[by_time]
+        # actions stamped with the same time happened at once, only the count after all of them is checked
+        last_of_timestamp = np.flatnonzero(np.append(timestamps[1:] != timestamps[:-1], True))
+        first_over = None
+        for shelf, storage_type in enumerate(STORAGE_TYPES):
+            limit = getattr(capacities, storage_type)
+            occupancy = np.cumsum((added_to == shelf).astype(np.int32) - (taken_from == shelf))[last_of_timestamp]
+            over = np.flatnonzero(occupancy > limit)
+            if over.size and (first_over is None or over[0] < first_over[0]):
+                first_over = (over[0], storage_type, occupancy[over[0]], limit)
+        if first_over is not None:
+            index, storage_type, orders, limit = first_over
             raise ValueError(
-                f"Order id: {order_id} discard ({discard}) happens before place ({place})."
+                f"The {storage_type} shelf holds {orders} orders at {timestamps[last_of_timestamp[index]]}, "
+                f"its capacity is {limit}."
             )
+
+    def get_pickup_freshness(self, freshness_us: np.ndarray) -> np.ndarray:
+        """
+        Remaining freshness fraction of every order at pickup, negative when stale and NaN when discarded.
+        Orders without a place target are taken to be on their best shelf.
+        """
+        picked_up = self.counts[:, PICKUP] == 1
+        place = self.times[:, PLACE]
+        removed = np.where(picked_up, self.times[:, PICKUP], self.times[:, DISCARD])
+        moved_at = np.where(self.counts[:, MOVE] == 1, self.times[:, MOVE], removed)
+        shelf = self.targets[:, PLACE]
+        decay = np.where((shelf == UNKNOWN) | (shelf == self.best), 1.0, 2.0)
+        # moves only go to the best shelf
+        age_us = decay * (moved_at - place) + (removed - moved_at)
+        return np.where(picked_up, 1 - age_us / freshness_us, np.nan)
+
+    def _raise_first(self, invalid: np.ndarray, get_reason):
+        """Raises for the first invalid order, problem orders come first in problem order, then the rest."""
+        codes = np.flatnonzero(invalid)
+        if codes.size:
+            code = codes[0]
+            raise ValueError(f"Order id: {self._get_order_id(code)} {get_reason(code)}")
+
+    def _get_order_id(self, code: int) -> str:
+        if self.problem_order_count is not None and code < self.problem_order_count:
+            return self._orders.get_id(code) if isinstance(self._orders, OrderTable) else self._orders[code].id
+        table_code = self._table_codes[code]
+        # only called to report an error, so the ids aren't indexed by code up front
+        return next(order_id for order_id, order_code in self._table.order_codes.items() if order_code == table_code)
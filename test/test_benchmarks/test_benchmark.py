@@ -0,0 +1,29 @@
+import unittest
+
+from src.benchmarks.benchmark import benchmark_placement, compare_results, get_config
+from src.constants import StorageEngine
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_placement_benchmark_counts_a_transaction_per_job(self):
+        result = benchmark_placement(get_config(StorageEngine.MEMORY), order_count=50, workers=2)
+
+        self.assertEqual(result["transactions"], 100)
+        self.assertEqual(result["failed_jobs"], 0)
+        self.assertLessEqual(result["place_p50_ms"], result["place_p99_ms"])
+
+    def test_compares_results_with_the_same_parameters(self):
+        baseline = [dict(suite="placement", orders=10, workers=1, transactions_per_second=100.0)]
+        current = [
+            dict(suite="placement", orders=10, workers=1, transactions_per_second=150.0),
+            dict(suite="placement", orders=10, workers=4, transactions_per_second=300.0),
+        ]
+
+        comparison = compare_results(baseline, current)
+
+        self.assertEqual(comparison, [dict(suite="placement", orders=10, workers=1,
+                                           changes=dict(transactions_per_second=0.5))])
+
+
+if __name__ == "__main__":
+    unittest.main()
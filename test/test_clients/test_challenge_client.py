@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from src.clients.challenge_client import ChallengeClient, Options, Solution
+from src.clients.problem_cache import ProblemCache
+from src.models.action import Action
+
+ORDERS = [
+    {"id": "a1", "name": "Pho", "temp": "hot", "freshness": 120},
+    {"id": "b2", "name": "Ice cream", "temp": "cold", "freshness": 60},
+]
+
+
+class ProblemHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    solutions_seen = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.requests_seen.append(self.path)
+        # every first request fails with a gateway error, the client retries it
+        if len(self.requests_seen) % 2 == 1:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(ORDERS).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-test-id", f"test-{len(self.requests_seen)}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.solutions_seen.append((self.headers["x-test-id"], json.loads(body)))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class TestChallengeClient(unittest.TestCase):
+    def setUp(self):
+        ProblemHandler.requests_seen = []
+        ProblemHandler.solutions_seen = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ProblemHandler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        endpoint = f"http://127.0.0.1:{self.server.server_port}"
+        self.client = ChallengeClient(endpoint, "token", cache=ProblemCache(self.cache_dir.name))
+
+    def test_seeded_problems_are_downloaded_once(self):
+        problem = self.client.fetch_problem("small", seed=7)
+        cached = self.client.fetch_problem("small", seed=7)
+
+        self.assertEqual(len(ProblemHandler.requests_seen), 2)
+        self.assertEqual(cached.test_id, problem.test_id)
+        self.assertEqual([order.to_dict() for order in cached.orders], ORDERS)
+
+    def test_identical_problems_share_a_blob(self):
+        self.client.fetch_problem("small", seed=7)
+        self.client.fetch_problem("small", seed=8)
+
+        self.assertEqual(len(ProblemHandler.requests_seen), 4)
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir.name, "blobs"))), 1)
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir.name, "entries"))), 2)
+
+    def test_partially_read_problems_are_not_cached(self):
+        problem = self.client.stream_problem("small", seed=7)
+        self.assertFalse(problem.is_empty())
+        problem.pending_orders.close()
+
+        self.assertIsNone(ProblemCache(self.cache_dir.name).get(self.client.endpoint, "token", "small", 7))
+
+    def test_problems_are_cached_per_auth_token(self):
+        self.client.fetch_problem("small", seed=7)
+        other_client = ChallengeClient(self.client.endpoint, "other-token", cache=self.client.cache)
+        other_client.fetch_problem("small", seed=7)
+        other_client.fetch_problem("small", seed=7)
+
+        self.assertEqual(len(ProblemHandler.requests_seen), 4)
+
+    def test_submitted_solution_shape(self):
+        actions = [Action(1_000, "a1", Action.PLACE, "room"), Action(9_000, "a1", Action.PICKUP)]
+
+        self.client.submit_solution(
+            "test-1", timedelta(milliseconds=500), timedelta(seconds=4), timedelta(seconds=8), actions)
+
+        self.assertEqual(ProblemHandler.solutions_seen, [("test-1", {
+            "options": {"rate": 500_000, "min": 4_000_000, "max": 8_000_000},
+            "actions": [
+                {"id": "a1", "timestamp": 1_000, "action": "place"},
+                {"id": "a1", "timestamp": 9_000, "action": "pickup"},
+            ],
+        })])
+
+
+class TestSolution(unittest.TestCase):
+    def test_actions_are_encoded_without_targets(self):
+        options = Options(timedelta(milliseconds=500), timedelta(seconds=4), timedelta(seconds=8))
+        actions = [Action(1_000, "a1", Action.PLACE, "room"), Action(2_000, "a1", Action.MOVE, "hot")]
+
+        encoded = json.loads(Solution(options, actions).encode())
+
+        self.assertEqual([list(action) for action in encoded["actions"]], [["id", "timestamp", "action"]] * 2)
+        self.assertEqual(encoded["actions"][1], {"id": "a1", "timestamp": 2_000, "action": Action.MOVE})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import unittest
+from threading import Thread
+from unittest import mock
+
+from sqlalchemy import text
+
+from src.clients.database.connection_pool import get_async_database_connection_pool
+from src.clients.database.engine_registry import EngineRegistry, get_max_database_runs
+from src.models.database_config import DatabaseConfig
+from src.models.server_config import ServerConfig
+
+
+class TestEngineRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = EngineRegistry()
+        self.db_config = DatabaseConfig()
+
+    def tearDown(self):
+        self.registry.dispose_all()
+
+    def test_runs_share_engine_and_dispose_keeps_connections_open(self):
+        shared_engine = self.registry.get_engine(self.db_config)
+        self.registry.warm_up(self.db_config)
+
+        with shared_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        shared_engine.dispose()
+
+        self.assertIs(self.registry.get_engine(DatabaseConfig()), shared_engine)
+        metrics = self.registry.get_metrics()[0]
+        self.assertEqual(metrics["checkouts"], 1)
+        self.assertEqual(metrics["checked_out"], 0)
+        self.assertEqual(metrics["checked_in"], metrics["size"])
+
+    def test_runs_are_admitted_up_to_max_runs(self):
+        admitted = []
+
+        def run():
+            with self.registry.admit_run():
+                admitted.append(True)
+
+        with self.registry.admit_run():
+            waiting = Thread(target=run)
+            waiting.start()
+            waiting.join(timeout=0.1)
+            self.assertEqual(admitted, [])
+        waiting.join(timeout=5)
+        self.assertEqual(admitted, [True])
+
+    def test_pool_budget_is_shared_by_worker_processes(self):
+        self.assertEqual(get_max_database_runs(DatabaseConfig(max_connections=97), ServerConfig(workers=1)), 3)
+        self.assertEqual(get_max_database_runs(DatabaseConfig(max_connections=97), ServerConfig(workers=2)), 1)
+
+    def test_explicit_pre_ping_setting_wins_over_environment(self):
+        with mock.patch.dict(os.environ, {"DB_POOL_PRE_PING": "true"}):
+            self.assertTrue(DatabaseConfig().pool.pre_ping)
+            db_config = DatabaseConfig(pool_pre_ping=False)
+
+        self.assertFalse(db_config.pool.pre_ping)
+        self.assertFalse(get_async_database_connection_pool(db_config).pool._pre_ping)
+
+
+if __name__ == "__main__":
+    unittest.main()
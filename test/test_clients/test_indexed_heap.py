@@ -0,0 +1,29 @@
+import unittest
+
+from src.clients.database.indexed_heap import IndexedHeap
+
+
+class TestIndexedHeap(unittest.TestCase):
+    def test_pops_values_in_key_order_skipping_removed_and_replaced_ids(self):
+        heap = IndexedHeap()
+        for item_id, key in (("a", 3), ("b", 1), ("c", 2), ("d", 4)):
+            heap.push(item_id, key, item_id)
+
+        heap.remove("b")
+        heap.push("d", 0, "d")
+
+        self.assertEqual(len(heap), 3)
+        self.assertEqual([heap.pop() for _ in range(4)], ["d", "c", "a", None])
+
+    def test_compacts_stale_entries(self):
+        heap = IndexedHeap()
+        for i in range(1000):
+            heap.push("order", i, i)
+
+        self.assertEqual(len(heap), 1)
+        self.assertLess(len(heap._heap), 100)  # pylint: disable=protected-access
+        self.assertEqual(heap.peek(), 999)
+
+
+if __name__ == "__main__":
+    unittest.main()
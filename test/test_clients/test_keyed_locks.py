@@ -0,0 +1,25 @@
+import gc
+import unittest
+
+from src.clients.database.keyed_locks import KeyedLocks
+
+
+class TestKeyedLocks(unittest.TestCase):
+    def test_lock_per_key_dropped_when_unused(self):
+        locks = KeyedLocks()
+        first = locks.get("kitchen-1")
+
+        self.assertIs(locks.get("kitchen-1"), first)
+        self.assertIsNot(locks.get("kitchen-2"), first)
+        with first:
+            # a different kitchen can place while this one holds its lock
+            with locks.get("kitchen-2"):
+                pass
+
+        del first
+        gc.collect()
+        self.assertEqual(len(locks), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import asyncio
+from typing import List
+import unittest
+
+from sqlalchemy.exc import IntegrityError
+
+from src.clients.database.memory_database_client import MemoryDatabaseClient
+from src.clients.database.memory_storage import AsyncMemoryConnectionPool, MemoryConnectionPool, MemoryStorage
+from src.clients.database.victim_policies import (
+    CheapestToMovePolicy,
+    ExpectedPickupPolicy,
+    LeastRemainingFreshnessPolicy,
+    RelativeAgePolicy,
+)
+from src.constants import MaxInventory, StorageType
+from src.jobs.pickup_order import pickup_order
+from src.jobs.place_order import place_order, place_order_async
+from src.models.action import Action
+from src.models.action_log import ActionLog
+from src.models.order import Order
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryDatabaseClient(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.connection_pool = MemoryConnectionPool(MemoryStorage(clock=self.clock))
+        self.connection = self.connection_pool.connect()
+        self.db_client = MemoryDatabaseClient()
+
+    def assert_actions_equal(
+            self,
+            action_log: ActionLog,
+            expected_actions: List[str]):
+        got_actions = [
+            action.action_type for action in action_log.get_snapshot()]
+        msg = f"Expected: {expected_actions}, got: {got_actions}"
+        self.assertEqual(got_actions, expected_actions, msg)
+
+    def fill_storage(self, storage_type, count, start_id=1, best_storage_type=None):
+        for i in range(start_id, start_id + count):
+            self.db_client.insert_order(
+                self.connection,
+                Order(str(i), str(i), best_storage_type or storage_type, 10 + i),
+                storage_type,
+            )
+
+    def place(self, order: Order) -> ActionLog:
+        action_log = ActionLog()
+        place_order(
+            order=order,
+            db_client=self.db_client,
+            action_log=action_log,
+            connection_pool=self.connection_pool,
+        )
+        return action_log
+
+    def test_when_hot_and_room_storage_is_full_then_order_is_discarded_and_placed_in_room_storage(self):
+        self.fill_storage(StorageType.HOT, MaxInventory.HOT, start_id=1)
+        self.fill_storage(StorageType.ROOM, MaxInventory.ROOM, start_id=1 + MaxInventory.HOT)
+
+        action_log = self.place(Order("0", "0", StorageType.HOT, 10))
+
+        self.assert_actions_equal(action_log, [Action.DISCARD, Action.PLACE])
+        order = self.db_client.fetch_order_if_exists(self.connection, "0")
+        self.assertEqual(order.storage_type, StorageType.ROOM)
+
+    def test_when_room_storage_is_full_and_cold_has_space_then_order_is_moved(self):
+        self.fill_storage(StorageType.HOT, MaxInventory.HOT, start_id=1)
+        self.fill_storage(
+            StorageType.ROOM, MaxInventory.ROOM, start_id=1 + MaxInventory.HOT, best_storage_type=StorageType.COLD)
+
+        action_log = self.place(Order("0", "0", StorageType.HOT, 10))
+
+        self.assert_actions_equal(action_log, [Action.MOVE, Action.PLACE])
+        inventory = self.db_client.fetch_inventory(self.connection)
+        self.assertEqual((inventory.hot, inventory.cold, inventory.room), (MaxInventory.HOT, 1, MaxInventory.ROOM))
+
+    def test_discards_order_with_highest_relative_age(self):
+        self.db_client.insert_order(self.connection, Order("fresh", "fresh", StorageType.ROOM, 100), StorageType.ROOM)
+        self.db_client.insert_order(self.connection, Order("hot", "hot", StorageType.HOT, 100), StorageType.ROOM)
+        self.clock.now += 60
+
+        order = self.db_client.fetch_order_to_discard(self.connection)
+
+        # hot order decays twice as fast outside of its best storage
+        self.assertEqual(order.id, "hot")
+        self.assertEqual(order.age, 20)
+
+    def test_discards_order_chosen_by_storage_policy(self):
+        expected = [
+            (RelativeAgePolicy(), "hot"),
+            (LeastRemainingFreshnessPolicy(), "room"),
+            (ExpectedPickupPolicy(expected_pickup_delay=6), "room"),
+            (CheapestToMovePolicy(), "first"),
+        ]
+        for policy, expected_order_id in expected:
+            with self.subTest(policy=policy.name):
+                connection = MemoryConnectionPool(MemoryStorage(clock=self.clock, policy=policy)).connect()
+                for order_id, temp, freshness in (("first", "room", 300), ("room", "room", 50), ("hot", "hot", 104)):
+                    order = Order(order_id, order_id, temp, freshness)
+                    self.db_client.insert_order(connection, order, StorageType.ROOM)
+                self.clock.now += 60
+
+                order = self.db_client.fetch_order_to_discard(connection)
+
+                # hot order is less overdue but decays twice as fast, so its relative age is the highest
+                self.assertEqual(order.id, expected_order_id)
+
+    def test_picks_up_order(self):
+        self.fill_storage(StorageType.HOT, 2)
+
+        action_log = ActionLog()
+        pickup_order(
+            order=Order("1", "1", StorageType.HOT, 10),
+            db_client=self.db_client,
+            action_log=action_log,
+            connection_pool=self.connection_pool,
+        )
+
+        self.assert_actions_equal(action_log, [Action.PICKUP])
+        self.assertIsNone(self.db_client.fetch_order_if_exists(self.connection, "1"))
+
+    def test_async_place_order_uses_the_same_storage(self):
+        async_connection_pool = AsyncMemoryConnectionPool(self.connection_pool.storage)
+
+        action_log = ActionLog()
+        asyncio.run(place_order_async(
+            order=Order("0", "0", StorageType.COLD, 10),
+            db_client=self.db_client,
+            action_log=action_log,
+            connection_pool=async_connection_pool,
+        ))
+
+        self.assert_actions_equal(action_log, [Action.PLACE])
+        order = self.db_client.fetch_order_if_exists(self.connection, "0")
+        self.assertEqual(order.storage_type, StorageType.COLD)
+
+    def test_when_transaction_fails_then_changes_are_rolled_back(self):
+        self.fill_storage(StorageType.HOT, 1)
+
+        with self.assertRaises(IntegrityError):
+            with self.db_client.transaction(self.connection):
+                self.db_client.delete_order_if_exists(self.connection, "1")
+                self.db_client.insert_order(self.connection, Order("2", "2", StorageType.ROOM, 10), StorageType.ROOM)
+                self.db_client.insert_order(self.connection, Order("2", "2", StorageType.ROOM, 10), StorageType.ROOM)
+
+        self.assertIsNotNone(self.db_client.fetch_order_if_exists(self.connection, "1"))
+        self.assertIsNone(self.db_client.fetch_order_if_exists(self.connection, "2"))
+        inventory = self.db_client.fetch_inventory(self.connection)
+        self.assertEqual((inventory.hot, inventory.cold, inventory.room), (1, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import unittest
+
+from src.emulator.challenge_server import BATCH_SIZE, app, get_problem_orders
+
+
+class TestChallengeServer(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def get_problem(self, seed: int, size: int):
+        response = self.client.get(f"/interview/challenge/new?auth=token&name=&seed={seed}&size={size}")
+        self.assertEqual(response.status_code, 200)
+        return response.headers["x-test-id"], json.loads(response.get_data())
+
+    def solve(self, test_id: str, actions: list):
+        solution = {"options": {"rate": 500_000, "min": 4_000_000, "max": 8_000_000}, "actions": actions}
+        return self.client.post("/interview/challenge/solve?auth=token", json=solution, headers={"x-test-id": test_id})
+
+    def test_problems_are_generated_from_the_seed(self):
+        test_id, orders = self.get_problem(seed=7, size=25_000)
+        other_id, same_orders = self.get_problem(seed=7, size=25_000)
+
+        self.assertNotEqual(test_id, other_id)
+        self.assertEqual(orders, same_orders)
+        self.assertEqual(len({order["id"] for order in orders}), 25_000)
+        self.assertNotEqual(self.get_problem(seed=8, size=3)[1], orders[:3])
+        self.assertEqual([order.to_dict() for order in get_problem_orders(7, 25_000)], orders)
+
+    def test_larger_problems_start_with_the_orders_of_smaller_ones(self):
+        larger = get_problem_orders(7, 2 * BATCH_SIZE + 10)
+        for size in (100, BATCH_SIZE + 1):
+            with self.subTest(size=size):
+                smaller = get_problem_orders(7, size)
+                self.assertEqual([order.to_dict() for order in smaller], [larger[i].to_dict() for i in range(size)])
+
+    def test_solution_is_scored(self):
+        test_id, orders = self.get_problem(seed=7, size=2)
+        actions = []
+        for i, order in enumerate(orders):
+            actions.append({"id": order["id"], "timestamp": i * 500_000, "action": "place", "target": order["temp"]})
+            actions.append({"id": order["id"], "timestamp": i * 500_000 + 5_000_000, "action": "pickup"})
+
+        response = self.solve(test_id, actions)
+
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["score"]["picked_up"], 2)
+        self.assertEqual(result["score"]["waste"], 0)
+        for action in actions:
+            action.pop("target", None)
+        self.assertTrue(self.solve(test_id, actions).get_json()["valid"])
+
+    def test_invalid_solution(self):
+        test_id, orders = self.get_problem(seed=7, size=2)
+        actions = [{"id": orders[0]["id"], "timestamp": 0, "action": "place", "target": "room"}]
+
+        result = self.solve(test_id, actions).get_json()
+
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["errors"], [f"Order id: {orders[1]['id']} doesn't have place event."])
+
+    def test_unknown_test_id(self):
+        self.assertEqual(self.solve("not-a-test", []).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+from threading import Thread
+import unittest
+
+from src.jobs.job_utils import JobTracker
+
+
+class TestJobTracker(unittest.TestCase):
+    def test_when_not_sealed_then_is_not_done(self):
+        tracker = JobTracker()
+        tracker.add()
+        tracker.start()
+        tracker.finish()
+
+        self.assertFalse(tracker.is_done())
+        tracker.seal()
+        self.assertTrue(tracker.is_done())
+
+    def test_wait_returns_when_last_job_finishes(self):
+        tracker = JobTracker()
+        tracker.add(2)
+        tracker.seal()
+
+        def run_jobs():
+            tracker.start()
+            tracker.finish()
+            tracker.start()
+            tracker.finish(failed=True)
+
+        thread = Thread(target=run_jobs)
+        thread.start()
+
+        self.assertTrue(tracker.wait(timeout=5))
+        thread.join()
+        self.assertEqual(tracker.get_summary(), dict(pending=0, running=0, completed=1, failed=1))
+
+    def test_wait_times_out_while_jobs_are_running(self):
+        tracker = JobTracker()
+        tracker.add()
+        tracker.seal()
+        tracker.start()
+
+        self.assertFalse(tracker.wait(timeout=0.01))
+        self.assertEqual(tracker.get_summary(), dict(pending=0, running=1, completed=0, failed=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ from src.constants import MaxInventory, StorageType
 from src.jobs.place_order import place_order
 from src.models.action_log import ActionLog
 from src.models.database_config import DatabaseConfig
+from src.models.inventory import Inventory
 from src.models.order import Order
 from src.models.action import Action
 
@@ -99,9 +100,78 @@ class TestPlaceOrder(unittest.TestCase):
         self.assertIsNotNone(order)
         self.assertEqual(order.storage_type, StorageType.ROOM)
 
+    def test_when_hot_and_room_storage_is_full_and_cold_has_space_then_order_is_moved_and_placed(
+            self):
+        self.fill_hot_storage(start_id=1)
+        self.fill_room_storage(
+            start_id=1 + MaxInventory.HOT,
+            best_storage_type=StorageType.COLD)
+
+        action_log = ActionLog()
+        place_order(
+            order=Order("0", "0", StorageType.HOT, 10),
+            db_client=self.db_client,
+            action_log=action_log,
+            connection_pool=self.connection_pool,
+        )
+        inventory = self.db_client.fetch_inventory(self.connection)
+        self.connection.commit()
+
+        self.assert_actions_equal(action_log, [Action.MOVE, Action.PLACE])
+        self.assertEqual(inventory.cold, 1)
+        self.assertEqual(inventory.room, MaxInventory.ROOM)
+
+    def test_when_hot_capacity_is_lowered_then_order_is_placed_in_room_storage(
+            self):
+        self.set_capacities(Inventory(hot=1, cold=MaxInventory.COLD, room=MaxInventory.ROOM))
+
+        action_log = ActionLog()
+        for order_id in ("0", "1"):
+            place_order(
+                order=Order(order_id, order_id, StorageType.HOT, 10),
+                db_client=self.db_client,
+                action_log=action_log,
+                connection_pool=self.connection_pool,
+            )
+        order = self.db_client.fetch_order_if_exists(self.connection, "1")
+        self.connection.commit()
+
+        self.assert_actions_equal(action_log, [Action.PLACE, Action.PLACE])
+        self.assertEqual(order.storage_type, StorageType.ROOM)
+
+    def test_orders_in_other_kitchen_do_not_take_up_space(self):
+        self.fill_hot_storage()
+        other_db_client = DatabaseClient("other")
+        with other_db_client.transaction(self.connection):
+            other_db_client.update_capacities(self.connection, DatabaseConfig().get_capacities())
+
+        try:
+            action_log = ActionLog()
+            place_order(
+                order=Order("0", "0", StorageType.HOT, 10),
+                db_client=other_db_client,
+                action_log=action_log,
+                connection_pool=self.connection_pool,
+            )
+            order = other_db_client.fetch_order_if_exists(self.connection, "0")
+            inventory = self.db_client.fetch_inventory(self.connection)
+            self.connection.commit()
+        finally:
+            with other_db_client.transaction(self.connection):
+                other_db_client.delete_kitchen(self.connection)
+
+        self.assert_actions_equal(action_log, [Action.PLACE])
+        self.assertEqual(order.storage_type, StorageType.HOT)
+        self.assertEqual(inventory.hot, MaxInventory.HOT)
+
+    def set_capacities(self, capacities: Inventory):
+        with self.db_client.transaction(self.connection):
+            self.db_client.update_capacities(self.connection, capacities)
+
     def tearDown(self):
         self.db_client.delete_all_orders(self.connection)
         self.connection.commit()
+        self.set_capacities(DatabaseConfig().get_capacities())
 
     @classmethod
     def tearDownClass(cls):
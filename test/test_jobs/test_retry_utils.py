@@ -0,0 +1,71 @@
+import logging
+import unittest
+from unittest.mock import patch
+
+from src import constants
+from src.jobs.exceptions import RetryException
+from src.jobs.retry_utils import get_backoff_seconds, retry_with_backoff
+from src.models.action_log import ActionLog
+from src.models.metrics import KitchenMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class TestRetryUtils(unittest.TestCase):
+    def test_backoff_grows_with_attempts_up_to_max_delay(self):
+        for attempt in (1, 3, 20):
+            ceiling = min(constants.RETRY_MAX_DELAY_SECONDS, constants.RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1))
+            for _ in range(100):
+                self.assertTrue(0 <= get_backoff_seconds(attempt) <= ceiling)
+
+    @patch("src.jobs.retry_utils.time.sleep")
+    def test_retries_given_exceptions_then_raises_the_last_one(self, sleep):
+        calls = []
+
+        @retry_with_backoff(exceptions=(KeyError,), tries=3, logger=logger)
+        def fail():
+            calls.append(len(calls))
+            raise KeyError(len(calls))
+
+        with self.assertLogs(logger, level=logging.WARNING):
+            with self.assertRaises(KeyError) as context:
+                fail()
+
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(context.exception.args, (3,))
+        self.assertEqual(sleep.call_count, 2)
+
+    @patch("src.jobs.retry_utils.time.sleep")
+    def test_retries_are_counted_in_the_metrics_of_the_action_log(self, _sleep):
+        action_log = ActionLog()
+        action_log.metrics = KitchenMetrics()
+        causes = [constants.RetryCause.POOL_TIMEOUT, constants.RetryCause.TRANSACTION_CONFLICT]
+
+        @retry_with_backoff(exceptions=(RetryException,), tries=3, logger=logger, kind="place")
+        def fail(order_id: str, action_log: ActionLog):  # pylint: disable=unused-argument
+            raise RetryException(causes.pop(0) if causes else constants.RetryCause.POOL_TIMEOUT)
+
+        with self.assertLogs(logger, level=logging.WARNING):
+            with self.assertRaises(RetryException):
+                fail("1", action_log=action_log)
+
+        # the last attempt isn't retried
+        self.assertEqual(
+            action_log.metrics.get_summary()["job_retries_total"],
+            {"place": {"pool_timeout": 1, "transaction_conflict": 1}},
+        )
+
+    @patch("src.jobs.retry_utils.time.sleep")
+    def test_other_exceptions_are_not_retried(self, sleep):
+        @retry_with_backoff(exceptions=(KeyError,), tries=3, logger=logger)
+        def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            fail()
+
+        sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
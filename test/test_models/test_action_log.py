@@ -0,0 +1,62 @@
+from threading import Thread
+import unittest
+
+from src.models.action import Action
+from src.models.action_log import ActionLog
+
+
+class TestActionLog(unittest.TestCase):
+    def test_snapshot_merges_actions_recorded_by_many_threads_in_time_order(self):
+        action_log = ActionLog()
+
+        def record(thread_index: int):
+            for i in range(100):
+                action_log.record(Action.PLACE, f"{thread_index}-{i}")
+
+        threads = [Thread(target=record, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        timestamps = [action.timestamp for action in action_log.get_snapshot()]
+        self.assertEqual(len(timestamps), 400)
+        self.assertEqual(timestamps, sorted(timestamps))
+        table = action_log.get_table()
+        self.assertEqual(sorted(table.timestamp.tolist()), timestamps)
+        self.assertEqual(len(set(table.order.tolist())), 400)
+
+    def test_snapshot_orders_actions_recorded_with_earlier_timestamps(self):
+        action_log = ActionLog()
+        action_log.record(Action.PICKUP, "1", 3_000)
+        action_log.record(Action.PLACE, "1", 1_000)
+        action_log.record(Action.PLACE, "2", 2_000)
+
+        snapshot = action_log.get_snapshot()
+
+        self.assertEqual(
+            [(action.timestamp, action.id) for action in snapshot],
+            [(1_000, "1"), (2_000, "2"), (3_000, "1")],
+        )
+        self.assertEqual(snapshot[0].to_dict(), {"id": "1", "timestamp": 1_000, "action": Action.PLACE})
+
+    def test_table_codes_actions_as_they_are_recorded(self):
+        action_log = ActionLog()
+        action_log.record(Action.PLACE, "1", 1_000, "room")
+        action_log.record(Action.MOVE, "1", 2_000, "hot")
+        action_log.record(Action.PLACE, "2", 2_000, "cold")
+        action_log.record(Action.PICKUP, "1", 3_000)
+
+        table = action_log.get_table()
+
+        self.assertEqual(table.order_codes, {"1": 0, "2": 1})
+        self.assertEqual(table.order.tolist(), [0, 0, 1, 0])
+        # action types and shelves are coded by their positions in ACTION_TYPES and STORAGE_TYPES
+        self.assertEqual(table.kind.tolist(), [0, 1, 0, 2])
+        self.assertEqual(table.target.tolist(), [2, 0, 1, -1])
+        self.assertEqual(table.timestamp.tolist(), [1_000, 2_000, 2_000, 3_000])
+        self.assertEqual(len(ActionLog().get_table()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from src.models.metrics import KitchenMetrics
+
+
+class TestKitchenMetrics(unittest.TestCase):
+    def setUp(self):
+        self.process_metrics = KitchenMetrics()
+        self.run_metrics = KitchenMetrics(parent=self.process_metrics)
+
+    def test_run_observations_are_summarized_and_recorded_in_parent(self):
+        lag = self.run_metrics.dispatch_lag_seconds.labels("place")
+        for value in (0.0002, 0.0003, 0.004, 0.2):
+            lag.observe(value)
+        self.run_metrics.transaction_conflicts_total.labels().inc()
+
+        summary = self.run_metrics.get_summary()
+
+        self.assertEqual(summary["dispatch_lag_seconds"]["place"]["count"], 4)
+        self.assertEqual(summary["dispatch_lag_seconds"]["place"]["p50"], 0.0005)
+        self.assertEqual(summary["dispatch_lag_seconds"]["place"]["max"], 0.2)
+        self.assertEqual(summary["transaction_conflicts_total"], 1)
+        self.assertEqual(self.process_metrics.get_summary(), summary)
+
+    def test_renders_prometheus_text_format(self):
+        self.run_metrics.database_call_seconds.labels("place_order").observe(0.003)
+
+        lines = self.process_metrics.render().splitlines()
+
+        self.assertIn("# TYPE kitchen_database_call_seconds histogram", lines)
+        self.assertIn('kitchen_database_call_seconds_bucket{method="place_order",le="0.0025"} 0', lines)
+        self.assertIn('kitchen_database_call_seconds_bucket{method="place_order",le="0.005"} 1', lines)
+        self.assertIn('kitchen_database_call_seconds_bucket{method="place_order",le="+Inf"} 1', lines)
+        self.assertIn('kitchen_database_call_seconds_count{method="place_order"} 1', lines)
+        self.assertIn("kitchen_transaction_conflicts_total 0", lines)
+
+    def test_retries_are_counted_by_kind_and_cause(self):
+        self.run_metrics.job_retries_total.labels("place", "pool_timeout").inc()
+        self.run_metrics.job_retries_total.labels("place", "transaction_conflict").inc(2)
+
+        self.assertEqual(
+            self.run_metrics.get_summary()["job_retries_total"],
+            {"place": {"pool_timeout": 1, "transaction_conflict": 2}},
+        )
+        self.assertEqual(self.process_metrics.job_retries_total.get_total(), 3)
+        self.assertIn(
+            'kitchen_job_retries_total{kind="place",cause="pool_timeout"} 1',
+            self.process_metrics.render().splitlines(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
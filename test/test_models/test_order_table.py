@@ -0,0 +1,40 @@
+import unittest
+
+from src.models.order import Order
+from src.models.order_table import OrderTable
+
+ORDERS = [
+    Order("a1", "Pho", "hot", 120),
+    Order("b2", "Crème brûlée", "cold", 300),
+    Order("c3", "Pho", "frozen", 45),
+]
+
+
+class TestOrderTable(unittest.TestCase):
+    def test_orders_read_back_as_views(self):
+        table = OrderTable(ORDERS)
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual([order.to_dict() for order in table], [order.to_dict() for order in ORDERS])
+        self.assertEqual(table[-1].temp, "frozen")
+        self.assertEqual(list(table.iter_ids()), ["a1", "b2", "c3"])
+
+    def test_ids_read_back_in_one_pass(self):
+        ids = ["a1", "", "Crème", "x\0y", "z"]
+        for case in ([], ids[:1], ids[:3], ids):
+            with self.subTest(ids=case):
+                table = OrderTable(Order(order_id, "Pho", "hot", 120) for order_id in case)
+                self.assertEqual(list(table.iter_ids()), case)
+
+    def test_columns_are_coded(self):
+        table = OrderTable(ORDERS)
+
+        self.assertEqual(table.names, ["Pho", "Crème brûlée"])
+        self.assertEqual(list(table.name_codes), [0, 1, 0])
+        # storage types are coded by their position in STORAGE_TYPES, other temperatures after them
+        self.assertEqual(list(table.temp_codes), [0, 1, 3])
+        self.assertEqual(list(table.freshness), [120, 300, 45])
+
+
+if __name__ == "__main__":
+    unittest.main()
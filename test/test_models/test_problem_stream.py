@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.models.problem_stream import JsonStreamReader, stream_problem_file, stream_problem_response
+
+ORDERS = [
+    {"id": "a1", "name": "Crème brûlée", "temp": "cold", "freshness": 120},
+    {"id": "b2", "name": "Pho", "temp": "hot", "freshness": 1234567},
+]
+
+
+class TestProblemStream(unittest.TestCase):
+    def test_reads_values_split_across_chunks(self):
+        text = json.dumps({"orders": ORDERS, "tags": [1, 2.5, None, True], "test_id": "t"}, indent=1)
+        # one character per chunk splits every token, including numbers at the end of a chunk
+        reader = JsonStreamReader(iter(text))
+
+        values = {}
+        for key in reader.iter_object():
+            values[key] = list(reader.iter_array()) if key == "orders" else reader.read_value()
+
+        self.assertEqual(values, {"orders": ORDERS, "tags": [1, 2.5, None, True], "test_id": "t"})
+
+    def test_problem_file_orders_are_parsed_as_they_are_iterated(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as fp:
+            json.dump({"orders": ORDERS, "test_id": "file-test"}, fp)
+        self.addCleanup(os.remove, fp.name)
+
+        problem = stream_problem_file(fp.name)
+        self.assertFalse(problem.is_empty())
+        self.assertEqual(len(problem.orders), 1)
+
+        self.assertEqual([order.id for order in problem.iter_orders()], ["a1", "b2"])
+        self.assertEqual(problem.test_id, "file-test")
+        self.assertEqual(problem.orders[0].name, "Crème brûlée")
+
+    def test_response_body_split_inside_multibyte_characters(self):
+        body = json.dumps(ORDERS, ensure_ascii=False).encode("utf-8")
+        chunks = (body[i:i + 3] for i in range(0, len(body), 3))
+
+        problem = stream_problem_response("http-test", chunks).load_orders()
+
+        self.assertEqual([order.to_dict() for order in problem.orders], ORDERS)
+
+    def test_empty_problem(self):
+        self.assertTrue(stream_problem_response("empty", [b"[ ]"]).is_empty())
+
+    def test_malformed_json_raises(self):
+        body = f"[{json.dumps(ORDERS[0])} {json.dumps(ORDERS[1])}]".encode("utf-8")
+        with self.assertRaises(ValueError):
+            stream_problem_response("broken", [body]).load_orders()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+from threading import Event, Lock
+import unittest
+
+from src.constants import JobKind
+from src.scheduler.dispatcher import Dispatcher
+
+
+class TestDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.lock = Lock()
+        self.executed = []
+        self.events = []
+        self.all_done = Event()
+        self.batches = []
+        self.expected_count = 0
+
+    def run_job(self, kind: int, order_index: int):
+        with self.lock:
+            self.executed.append((kind, order_index))
+
+    def listener(self, event):
+        with self.lock:
+            self.events.append(event)
+            if len(self.events) == self.expected_count:
+                self.all_done.set()
+
+    def run_batch(self, batch):
+        with self.lock:
+            self.batches.append(batch)
+
+    def run_dispatcher(self, entries, max_workers=1, batch_window_us=0):
+        self.expected_count = len(entries)
+        dispatcher = Dispatcher(
+            self.run_job, max_workers=max_workers, run_batch=self.run_batch, batch_window_us=batch_window_us)
+        dispatcher.add_listener(self.listener)
+        for entry in entries:
+            dispatcher.add(*entry)
+        dispatcher.start()
+        dispatcher.close()
+        self.assertTrue(self.all_done.wait(timeout=5))
+        dispatcher.shutdown(wait=True)
+        return dispatcher
+
+    def test_jobs_are_executed_in_due_time_order(self):
+        self.run_dispatcher([
+            (20_000, JobKind.PICKUP, 0),
+            (0, JobKind.PLACE, 0),
+            (10_000, JobKind.PLACE, 1),
+            (30_000, JobKind.PICKUP, 1),
+        ])
+
+        self.assertEqual(
+            self.executed,
+            [(JobKind.PLACE, 0), (JobKind.PLACE, 1), (JobKind.PICKUP, 0), (JobKind.PICKUP, 1)],
+        )
+
+    def test_jobs_do_not_start_before_they_are_due(self):
+        dispatcher = self.run_dispatcher([(0, JobKind.PLACE, 0), (50_000, JobKind.PICKUP, 0)])
+
+        for event in self.events:
+            self.assertGreaterEqual(event.started_us, event.scheduled_us)
+            self.assertGreaterEqual(event.lag_us, 0)
+        self.assertEqual(dispatcher.dispatched_count, 2)
+
+    def test_failed_job_is_reported_to_listeners(self):
+        def failing_job(kind, order_index):
+            raise ValueError(f"{kind} {order_index}")
+
+        self.run_job = failing_job
+        self.run_dispatcher([(0, JobKind.PLACE, 7)])
+
+        self.assertEqual(self.events[0].job_id, "7_place")
+        self.assertIsInstance(self.events[0].exception, ValueError)
+
+    def test_jobs_due_within_batch_window_are_run_together(self):
+        self.run_dispatcher([
+            (0, JobKind.PLACE, 0),
+            (2_000, JobKind.PLACE, 1),
+            (1_000, JobKind.PICKUP, 2),
+            (50_000, JobKind.PICKUP, 0),
+        ], batch_window_us=5_000)
+
+        self.assertEqual(self.batches, [
+            [(0, JobKind.PLACE, 0), (1_000, JobKind.PICKUP, 2), (2_000, JobKind.PLACE, 1)],
+            [(50_000, JobKind.PICKUP, 0)],
+        ])
+        self.assertEqual(len(self.events), 4)
+        self.assertEqual(self.executed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import time
+import unittest
+
+from src.constants import RunStatus, StorageEngine
+from src.scheduler.scheduler_entrypoint import NDJSON_MIMETYPE, app
+
+
+class TestScheduleOrders(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.config = {
+            "problem_file_path": "containers_data/problem-20.json",
+            "order_rate": 10,
+            "min_pickup": 1,
+            "max_pickup": 1,
+            "storage_engine": StorageEngine.MEMORY,
+        }
+
+    def test_streams_actions_followed_by_summary(self):
+        response = self.client.post("/schedule-orders?stream=1", json=self.config)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        actions, summary = records[:-1], records[-1]["summary"]
+        self.assertEqual(len(actions), 40)
+        self.assertEqual(summary["counts"], {"place": 20, "pickup": 20})
+        self.assertTrue(summary["valid"])
+
+    def test_streams_when_ndjson_is_accepted(self):
+        response = self.client.post("/schedule-orders", json=self.config, headers={"Accept": NDJSON_MIMETYPE})
+
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+        self.assertIn("summary", json.loads(response.get_data(as_text=True).splitlines()[-1]))
+
+    def test_submitted_run_executes_in_background(self):
+        response = self.client.post("/runs", json=self.config)
+
+        self.assertEqual(response.status_code, 202)
+        run_id = response.get_json()["run_id"]
+        self.assertEqual(response.headers["Location"], f"/runs/{run_id}")
+
+        deadline = time.time() + 10
+        run = response.get_json()
+        while run["status"] in (RunStatus.PENDING, RunStatus.RUNNING) and time.time() < deadline:
+            time.sleep(0.1)
+            run = self.client.get(f"/runs/{run_id}").get_json()
+
+        self.assertEqual(run["status"], RunStatus.COMPLETED)
+        self.assertTrue(run["valid"])
+        self.assertEqual(run["jobs"]["completed"], 40)
+        actions = self.client.get(f"/runs/{run_id}/actions").get_json()["actions"]
+        self.assertEqual(len(actions), run["actions"])
+
+    def test_run_metrics_are_summarized_and_exported(self):
+        response = self.client.post("/schedule-orders", json=self.config)
+
+        metrics = response.get_json()["metrics"]
+        self.assertEqual(metrics["job_duration_seconds"]["place"]["count"], 20)
+        self.assertEqual(metrics["database_call_seconds"]["place_order"]["count"], 20)
+        exported = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('kitchen_dispatch_lag_seconds_count{kind="pickup"}', exported)
+
+    def test_unknown_run_is_not_found(self):
+        self.assertEqual(self.client.get("/runs/unknown").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import time
+import unittest
+
+from src.constants import StorageEngine
+from src.models.config import Config
+from src.models.problem import Problem
+from src.scheduler.scheduler import schedule_problem_orders
+
+
+class TestSimulatedTime(unittest.TestCase):
+    def setUp(self):
+        with open("containers_data/problem-30-hot.json", "r", encoding="utf-8") as fp:
+            self.problem = Problem.from_dict(json.load(fp))
+        self.config = Config(
+            problem_file_path="containers_data/problem-30-hot.json",
+            order_rate=500,
+            min_pickup=4,
+            max_pickup=8,
+            seed=3,
+            storage_engine=StorageEngine.MEMORY,
+            simulated_time=True,
+        )
+
+    def schedule(self):
+        actions = schedule_problem_orders(self.problem, self.config)
+        start_us = actions[0].timestamp
+        return [(action.action_type, action.id, action.timestamp - start_us) for action in actions]
+
+    def test_schedule_is_replayed_without_waiting_for_due_times(self):
+        started = time.monotonic()
+        actions = self.schedule()
+
+        self.assertLess(time.monotonic() - started, 5)
+        # last pickup is due at least 29 * 500 ms + 4 s after the first placement
+        self.assertGreaterEqual(actions[-1][2], 18_500_000)
+
+    def test_same_seed_produces_same_actions(self):
+        self.assertEqual(self.schedule(), self.schedule())
+
+
+if __name__ == "__main__":
+    unittest.main()
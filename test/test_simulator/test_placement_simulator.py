@@ -0,0 +1,60 @@
+import json
+from collections import Counter
+import unittest
+
+from src.constants import StorageEngine, VICTIM_POLICIES
+from src.models.action import Action
+from src.models.config import Config
+from src.models.problem import Problem
+from src.scheduler.scheduler import schedule_problem_orders
+from src.simulator.placement_simulator import simulate, summarize, sweep
+
+
+class TestPlacementSimulator(unittest.TestCase):
+    def setUp(self):
+        with open("containers_data/problem-30-hot.json", "r", encoding="utf-8") as fp:
+            self.problem = Problem.from_dict(json.load(fp))
+        self.config = Config(
+            problem_file_path="containers_data/problem-30-hot.json",
+            order_rate=100,
+            min_pickup=4,
+            max_pickup=8,
+            seed=7,
+            storage_engine=StorageEngine.MEMORY,
+            simulated_time=True,
+            hot_capacity=2,
+            room_capacity=4,
+        )
+
+    def test_makes_the_same_decisions_as_a_simulated_run(self):
+        for policy in VICTIM_POLICIES:
+            with self.subTest(policy=policy):
+                config = self.config.model_copy(update={"victim_policy": policy})
+                result = simulate(self.problem, config)
+
+                actions = schedule_problem_orders(self.problem, config)
+                counts = Counter(action.action_type for action in actions)
+                self.assertGreater(result.discarded_count, 0)
+                self.assertEqual(result.discarded_count, counts[Action.DISCARD])
+                self.assertEqual(result.moved, counts[Action.MOVE])
+                self.assertEqual(result.picked_up_count, counts[Action.PICKUP])
+                self.assertEqual(result.picked_up_count + result.discarded_count, len(self.problem.orders))
+                discarded = {action.id for action in actions if action.action_type == Action.DISCARD}
+                self.assertEqual(
+                    discarded, {self.problem.orders[i].id for i in result.discarded.nonzero()[0]})
+
+    def test_sweep_summarizes_every_policy_across_seeds(self):
+        results = sweep(self.problem, [self.config], seeds=range(1, 4))
+
+        self.assertEqual(len(results), 3 * len(VICTIM_POLICIES))
+        summary = summarize(results)
+        self.assertEqual([row["policy"] for row in summary], VICTIM_POLICIES)
+        self.assertTrue(all(row["runs"] == 3 for row in summary))
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            simulate(self.problem, self.config, "newest")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+from src.models.action import Action
+from src.models.action_log import ActionLog
+from src.models.inventory import Inventory
+from src.models.order import Order
+from src.validators.actions_validators import score_actions, validate_actions, validate_serialized_actions
+
+ORDERS = [
+    Order("a", "Soup", "hot", 100),
+    Order("b", "Ice cream", "cold", 100),
+    Order("c", "Bread", "room", 100),
+]
+
+
+def get_actions(*rows):
+    return [Action(timestamp, order_id, action_type, target) for timestamp, order_id, action_type, target in rows]
+
+
+class TestActionsValidators(unittest.TestCase):
+    def test_valid_actions_with_moves_and_discards(self):
+        actions = get_actions(
+            (1, "a", Action.PLACE, "room"),
+            # room shelf is full: a is moved to its best shelf to make room for b, then b is discarded for c
+            (2, "a", Action.MOVE, "hot"),
+            (2, "b", Action.PLACE, "room"),
+            (3, "b", Action.DISCARD, "room"),
+            (3, "c", Action.PLACE, "room"),
+            (4, "a", Action.PICKUP, None),
+            (5, "c", Action.PICKUP, None),
+        )
+
+        validate_actions(actions, Inventory(hot=1, cold=1, room=1), ORDERS)
+
+    def test_coded_actions(self):
+        rows = [(1, "a", Action.PLACE, "hot"), (2, "b", Action.PLACE, "room"), (3, "a", Action.PICKUP, None)]
+        action_log = ActionLog()
+        for timestamp, order_id, action_type, target in rows:
+            action_log.record(action_type, order_id, timestamp, target)
+        serialized = [action.to_dict() for action in get_actions(*rows)]
+
+        cases = [(validate_actions, action_log.get_table()), (validate_serialized_actions, serialized)]
+        for validate, actions in cases:
+            with self.subTest(validate=validate.__name__):
+                with self.assertRaisesRegex(ValueError, "Order id: b doesn't have pickup or discard event."):
+                    validate(actions, Inventory(hot=1, cold=1, room=1), ORDERS[:2])
+                with self.assertRaisesRegex(ValueError, "Order id: c doesn't have place event."):
+                    validate(actions, orders=ORDERS)
+
+    def test_order_events(self):
+        cases = [
+            ("more than one place", [(1, "a", Action.PLACE, None), (2, "a", Action.PLACE, None)]),
+            ("doesn't have place", [(1, "a", Action.PICKUP, None)]),
+            ("doesn't have pickup or discard", [(1, "a", Action.PLACE, None)]),
+            ("both picked up and discarded", get_rows("a", Action.PLACE, Action.DISCARD, Action.PICKUP)),
+            (r"pickup \(1\) happens before place \(2\)", [(2, "a", Action.PLACE, None), (1, "a", Action.PICKUP, None)]),
+            (r"move \(3\) happens after", get_rows("a", Action.PLACE, Action.PICKUP, Action.MOVE)),
+            ("unknown action", [(1, "a", "cook", None)]),
+        ]
+        for reason, rows in cases:
+            with self.subTest(reason=reason):
+                with self.assertRaisesRegex(ValueError, reason):
+                    validate_actions(get_actions(*rows))
+
+    def test_shelves(self):
+        pickup = (9, "a", Action.PICKUP, None)
+        cases = [
+            ("moved from the hot shelf", [(1, "a", Action.PLACE, "hot"), (2, "a", Action.MOVE, "hot"), pickup]),
+            ("moved to the room shelf", [(1, "a", Action.PLACE, "room"), (2, "a", Action.MOVE, "room"), pickup]),
+            ("moved to the cold shelf, its best shelf is hot",
+             [(1, "a", Action.PLACE, "room"), (2, "a", Action.MOVE, "cold"), pickup]),
+            ("placed on the cold shelf", [(1, "a", Action.PLACE, "cold"), pickup]),
+            ("discarded from a hot or cold shelf", [(1, "a", Action.PLACE, "hot"), (2, "a", Action.DISCARD, "room")]),
+            ("not an order of the problem", [(1, "a", Action.PLACE, "room"), (1, "x", Action.PLACE, "room"), pickup]),
+        ]
+        for reason, rows in cases:
+            with self.subTest(reason=reason):
+                with self.assertRaisesRegex(ValueError, reason):
+                    validate_actions(get_actions(*rows), orders=ORDERS[:1])
+
+    def test_capacities(self):
+        actions = get_actions(
+            (1, "a", Action.PLACE, "room"),
+            (2, "b", Action.PLACE, "room"),
+            (3, "a", Action.PICKUP, None),
+            (4, "b", Action.PICKUP, None),
+        )
+
+        validate_actions(actions, Inventory(hot=1, cold=1, room=2))
+        with self.assertRaisesRegex(ValueError, "The room shelf holds 2 orders at 2, its capacity is 1."):
+            validate_actions(actions, Inventory(hot=1, cold=1, room=1))
+
+    def test_score_replays_order_ages(self):
+        second = 1_000_000
+        actions = get_actions(
+            # a ages twice as fast on the room shelf: 2 * 10 + 20 seconds
+            (0, "a", Action.PLACE, "room"),
+            (10 * second, "a", Action.MOVE, "hot"),
+            (0, "b", Action.PLACE, "cold"),
+            (5 * second, "c", Action.PLACE, "room"),
+            (10 * second, "b", Action.PICKUP, None),
+            (20 * second, "c", Action.DISCARD, None),
+            (30 * second, "a", Action.PICKUP, None),
+        )
+
+        score = score_actions(actions, ORDERS, pickup_window_us=(15 * second, 60 * second))
+
+        self.assertEqual(
+            {key: value for key, value in score.items() if key != "mean_freshness"},
+            dict(orders=3, moved=1, discarded=1, picked_up=2, stale=0, waste=1, early_pickups=1, late_pickups=0),
+        )
+        self.assertAlmostEqual(score["mean_freshness"], (0.6 + 0.9) / 3)
+
+
+def get_rows(order_id: str, *action_types: str):
+    return [(timestamp, order_id, action_type, None) for timestamp, action_type in enumerate(action_types, start=1)]
+
+
+if __name__ == "__main__":
+    unittest.main()